@@ -1,8 +1,10 @@
 """Voice-based AWS agent package."""
 
-from .config.config import AgentConfig, VoiceConfig
+from .config.config import AgentConfig, VoiceConfig, VoiceSessionConfig, VoiceServerConfig
 
 __all__ = [
     'AgentConfig',
-    'VoiceConfig'
+    'VoiceConfig',
+    'VoiceSessionConfig',
+    'VoiceServerConfig'
 ]
@@ -2,12 +2,13 @@
 Multi-Agent Orchestration System for Voice-based AWS Agent
 
 This package contains the multi-agent system with:
-- SupervisorAgent: Pure router that forwards queries to specialized agents
+- SupervisorAgent: Pure router that forwards queries to specialized agents, no model of its own
 - EC2Agent: Handles EC2-related operations
 - SSMAgent: Handles Systems Manager operations (DISABLED)
 - BackupAgent: Handles AWS Backup operations (DISABLED)
 - AWSResearcherAgent: Does research task against the AWS online documentation. Handles all queries
 - AgentOrchestrator: Manages the entire multi-agent system
+- AgentOrchestratorPool: Shares pre-built orchestrators across voice sessions
 """
 
 from .supervisor_agent import SupervisorAgent
@@ -15,6 +16,7 @@ from .ec2_agent import EC2Agent
 # from .old_agents.ssm_agent import SSMAgent
 # from .old_agents.backup_agent import BackupAgent
 from .orchestrator import AgentOrchestrator
+from .orchestrator_pool import AgentOrchestratorPool, ConversationState
 from .aws_researcher_agent import AWSResearcherAgent
 
 __all__ = [
@@ -23,5 +25,7 @@ __all__ = [
     # "SSMAgent",
     # "BackupAgent",
     "AgentOrchestrator",
+    "AgentOrchestratorPool",
+    "ConversationState",
     "AWSResearcherAgent"
 ]
@@ -0,0 +1,183 @@
+"""
+Agent Executor
+Runs specialized agent invocations on a bounded, dedicated thread pool so the
+synchronous Bedrock, use_aws and Supabase calls they make never block the asyncio
+event loop that serves every voice WebSocket.
+
+Cancelling the task awaiting run_agent (caller hung up or interrupted) sets the
+invocation's CancelToken. Agents built with CancellationHooks check it before
+every model call and tool call, so an abandoned invocation stops at the next
+step instead of running to completion.
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ..utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+
+_executor = None
+_max_workers = DEFAULT_MAX_WORKERS
+
+AGENT_CANCELLATIONS = REGISTRY.counter(
+    "voice_agent_cancellations_total",
+    "Agent invocations cancelled, by how far they had got",
+    ("stage",),
+)
+AGENT_STEPS_SKIPPED = REGISTRY.counter(
+    "voice_agent_steps_skipped_total",
+    "Model and tool calls not made because the invocation was cancelled",
+    ("step",),
+)
+
+_cancel_token = contextvars.ContextVar("agent_cancel_token", default=None)
+
+
+class AgentCancelled(Exception):
+    """Raised inside an agent invocation whose caller went away."""
+
+
+class CancelToken:
+    """Thread-safe flag telling a running agent invocation to stop."""
+
+    def __init__(self):
+        self._event = threading.Event()
+        self.started = False  # A worker thread picked the invocation up
+
+    def cancel(self):
+        """Ask the invocation to stop at its next model or tool call."""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancel() was called."""
+        return self._event.is_set()
+
+
+try:
+    from strands.experimental.hooks import BeforeModelInvocationEvent, BeforeToolInvocationEvent
+    from strands.hooks import HookProvider
+except ImportError:  # Older strands without invocation hooks
+    BeforeModelInvocationEvent = BeforeToolInvocationEvent = None
+    HookProvider = object
+
+
+class CancellationHooks(HookProvider):
+    """Strands hook provider that stops a cancelled invocation before its next model or tool call."""
+
+    def register_hooks(self, registry, **kwargs):
+        """Subscribe to model and tool invocation events when this strands version has them."""
+        if BeforeModelInvocationEvent is None:
+            return
+        registry.add_callback(BeforeModelInvocationEvent, self._before_model)
+        registry.add_callback(BeforeToolInvocationEvent, self._before_tool)
+
+    def _check(self, step):
+        token = _cancel_token.get()
+        if token is not None and token.cancelled:
+            AGENT_STEPS_SKIPPED.inc(step=step)
+            raise AgentCancelled(f"Agent invocation cancelled before {step} call")
+
+    def _before_model(self, event):
+        self._check("model")
+
+    def _before_tool(self, event):
+        self._check("tool")
+
+
+def configure_agent_executor(max_workers: int):
+    """
+    Set the number of agent invocations that may run at the same time.
+
+    Args:
+        max_workers: Size of the dedicated thread pool
+    """
+    global _executor, _max_workers
+    if max_workers < 1:
+        raise ValueError("Agent executor needs at least one worker")
+
+    _max_workers = max_workers
+    if _executor is not None:
+        # Running calls finish on the old pool, new calls use the resized one
+        _executor.shutdown(wait=False)
+        _executor = None
+    logger.info(f"Agent executor configured with {max_workers} workers")
+
+
+def get_agent_executor() -> ThreadPoolExecutor:
+    """Get the shared agent thread pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=_max_workers, thread_name_prefix="agent-executor"
+        )
+    return _executor
+
+
+def _invoke(agent, query, token):
+    """Run the agent in a worker thread with the invocation's cancel token in context."""
+    _cancel_token.set(token)
+    token.started = True
+    if token.cancelled:
+        # Cancelled while queued for a worker thread
+        AGENT_STEPS_SKIPPED.inc(step="model")
+        raise AgentCancelled("Agent invocation cancelled before it started")
+    invoke_async = getattr(agent, "invoke_async", None)
+    if invoke_async is not None:
+        # Strands' own __call__ hops to yet another thread and drops our context
+        return asyncio.run(invoke_async(query))
+    return agent(query)
+
+
+async def run_agent(agent, query: str):
+    """
+    Invoke a Strands agent on the agent executor and await its result.
+
+    Context variables of the caller, including the cancel token, are carried into
+    the worker thread. Cancelling the awaiting task cancels the invocation; the
+    CancelledError is only raised once the worker thread has let go of the agent,
+    so the caller can't hand the agent to another session while it still runs.
+
+    Args:
+        agent: Callable Strands agent
+        query: User query to pass unchanged to the agent
+
+    Returns:
+        The agent's result object
+    """
+    token = CancelToken()
+    context = contextvars.copy_context()
+    worker = get_agent_executor().submit(functools.partial(context.run, _invoke, agent, query, token))
+    try:
+        return await asyncio.wrap_future(worker)
+    except asyncio.CancelledError:
+        token.cancel()
+        AGENT_CANCELLATIONS.inc(stage="running" if token.started else "queued")
+        await _wait_for_worker(worker)
+        raise
+
+
+async def _wait_for_worker(worker):
+    """Wait until a cancelled invocation's worker returns; it stops at its next model or tool call."""
+    while not worker.done():
+        try:
+            await asyncio.shield(asyncio.wrap_future(worker))
+        except asyncio.CancelledError:
+            continue  # Cancelled again: the agent is still in use, keep waiting
+        except Exception:
+            break  # AgentCancelled or any other failure of the abandoned run
+
+
+def shutdown_agent_executor():
+    """Shutdown the shared agent thread pool."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    logger.info("Agent executor shutdown")
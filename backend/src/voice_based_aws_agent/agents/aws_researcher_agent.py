@@ -9,6 +9,8 @@ from mcp import StdioServerParameters, stdio_client
 from ..config.conversation_config import ConversationConfig, log_conversation_config
 from ..config.config import create_bedrock_model
 from ..utils.prompt_consent import get_consent_instructions
+from ..utils.tracing import ToolTimingHooks
+from .agent_executor import CancellationHooks
 import logging
 
 logger = logging.getLogger(__name__)
@@ -48,6 +50,7 @@ class AWSResearcherAgent(Agent):
             system_prompt=system_prompt,
             tools=[self.aws_documentation_mcp_server],
             conversation_manager=conversation_manager,
+            hooks=[ToolTimingHooks("AWSResearcherAgent"), CancellationHooks()],
         )
 
         # Log configuration
@@ -8,6 +8,9 @@ from strands_tools import use_aws
 from ..config.conversation_config import ConversationConfig, log_conversation_config
 from ..config.config import create_bedrock_model
 from ..utils.prompt_consent import get_consent_instructions
+from ..utils.tracing import ToolTimingHooks
+from .agent_executor import CancellationHooks
+from .response_cache import MutationHooks, ReadOnlyGuard
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,6 +43,7 @@ class EC2Agent(Agent):
             system_prompt=system_prompt,
             tools=[use_aws],
             conversation_manager=conversation_manager,
+            hooks=[ToolTimingHooks("EC2Agent"), CancellationHooks(), ReadOnlyGuard("EC2Agent"), MutationHooks("EC2Agent")],
         )
 
         # Log configuration
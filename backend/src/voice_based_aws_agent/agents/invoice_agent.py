@@ -10,6 +10,9 @@ from supabase.client import ClientOptions
 from ..config.conversation_config import ConversationConfig, log_conversation_config
 from ..config.config import create_bedrock_model
 from ..utils.prompt_consent import get_consent_instructions
+from ..utils.tracing import ToolTimingHooks
+from .agent_executor import CancellationHooks
+from .response_cache import MutationHooks, ReadOnlyGuard
 import logging
 
 # Enable debug logging
@@ -65,6 +68,7 @@ class InvoiceAgent(Agent):
                 self.delete_invoice
             ],
             conversation_manager=conversation_manager,
+            hooks=[ToolTimingHooks("InvoiceAgent"), CancellationHooks(), ReadOnlyGuard("InvoiceAgent"), MutationHooks("InvoiceAgent")],
         )
 
         # Log configuration
@@ -0,0 +1,197 @@
+"""
+Agent Orchestrator Pool
+Builds a fixed number of orchestrators once at server startup and leases them to
+voice sessions per query, keeping each session's conversation history separate.
+An orchestrator runs one query at a time, so the pool size caps concurrent agent
+work; voice_orchestrator_lease_wait_seconds shows how long queries queue for one.
+"""
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+from .orchestrator import AgentOrchestrator
+from ..config.tool_config import setup_tool_environment
+from ..utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+LEASE_WAIT_SECONDS = REGISTRY.histogram(
+    "voice_orchestrator_lease_wait_seconds",
+    "Time queries waited for a free agent orchestrator",
+)
+
+
+class ConversationState:
+    """
+    Conversation history of a single voice session.
+    Holds the message list of every specialized agent the session has talked to.
+    """
+
+    def __init__(self):
+        self.messages: Dict[str, list] = {}
+        # Per-agent history length when this state was forked, see fork()
+        self._forked_lengths: Dict[str, int] = {}
+
+    def fork(self) -> "ConversationState":
+        """
+        Scratch copy of the history for a query whose outcome may be thrown away.
+        Nothing run against the copy reaches this state unless it is passed to commit().
+        """
+        scratch = ConversationState()
+        scratch.messages = {name: list(messages) for name, messages in self.messages.items()}
+        scratch._forked_lengths = {name: len(messages) for name, messages in self.messages.items()}
+        return scratch
+
+    def commit(self, scratch: "ConversationState"):
+        """Append the messages a fork of this history gained since it was taken."""
+        for name, messages in scratch.messages.items():
+            added = messages[scratch._forked_lengths.get(name, 0):]
+            if added:
+                self.messages[name] = self.messages.get(name, []) + added
+
+    def clear(self):
+        """Forget all conversation history for the session."""
+        self.messages.clear()
+
+
+class AgentOrchestratorPool:
+    """
+    Process-wide pool of pre-built AgentOrchestrator instances.
+
+    Orchestrators are expensive to create (Bedrock models, the MCP subprocess of the
+    AWSResearcherAgent, the Supabase client of the InvoiceAgent), so they are built once
+    and leased to sessions for the duration of a single query. The session's
+    ConversationState is swapped into the agents on lease and saved back on release.
+    """
+
+    def __init__(self, config=None, size: int = 2):
+        """
+        Initialize the pool.
+
+        Args:
+            config: AgentConfig instance for AWS profile and region settings
+            size: Number of orchestrators to build
+        """
+        if size < 1:
+            raise ValueError("Orchestrator pool size must be at least 1")
+
+        self.config = config
+        self.size = size
+        self._orchestrators: List[AgentOrchestrator] = []
+        self._available: asyncio.Queue = asyncio.Queue()
+
+    def start(self):
+        """Build all orchestrators. Call once before serving connections."""
+        if self._orchestrators:
+            return
+
+        from tools.supervisor_tool import set_orchestrator
+
+        # Set AWS profile if provided in config
+        if self.config and getattr(self.config, "profile_name", None):
+            os.environ["AWS_PROFILE"] = self.config.profile_name
+            logger.info(f"Set AWS_PROFILE to: {self.config.profile_name}")
+
+        setup_tool_environment()
+
+        logger.info(f"Building {self.size} agent orchestrators for the pool...")
+        for _ in range(self.size):
+            orchestrator = AgentOrchestrator(self.config)
+            self._orchestrators.append(orchestrator)
+            self._available.put_nowait(orchestrator)
+
+        # The standalone supervisor tool shares the first orchestrator
+        set_orchestrator(self._orchestrators[0])
+
+        logger.info(f"Agent orchestrator pool ready with {self.size} orchestrators")
+
+    @property
+    def available(self) -> int:
+        """Number of orchestrators not currently leased."""
+        return self._available.qsize()
+
+    @asynccontextmanager
+    async def lease(self, conversation_state: Optional[ConversationState] = None):
+        """
+        Lease an orchestrator for a single query.
+
+        Args:
+            conversation_state: The calling session's conversation history
+
+        Yields:
+            AgentOrchestrator with the session's conversation history loaded. History is
+            only saved back when the block completes; after an exception or cancellation
+            the session keeps the history it had when the lease started.
+        """
+        if not self._orchestrators:
+            raise RuntimeError("Orchestrator pool not started")
+
+        waiting_since = time.monotonic()
+        orchestrator = await self._available.get()
+        LEASE_WAIT_SECONDS.observe(time.monotonic() - waiting_since)
+        loaded = {}
+        completed = False
+        try:
+            loaded = self._load_conversation(orchestrator, conversation_state)
+            yield orchestrator
+            completed = True
+        finally:
+            if completed:
+                self._save_conversation(orchestrator, conversation_state, loaded)
+            else:
+                self._discard_conversation(orchestrator)
+            self._available.put_nowait(orchestrator)
+
+    def _load_conversation(self, orchestrator, conversation_state):
+        """
+        Copy the session's message history into every specialized agent.
+
+        Returns:
+            Mapping of agent name to the session's history list as it was when loaded
+        """
+        loaded = {}
+        for name, agent in orchestrator.specialized_agents.items():
+            messages = conversation_state.messages.get(name) if conversation_state else None
+            loaded[name] = messages
+            agent.messages = list(messages) if messages is not None else []
+        return loaded
+
+    def _save_conversation(self, orchestrator, conversation_state, loaded):
+        """
+        Store the agents' message history back on the session and reset the agents.
+
+        A session can run several queries at once, so when another lease already saved
+        newer history for the same agent only the messages added by this lease are appended.
+        """
+        for name, agent in orchestrator.specialized_agents.items():
+            messages = agent.messages
+            agent.messages = []
+            if conversation_state is None:
+                continue
+
+            before = loaded.get(name)
+            before_len = len(before) if before is not None else 0
+            if messages == (before or []):
+                continue
+
+            current = conversation_state.messages.get(name)
+            if current is before:
+                conversation_state.messages[name] = messages
+            else:
+                conversation_state.messages[name] = current + messages[before_len:]
+
+    def _discard_conversation(self, orchestrator):
+        """Reset the agents without saving what an unfinished query added to their history."""
+        for agent in orchestrator.specialized_agents.values():
+            agent.messages = []
+
+    def shutdown(self):
+        """Shutdown every orchestrator in the pool."""
+        logger.info("Shutting down agent orchestrator pool")
+        for orchestrator in self._orchestrators:
+            orchestrator.shutdown()
+        self._orchestrators.clear()
+        self._available = asyncio.Queue()
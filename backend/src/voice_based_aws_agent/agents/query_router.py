@@ -0,0 +1,122 @@
+"""
+Keyword router for the supervisor.
+
+The route table from routing_config is compiled once into a word-level trie:
+each keyword (and its plural) is keyed by its first word, with the rest of a
+phrase kept for matching. Routing splits the query into words once and walks
+them left to right, taking the longest phrase that starts at each word, so
+keywords only ever match whole words. Every hit adds its route's weight, and
+the matching route with the highest priority (then score, then table order)
+wins. Adding routes or keywords grows the table, not the work per query.
+"""
+
+import logging
+import re
+from typing import Dict, Iterable, Optional
+
+from ..config.routing_config import DEFAULT_AGENT, ROUTES, Route
+
+logger = logging.getLogger(__name__)
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def _words(text: str) -> tuple:
+    return tuple(WORD_PATTERN.findall(text.lower()))
+
+
+class QueryRouter:
+    """Compiled route table mapping a query to a specialized agent name."""
+
+    def __init__(
+        self,
+        routes: Iterable[Route] = ROUTES,
+        default_agent: str = DEFAULT_AGENT,
+        available_agents: Optional[Iterable[str]] = None,
+    ):
+        """
+        Compile the route table.
+
+        Args:
+            routes: Routes to compile, in tie-breaking order
+            default_agent: Agent for queries no route matches
+            available_agents: Agent names that exist; routes to other agents are skipped
+
+        Raises:
+            ValueError: If a keyword appears in more than one route or has no words
+        """
+        available = set(available_agents) if available_agents is not None else None
+        self.routes = [route for route in routes if available is None or route.agent in available]
+        self.default_agent = default_agent
+
+        keywords = {}  # keyword words -> index of its route
+        for index, route in enumerate(self.routes):
+            for keyword in route.keywords:
+                words = _words(keyword)
+                if not words:
+                    raise ValueError(f"Keyword '{keyword}' in route for {route.agent} has no words")
+                if keywords.get(words, index) != index:
+                    raise ValueError(f"Keyword '{keyword}' is in more than one route")
+                keywords[words] = index
+
+        # First word -> [(remaining words, route index)], longest phrase first
+        self._phrases = {}
+        for words, index in keywords.items():
+            for suffix in ("", "s", "es"):
+                variant = words[:-1] + (words[-1] + suffix,)
+                if suffix and variant in keywords:
+                    continue  # A keyword of its own
+                self._phrases.setdefault(variant[0], []).append((variant[1:], index))
+        for candidates in self._phrases.values():
+            candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """
+        Score every route matching the query.
+
+        Returns:
+            dict: {route index: summed weight of its keyword hits}
+        """
+        scores = {}
+        words = _words(query)
+        position = 0
+        while position < len(words):
+            step = 1
+            for rest, index in self._phrases.get(words[position], ()):
+                end = position + 1 + len(rest)
+                if words[position + 1:end] == rest:
+                    scores[index] = scores.get(index, 0.0) + self.routes[index].weight
+                    step = 1 + len(rest)
+                    break
+            position += step
+        return scores
+
+    def route(self, query: str) -> str:
+        """
+        Pick the agent for a query.
+
+        Args:
+            query: User query
+
+        Returns:
+            Name of the agent to route to
+        """
+        return self.best(self.scores(query)) or self.default_agent
+
+    def best(self, scores: Dict[int, float], min_priority: Optional[int] = None) -> Optional[str]:
+        """
+        Pick the agent of the winning route among scored ones.
+
+        Args:
+            scores: Route scores from scores()
+            min_priority: Only consider routes with at least this priority
+
+        Returns:
+            Agent name, or None if no route qualifies
+        """
+        if min_priority is not None:
+            scores = {index: score for index, score in scores.items() if self.routes[index].priority >= min_priority}
+        if not scores:
+            return None
+        best = max(scores, key=lambda index: (self.routes[index].priority, scores[index], -index))
+        return self.routes[best].agent
@@ -0,0 +1,316 @@
+"""
+Response Cache
+Reuses specialized agents' answers to repeated read-only questions ("list my EC2
+instances") instead of running the full model and tool loop again.
+
+Entries are keyed by agent and normalized query, expire after the agent's TTL
+from cache_config and are evicted least recently used beyond a size limit. The
+cache is shared by every session of the process and is looked up before an
+orchestrator is leased, so hits don't wait for a free one; lookups route with the
+supervisor's own router. It is off until configure_response_cache() gives it a
+size. MutationHooks drop
+an agent's entries whenever that agent runs a tool that changes data, and an
+answer is only stored if no such tool ran for its agent while it was computed.
+
+ReadOnlyGuard enforces the other side of the same tool classification: inside a
+read_only() scope (answers started before the user confirmed anything, like
+speculative queries) a mutating tool call raises instead of running.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Mapping, Optional, Tuple
+
+from ..config.cache_config import (
+    AGENT_TTL_SECONDS,
+    CONTEXT_WORDS,
+    LOCALLY_INVALIDATED_AGENTS,
+    MUTATING_TOOLS,
+    READ_ONLY_AWS_OPERATION_PREFIXES,
+)
+from ..utils.metrics import REGISTRY
+from .query_router import WORD_PATTERN
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_ENTRIES = 256
+
+CACHE_REQUESTS = REGISTRY.counter(
+    "voice_response_cache_requests_total",
+    "Routed queries answered from the response cache or not",
+    ("agent", "result"),
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "voice_response_cache_hit_ratio",
+    "Share of cacheable queries answered from the response cache",
+    ("agent",),
+)
+CACHE_INVALIDATIONS = REGISTRY.counter(
+    "voice_response_cache_invalidations_total",
+    "Times an agent's cached answers were dropped because one of its tools changed data",
+    ("agent",),
+)
+CACHE_ENTRIES = REGISTRY.gauge(
+    "voice_response_cache_entries",
+    "Answers currently held in the response cache",
+)
+READ_ONLY_BLOCKED = REGISTRY.counter(
+    "voice_read_only_tool_blocks_total",
+    "Mutating tool calls refused because the invocation was read-only",
+    ("agent", "tool"),
+)
+
+_read_only_scope = contextvars.ContextVar("agent_read_only_scope", default=None)
+
+try:
+    from strands.experimental.hooks import AfterToolInvocationEvent, BeforeToolInvocationEvent
+    from strands.hooks import HookProvider
+except ImportError:  # Older strands without invocation hooks
+    BeforeToolInvocationEvent = AfterToolInvocationEvent = None
+    HookProvider = object
+
+
+def normalize_query(query: str) -> Optional[str]:
+    """
+    Cache key text of a query: lowercase words, punctuation and spacing dropped.
+
+    Returns:
+        The normalized query, or None if it refers to earlier turns and can't be cached
+    """
+    words = WORD_PATTERN.findall(query.lower())
+    if not words or CONTEXT_WORDS.intersection(words):
+        return None
+    return " ".join(words)
+
+
+def is_mutating_tool(tool_use: Mapping) -> bool:
+    """Whether a tool call can change data behind cached answers."""
+    name = tool_use.get("name")
+    if name in MUTATING_TOOLS:
+        return True
+    if name == "use_aws":
+        operation = str((tool_use.get("input") or {}).get("operation_name", ""))
+        return not operation.startswith(READ_ONLY_AWS_OPERATION_PREFIXES)
+    return False
+
+
+class ReadOnlyViolation(Exception):
+    """Raised inside a read-only agent invocation that tried to call a mutating tool."""
+
+
+class ReadOnlyScope:
+    """Marks agent invocations started from a context as read-only and records refused tool calls."""
+
+    def __init__(self):
+        self.violated = False  # A mutating tool call was refused
+
+
+def read_only() -> ReadOnlyScope:
+    """
+    Make agent invocations started from the current context (and tasks and
+    agent executor threads it spawns) read-only.
+
+    Returns:
+        The scope, to check afterwards whether a mutating tool call was refused
+    """
+    scope = ReadOnlyScope()
+    _read_only_scope.set(scope)
+    return scope
+
+
+class ResponseCache:
+    """TTL and LRU bounded map of (agent, normalized query) to answer."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, ttl_seconds: Mapping[str, float] = AGENT_TTL_SECONDS):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Most answers kept; 0 disables the cache
+            ttl_seconds: Seconds an answer stays valid, per agent; other agents aren't cached
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = dict(ttl_seconds)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._router = None
+        self._generations: Dict[str, int] = {}  # Bumped on every invalidation of an agent
+        self._lookups: Dict[str, Tuple[int, int]] = {}  # Agent -> (hits, cacheable lookups)
+        # Hooks invalidate from agent executor threads
+        self._lock = threading.Lock()
+
+    def enabled_for(self, agent: str) -> bool:
+        """Whether answers of an agent are cached at all."""
+        return self.max_entries > 0 and self.ttl_seconds.get(agent, 0) > 0
+
+    def generation(self, agent: str) -> int:
+        """Invalidation count of an agent; store() only accepts answers computed within one generation."""
+        with self._lock:
+            return self._generations.get(agent, 0)
+
+    def use_router(self, router):
+        """
+        Route lookups with the supervisor's router, so they pick the agent it would.
+
+        Args:
+            router: SemanticRouter of a SupervisorAgent
+        """
+        self._router = router
+
+    def lookup(self, query: str) -> Tuple[str, Optional[str]]:
+        """
+        Route a query the way the supervisor does and look up its answer.
+
+        Returns:
+            tuple: (agent the query goes to, cached answer or None); (None, None) when
+            disabled or before a supervisor set its router
+        """
+        if self.max_entries <= 0 or self._router is None:
+            return None, None
+        agent, _ = self._router.decide(query)
+        return agent, self.get(agent, query)
+
+    def get(self, agent: str, query: str) -> Optional[str]:
+        """
+        Look up a fresh answer.
+
+        Returns:
+            The cached answer, or None
+        """
+        key = normalize_query(query)
+        if key is None or not self.enabled_for(agent):
+            CACHE_REQUESTS.inc(agent=agent, result="uncacheable")
+            return None
+        with self._lock:
+            entry = self._entries.get((agent, key))
+            if entry is not None and entry[0] <= time.monotonic():
+                del self._entries[(agent, key)]
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end((agent, key))
+            CACHE_ENTRIES.set(len(self._entries))
+            hits, lookups = self._lookups.get(agent, (0, 0))
+            hits, lookups = hits + (entry is not None), lookups + 1
+            self._lookups[agent] = (hits, lookups)
+        CACHE_REQUESTS.inc(agent=agent, result="hit" if entry else "miss")
+        CACHE_HIT_RATIO.set(hits / lookups, agent=agent)
+        return entry[1] if entry else None
+
+    def store(self, agent: str, query: str, answer: str, generation: int):
+        """
+        Keep an answer unless the agent's data changed while it was computed.
+
+        Args:
+            agent: Agent that answered
+            query: Query as asked
+            answer: The agent's answer
+            generation: generation(agent) from before the agent ran
+        """
+        key = normalize_query(query)
+        if key is None or not self.enabled_for(agent):
+            return
+        with self._lock:
+            if self._generations.get(agent, 0) != generation:
+                return
+            self._entries[(agent, key)] = (time.monotonic() + self.ttl_seconds[agent], answer)
+            self._entries.move_to_end((agent, key))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            CACHE_ENTRIES.set(len(self._entries))
+
+    def invalidate(self, agent: str):
+        """Drop every cached answer of an agent."""
+        with self._lock:
+            self._generations[agent] = self._generations.get(agent, 0) + 1
+            for key in [key for key in self._entries if key[0] == agent]:
+                del self._entries[key]
+            CACHE_ENTRIES.set(len(self._entries))
+        CACHE_INVALIDATIONS.inc(agent=agent)
+        logger.info(f"Response cache invalidated for {agent}")
+
+    def clear(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._entries.clear()
+            CACHE_ENTRIES.set(0)
+
+
+_cache = ResponseCache(max_entries=0)
+
+
+def configure_response_cache(max_entries: int, workers: int = 1):
+    """
+    Set how many answers the process-wide cache keeps.
+
+    Args:
+        max_entries: Most answers kept; 0 disables the cache
+        workers: Server processes running side by side, each with its own cache
+    """
+    global _cache
+    if max_entries < 0:
+        raise ValueError("Response cache size can't be negative")
+    ttl_seconds = dict(AGENT_TTL_SECONDS)
+    if workers > 1:
+        # Another worker's invalidation never reaches this cache
+        for agent in LOCALLY_INVALIDATED_AGENTS:
+            ttl_seconds.pop(agent, None)
+    _cache = ResponseCache(max_entries, ttl_seconds)
+    logger.info(f"Response cache configured with {max_entries} entries for {sorted(ttl_seconds)}")
+
+
+def get_response_cache() -> ResponseCache:
+    """Get the process-wide response cache."""
+    return _cache
+
+
+class MutationHooks(HookProvider):
+    """Strands hook provider that drops an agent's cached answers when it runs a mutating tool."""
+
+    def __init__(self, agent_name):
+        """
+        Initialize the hooks.
+
+        Args:
+            agent_name: Agent whose cached answers the tools can change
+        """
+        self.agent_name = agent_name
+
+    def register_hooks(self, registry, **kwargs):
+        """Subscribe to tool invocation events when this strands version has them."""
+        if BeforeToolInvocationEvent is None:
+            return
+        registry.add_callback(BeforeToolInvocationEvent, self._on_tool)
+        registry.add_callback(AfterToolInvocationEvent, self._on_tool)
+
+    def _on_tool(self, event):
+        # Before: readers running now won't store stale answers. After: nor will ones that read mid-change.
+        if is_mutating_tool(event.tool_use):
+            get_response_cache().invalidate(self.agent_name)
+
+
+class ReadOnlyGuard(HookProvider):
+    """Strands hook provider that refuses mutating tool calls inside a read_only() scope."""
+
+    def __init__(self, agent_name):
+        """
+        Initialize the hooks.
+
+        Args:
+            agent_name: Agent label for the refused tool counter
+        """
+        self.agent_name = agent_name
+
+    def register_hooks(self, registry, **kwargs):
+        """Subscribe to tool invocation events when this strands version has them."""
+        if BeforeToolInvocationEvent is None:
+            return
+        registry.add_callback(BeforeToolInvocationEvent, self._before_tool)
+
+    def _before_tool(self, event):
+        scope = _read_only_scope.get()
+        if scope is not None and is_mutating_tool(event.tool_use):
+            scope.violated = True
+            READ_ONLY_BLOCKED.inc(agent=self.agent_name, tool=event.tool_use.get("name"))
+            raise ReadOnlyViolation(f"{event.tool_use.get('name')} changes data and the invocation is read-only")
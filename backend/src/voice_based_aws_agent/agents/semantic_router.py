@@ -0,0 +1,192 @@
+"""
+Semantic router for the supervisor.
+
+Queries are compared with example utterances of each agent (routing_config.EXEMPLARS)
+instead of being sent to a model. A small hashing vectorizer turns text into a
+TF-IDF weighted vector of words, word pairs and character trigrams (so "invoices"
+still resembles "invoice"); the exemplar vectors are computed once when the
+router is built. A query goes to the agent with the most similar exemplar by
+cosine similarity. Keyword routes of KEYWORD_OVERRIDE_PRIORITY or more (e.g.
+"lambda") decide before any similarity is computed. When even the best match is
+below the threshold, the other keyword routes decide, and their default agent
+takes the rest.
+"""
+
+import logging
+import math
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from zlib import crc32
+
+from ..config.routing_config import EXEMPLARS, KEYWORD_OVERRIDE_PRIORITY, SEMANTIC_THRESHOLD
+from ..utils.metrics import REGISTRY
+from .query_router import WORD_PATTERN, QueryRouter
+
+logger = logging.getLogger(__name__)
+
+ROUTING_DECISIONS = REGISTRY.counter(
+    "voice_routing_decisions_total",
+    "Supervisor routing decisions by agent and by what decided them",
+    ("agent", "method"),
+)
+
+# Feature weights relative to a whole word
+BIGRAM_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.3
+
+
+class HashingVectorizer:
+    """Maps text to a fixed-size vector by hashing its features; no vocabulary to store."""
+
+    def __init__(self, dimensions: int = 4096):
+        """
+        Initialize the vectorizer.
+
+        Args:
+            dimensions: Vector length; a power of two
+        """
+        if dimensions & (dimensions - 1):
+            raise ValueError("dimensions must be a power of two")
+        self.dimensions = dimensions
+        self.idf = np.ones(dimensions, dtype=np.float32)
+
+    def _hashed_features(self, text: str) -> Dict[int, float]:
+        """Feature index -> weight for words, adjacent word pairs and character trigrams."""
+        mask = self.dimensions - 1
+        hashed = {}
+        words = WORD_PATTERN.findall(text.lower())
+        for position, word in enumerate(words):
+            index = crc32(word.encode()) & mask
+            hashed[index] = hashed.get(index, 0.0) + 1.0
+            if position:
+                index = crc32(f"{words[position - 1]} {word}".encode()) & mask
+                hashed[index] = hashed.get(index, 0.0) + BIGRAM_WEIGHT
+            padded = f"<{word}>"
+            for start in range(len(padded) - 2):
+                index = crc32(padded[start:start + 3].encode()) & mask
+                hashed[index] = hashed.get(index, 0.0) + TRIGRAM_WEIGHT
+        return hashed
+
+    def fit(self, documents: Sequence[str]):
+        """Learn inverse document frequencies from the exemplar utterances."""
+        document_frequency = np.zeros(self.dimensions, dtype=np.float32)
+        for document in documents:
+            document_frequency[list(self._hashed_features(document))] += 1
+        self.idf = (np.log((1 + len(documents)) / (1 + document_frequency)) + 1).astype(np.float32)
+        return self
+
+    def sparse(self, text: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Indexes and values of the non-zero entries of transform(text)."""
+        hashed = self._hashed_features(text)
+        indexes = np.fromiter(hashed, dtype=np.int64, count=len(hashed))
+        values = np.fromiter(hashed.values(), dtype=np.float32, count=len(hashed)) * self.idf[indexes]
+        norm = math.sqrt(float(values @ values))
+        return indexes, values / norm if norm else values
+
+    def transform(self, text: str) -> np.ndarray:
+        """Unit-length TF-IDF vector of a text (all zeros for text without words)."""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        indexes, values = self.sparse(text)
+        vector[indexes] = values
+        return vector
+
+
+class SemanticRouter:
+    """Routes a query to the agent whose example utterances it is most similar to."""
+
+    def __init__(
+        self,
+        exemplars: Mapping[str, Iterable[str]] = EXEMPLARS,
+        threshold: float = SEMANTIC_THRESHOLD,
+        fallback: Optional[QueryRouter] = None,
+        available_agents: Optional[Iterable[str]] = None,
+        dimensions: int = 4096,
+        override_priority: Optional[int] = KEYWORD_OVERRIDE_PRIORITY,
+    ):
+        """
+        Vectorize the exemplars.
+
+        Args:
+            exemplars: Agent name -> example utterances
+            threshold: Lowest cosine similarity trusted; below it the fallback decides
+            fallback: Keyword router for low-confidence queries (built from the route table if None)
+            available_agents: Agent names that exist; exemplars of other agents are skipped
+            dimensions: Length of the hashed vectors
+            override_priority: Keyword routes with at least this priority win over similarity (None for never)
+        """
+        available = set(available_agents) if available_agents is not None else None
+        self.threshold = threshold
+        self.override_priority = override_priority
+        self.fallback = fallback or QueryRouter(available_agents=available)
+
+        self.agents = []
+        utterances = []
+        starts = []  # First exemplar row of every agent
+        for agent, examples in exemplars.items():
+            if available is not None and agent not in available:
+                continue
+            examples = list(examples)
+            if not examples:
+                continue
+            starts.append(len(utterances))
+            self.agents.append(agent)
+            utterances += examples
+
+        self.vectorizer = HashingVectorizer(dimensions).fit(utterances)
+        self._matrix = np.stack([self.vectorizer.transform(text) for text in utterances]) if utterances \
+            else np.zeros((0, dimensions), dtype=np.float32)
+        self._starts = np.array(starts, dtype=np.int64)
+        logger.info(f"Semantic router ready with {len(utterances)} exemplars for {self.agents}")
+
+    def similarities(self, query: str) -> Dict[str, float]:
+        """
+        Best cosine similarity between the query and each agent's exemplars.
+
+        Returns:
+            dict: {agent name: similarity in [0, 1]}
+        """
+        if not self.agents:
+            return {}
+        indexes, values = self.vectorizer.sparse(query)
+        if not len(indexes):
+            return dict.fromkeys(self.agents, 0.0)
+        # Only the query's non-zero columns contribute to the dot products
+        scores = self._matrix[:, indexes] @ values
+        return dict(zip(self.agents, np.maximum.reduceat(scores, self._starts).tolist()))
+
+    def decide(self, query: str) -> Tuple[str, str]:
+        """
+        Pick the agent for a query without counting the decision.
+
+        Returns:
+            tuple: (agent name, "semantic", "keyword" or "default")
+        """
+        keyword_scores = self.fallback.scores(query)
+        if self.override_priority is not None:
+            agent = self.fallback.best(keyword_scores, self.override_priority)
+            if agent is not None:
+                return agent, "keyword"
+
+        similarities = self.similarities(query)
+        if similarities:
+            agent, similarity = max(similarities.items(), key=lambda item: item[1])
+            if similarity >= self.threshold:
+                return agent, "semantic"
+
+        agent = self.fallback.best(keyword_scores)
+        return (agent, "keyword") if agent is not None else (self.fallback.default_agent, "default")
+
+    def route(self, query: str) -> str:
+        """
+        Pick the agent for a query.
+
+        Args:
+            query: User query
+
+        Returns:
+            Name of the agent to route to
+        """
+        agent, method = self.decide(query)
+        ROUTING_DECISIONS.inc(agent=agent, method=method)
+        return agent
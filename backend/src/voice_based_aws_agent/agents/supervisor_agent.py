@@ -5,17 +5,28 @@ Routes user queries to appropriate specialized agents without any tools or reaso
 
 from strands import Agent
 from typing import Dict, Any
-from ..config.conversation_config import ConversationConfig, log_conversation_config
-from ..config.config import create_bedrock_model
+from .agent_executor import run_agent
+from .response_cache import get_response_cache
+from .semantic_router import SemanticRouter
+from ..utils import tracing
+from ..utils.metrics import REGISTRY
+import asyncio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+AGENT_REQUEST_SECONDS = REGISTRY.histogram(
+    "voice_agent_request_seconds",
+    "Time a specialized agent took to answer a routed query",
+    ("agent", "outcome"),
+)
 
-class SupervisorAgent(Agent):
+
+class SupervisorAgent:
     """
     Supervisor Agent that acts as a pure router.
-    No tools, no reasoning - just routing based on query type.
+    No tools, no reasoning and no model - routing is done locally by the semantic router.
     """
 
     def __init__(self, specialized_agents: Dict[str, Agent], config=None):
@@ -26,72 +37,19 @@ class SupervisorAgent(Agent):
             specialized_agents: Dictionary mapping agent names to agent instances
             config: AgentConfig instance for AWS profile and region settings
         """
-        
+
         if config is None:
             raise RuntimeError("No config provided")
-        
-        # Create properly configured Bedrock model with specified profile
-        bedrock_model = create_bedrock_model(config)
-
-        # Create conversation manager for supervisor (smaller window since it just routes)
-        conversation_manager = ConversationConfig.create_conversation_manager(
-            "supervisor"
-        )
-
-        # Initialize Strands Agent with system prompt but no tools
-        system_prompt = self._get_routing_instructions()
-        super().__init__(
-            model=bedrock_model,
-            system_prompt=system_prompt,
-            tools=[],  # No tools for pure router
-            conversation_manager=conversation_manager,
-        )
 
+        self.config = config
         self.specialized_agents = specialized_agents
+        # Exemplar vectors and route table built once; agents that aren't built are skipped
+        self.router = SemanticRouter(available_agents=specialized_agents.keys())
+        get_response_cache().use_router(self.router)
 
-        # Log configuration
         logger.info(
-            "SupervisorAgent initialized with BedrockModel (configured profile, us-east-1, Nova Lite)"
+            f"Supervisor initialized with agents: {list(specialized_agents.keys())}"
         )
-        log_conversation_config("SupervisorAgent", conversation_manager)
-        logger.info(
-            f"Supervisor initialized with agents: {list(specialized_agents.keys())} and conversation management"
-        )
-
-    def _get_routing_instructions(self) -> str:
-        """Get the routing instructions for the supervisor."""
-        return """
-You are a Supervisor Agent that acts as a pure router for customer's queries. 
-
-1. First, validate that the query is realted to programming
-2. If non-programming, politely redirect to AWS topics
-3. Route the query to the appropriate agent
-4. Return the agent's response
-
-AWS QUERY VALIDATION:
-- ONLY handle queries about AWS services, operations, infrastructure, or documentation and research
-- Reject queries about:  personal topics, entertainment, finance
-
-ROUTING RULES (for valid AWS queries):
-- AWS lambda documentation queries and general AWS questions -> AWSResearcherAgent
-- AWS EC2-related queries (instances, status, management) → EC2Agent
-- When asked to perform research on AWS → aws_researcher
-- General AWS queries that don't fit above → AWSResearcherAgent (default)
-
-CONVERSATION CONTEXT:
-- Remember which agents handled recent queries
-- Consider conversation flow when routing follow-up questions
-- Route follow-up questions to the same agent when contextually relevant
-
-DO NOT:
-- Use any tools yourself
-- Make AWS API calls
-
-ALWAYS:
-- Pass the original user query unchanged to agents
-- Return the specialized agent's response
-- Consider conversation history for routing decisions
-"""
 
     async def route_query(self, query: str) -> str:
         """
@@ -115,20 +73,45 @@ ALWAYS:
         # Route to specialized agent
         specialized_agent = self.specialized_agents[agent_name]
         logger.info(f"Routing to {agent_name}")
+        tracing.mark("routing_decided", agent=agent_name)
 
+        cache = get_response_cache()
+        generation = cache.generation(agent_name)
+        started = time.monotonic()
+        # A run that doesn't complete leaves a dangling user message or toolUse in the history
+        history = list(getattr(specialized_agent, "messages", None) or [])
         try:
-            # Use the Strands Agent's direct call method
-            response = specialized_agent(query)
+            # Run the agent on the dedicated executor so the event loop stays responsive
+            response = await run_agent(specialized_agent, query)
+            tracing.mark("agent_done")
+            AGENT_REQUEST_SECONDS.observe(time.monotonic() - started, agent=agent_name, outcome="ok")
             logger.info(f"Received response from {agent_name}")
+            # Kept only if none of the agent's tools changed data in the meantime
+            cache.store(agent_name, query, str(response), generation)
             return str(response)
 
+        except asyncio.CancelledError:
+            # The caller hung up or interrupted; run_agent stops the agent and waits for it
+            self._restore_history(specialized_agent, history)
+            AGENT_REQUEST_SECONDS.observe(time.monotonic() - started, agent=agent_name, outcome="cancelled")
+            logger.info(f"Cancelled query to {agent_name}")
+            raise
+
         except Exception as e:
+            self._restore_history(specialized_agent, history)
+            AGENT_REQUEST_SECONDS.observe(time.monotonic() - started, agent=agent_name, outcome="error")
             logger.error(f"Error from {agent_name}: {str(e)}")
             return f"Error: {agent_name} encountered an issue: {str(e)}"
 
+    @staticmethod
+    def _restore_history(agent, history):
+        """Put back the messages an agent had before a run that didn't complete."""
+        if hasattr(agent, "messages"):
+            agent.messages = history
+
     def _determine_agent(self, query: str) -> str:
         """
-        Determine which agent should handle the query based on keywords.
+        Determine which agent should handle the query with the semantic router.
 
         Args:
             query: User query
@@ -136,69 +119,6 @@ ALWAYS:
         Returns:
             Name of the agent to route to
         """
-        query_lower = query.lower()
-
-        # SSM keywords
-        # ssm_keywords = [
-        #     "ssm",
-        #     "systems manager",
-        #     "patch",
-        #     "command",
-        #     "document",
-        #     "run command",
-        #     "session manager",
-        #     "parameter store",
-        #     "cloudwatch agent",
-        #     "install",
-        #     "configure",
-        # ]
-
-        # # Backup keywords
-        # backup_keywords = [
-        #     "backup",
-        #     "restore",
-        #     "vault",
-        #     "backup plan",
-        #     "backup job",
-        #     "recovery",
-        #     "snapshot",
-        # ]
-
-        # EC2 keywords (and default)
-        ec2_keywords = [
-            "ec2",
-            "instance",
-            "server",
-            "vm",
-            "virtual machine",
-            "compute",
-            "ami",
-            "security group",
-            "vpc",
-        ]
-        
-        lambda_keywords = [
-            "lambda",
-        ]
-
-        # Check for SSM
-        # if any(keyword in query_lower for keyword in ssm_keywords):
-        #     logger.info("SSM query detected, routing to SSMAgent")
-        #     return "SSMAgent"
-
-        # Check for Backup
-        # if any(keyword in query_lower for keyword in backup_keywords):
-        #     logger.info("Backup query detected, routing to BackupAgent")
-        #     return "BackupAgent"
-        
-        if any(keyword in query_lower for keyword in lambda_keywords):
-            logger.info("Lambda query detected, routing to AWSResearcherAgent")
-            return "AWSResearcherAgent"
-        
-        #         # Check for EC2
-        if any(keyword in query_lower for keyword in ec2_keywords):
-            return "EC2Agent"
-
-        # Default to EC2Agent for general queries
-        logger.info("Defaulting to AWSResearcherAgent for general query")
-        return "AWSResearcherAgent"
+        agent_name = self.router.route(query)
+        logger.info(f"Router selected {agent_name}")
+        return agent_name
@@ -0,0 +1,35 @@
+"""
+Response Cache Configuration
+How long each agent's answers may be reused, and which tool calls change the
+data behind them.
+"""
+
+# Seconds an answer stays valid, per agent. Agents not listed are never cached.
+AGENT_TTL_SECONDS = {
+    "EC2Agent": 30,  # Instances also change outside this app
+    "InvoiceAgent": 120,  # Invoices change through this app, which invalidates (one worker only, see below)
+    "AWSResearcherAgent": 3600,  # Documentation barely changes
+}
+
+# Agents whose TTL relies on MutationHooks seeing every change. Server workers each
+# have their own cache and don't see each other's invalidations, so with more than
+# one worker these agents aren't cached.
+LOCALLY_INVALIDATED_AGENTS = frozenset(("InvoiceAgent",))
+
+# Tools that change data; running one drops the calling agent's cached answers
+MUTATING_TOOLS = frozenset((
+    "update_invoice_status",
+    "update_invoice",
+    "create_invoice",
+    "delete_invoice",
+))
+
+# use_aws calls are read-only only for operations starting with one of these
+READ_ONLY_AWS_OPERATION_PREFIXES = ("describe_", "list_", "get_", "search_", "lookup_", "batch_get_")
+
+# Queries with these words lean on earlier turns ("stop that one") and aren't cached
+CONTEXT_WORDS = frozenset((
+    "it", "its", "that", "this", "those", "these", "them", "they", "he", "she", "one", "ones",
+    "first", "second", "third", "last", "previous", "same", "again", "other", "else", "more",
+    "above", "yes", "no", "ok", "okay",
+))
@@ -16,6 +16,8 @@ class AgentConfig:
     temperature: float = 0.0
     max_tokens: int = 2048  # Recommended max tokens for better responses
     request_timeout: int = 300  # Timeout in seconds for API requests
+    agent_executor_workers: int = 8  # Agent invocations allowed to run concurrently
+    response_cache_max_entries: int = 0  # Answers to read-only queries reused across sessions (0 disables)
 
     def __post_init__(self):
         """Set default profile_name if not provided."""
@@ -34,6 +36,85 @@ class VoiceConfig:
     timeout_seconds: int = 5  # Silence timeout
 
 
+@dataclass
+class VoiceSessionConfig:
+    """Configuration for a voice session's queues and audio pipeline."""
+
+    input_queue_max_size: int = 200  # Audio chunks waiting to be sent to Bedrock
+    input_max_age_ms: int = 500  # Input audio older than this is dropped, not sent
+    output_queue_max_size: int = 500  # Events waiting to be forwarded to the client
+    output_queue_policy: str = "block"  # When full: "block", "drop_oldest" or "disconnect"
+    vad_enabled: bool = False  # Suppress silent microphone audio before it reaches Bedrock
+    vad_energy_threshold: float = 300.0  # Minimum frame RMS (int16 scale) counted as speech
+    vad_hangover_ms: int = 800  # Silence still sent after speech so turns can be endpointed
+    vad_preroll_ms: int = 200  # Suppressed audio replayed just before detected speech
+    vad_keepalive_ms: int = 500  # During long silence, send one chunk per interval
+    audio_coalesce_target_ms: int = 32  # Merge microphone chunks into events of this length (0 disables)
+    audio_coalesce_max_latency_ms: int = 40  # Longest time buffered audio waits before being sent, at least the target
+    stream_rollover_seconds: int = 420  # Replace the Nova Sonic stream after this age, before its 8 minute limit (0 disables)
+    stream_rollover_grace_seconds: int = 40  # Longest wait for a quiet moment before rolling over anyway
+    stream_rollover_quiet_ms: int = 1500  # Output and caller silence that counts as a quiet moment
+    rollover_history_messages: int = 12  # Recent USER/ASSISTANT messages replayed on the new stream
+    rollover_history_max_chars: int = 6000  # Upper bound on replayed history text
+    hibernate_after_seconds: int = 0  # Close the Nova Sonic stream of a session idle this long, reopen on speech (0 disables)
+    speculative_tools: bool = False  # Start read-only agent queries on the final user transcript, before the toolUse
+    speculation_min_overlap: float = 0.75  # Content word overlap of toolUse query and transcript needed to use a speculation
+    speculation_ttl_seconds: float = 15.0  # Speculations no toolUse claimed within this time are cancelled
+
+    def __post_init__(self):
+        """Validate the output queue policy and audio coalescing limits."""
+        if self.output_queue_policy not in ("block", "drop_oldest", "disconnect"):
+            raise ValueError(f"Unknown output queue policy: {self.output_queue_policy}")
+        # A latency cap below the target would always flush first, so the target is never reached
+        if 0 < self.audio_coalesce_max_latency_ms < self.audio_coalesce_target_ms:
+            raise ValueError(
+                f"audio_coalesce_max_latency_ms ({self.audio_coalesce_max_latency_ms}) "
+                f"is below audio_coalesce_target_ms ({self.audio_coalesce_target_ms})"
+            )
+
+
+@dataclass
+class FakeNovaSonicConfig:
+    """Script of the in-process Nova Sonic stand-in used for offline load tests."""
+
+    turn_after_chunks: int = 50  # audioInput chunks that make up one caller utterance
+    tool_name: str = "supervisorAgent"  # Tool requested for every utterance ("" replies directly)
+    tool_query: str = "How many EC2 instances are running?"  # Query sent in the toolUse content
+    transcript: str = "How many EC2 instances are running?"  # USER transcript emitted for each utterance
+    reply_text: str = "You have three instances running."  # ASSISTANT transcript of the reply
+    response_delay_ms: int = 300  # Model time before the toolUse and before the reply
+    reply_audio_ms: int = 2000  # Length of the synthetic audioOutput reply
+    audio_chunk_ms: int = 40  # Audio per audioOutput event
+    realtime: bool = True  # Pace audioOutput at playback speed instead of sending it at once
+    error_after_chunks: int = 0  # Fail a stream after this many audioInput chunks (0 never)
+    error: str = "ModelStreamErrorException"  # Injected failure: an exception name, or "end" to end the stream
+    agent_answer: str = "There are three EC2 instances running."  # Canned supervisor answer to every tool query
+    agent_delay_ms: int = 500  # Time the canned supervisor blocks an agent executor thread per query
+
+    def __post_init__(self):
+        """Validate the audio chunk length."""
+        if self.audio_chunk_ms <= 0:
+            raise ValueError("audio_chunk_ms must be positive")
+
+
+@dataclass
+class VoiceServerConfig:
+    """Configuration for the voice WebSocket server."""
+
+    stream_pool_size: int = 0  # Nova Sonic streams kept open with the default sessionStart sent (0 disables)
+    stream_pool_max_idle_seconds: int = 45  # Pooled streams are recycled before this age
+    metrics_enabled: bool = True  # Serve /metrics and /health on the WebSocket port
+    event_loop_lag_interval_ms: int = 500  # How often event loop lag is sampled
+    workers: int = 1  # Server processes sharing the port with SO_REUSEPORT
+    reuse_port: bool = False  # Bind with SO_REUSEPORT even with one worker, so a new server can start before the old one drains
+    drain_timeout_seconds: int = 30  # On SIGTERM, how long sessions get to finish their current turn
+    max_sessions: int = 50  # Concurrent sessions per process (0 for no limit)
+    admission_queue_size: int = 10  # Connections that may wait for a free session slot
+    admission_wait_seconds: float = 2.0  # Longest wait before a connection gets a "busy" event
+    max_concurrent_tools: int = 16  # Tool executions running at once across sessions (0 for no limit)
+    fake_nova_sonic: FakeNovaSonicConfig | None = None  # Serve sessions from the in-process fake instead of Bedrock
+
+
 def create_bedrock_model(config: AgentConfig | None = None) -> BedrockModel:
     """
     Create a properly configured BedrockModel for Strands agents.
@@ -0,0 +1,121 @@
+"""
+Routing Configuration
+Example utterances and the keyword route table the supervisor uses to pick a
+specialized agent for a query.
+"""
+
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class Route:
+    """Keywords that send a query to one specialized agent."""
+
+    agent: str  # Name of the agent in the orchestrator's specialized_agents
+    keywords: tuple[str, ...]  # Whole words or phrases, matched case-insensitively, plural "s"/"es" allowed
+    priority: int = 0  # A matching route with a higher priority always wins
+    weight: float = 1.0  # Score per keyword hit, compared between routes of equal priority
+
+
+# Agent used when no route matches
+DEFAULT_AGENT = "AWSResearcherAgent"
+
+ROUTES = (
+    # Lambda questions are documentation research, even when they mention instances
+    Route(
+        agent="AWSResearcherAgent",
+        keywords=("lambda",),
+        priority=10,
+    ),
+    Route(
+        agent="InvoiceAgent",
+        keywords=("invoice", "balance due", "unpaid", "overdue"),
+        priority=5,
+    ),
+    Route(
+        agent="EC2Agent",
+        keywords=(
+            "ec2",
+            "instance",
+            "server",
+            "vm",
+            "virtual machine",
+            "compute",
+            "ami",
+            "security group",
+            "vpc",
+        ),
+    ),
+    # Enable together with the agents in the orchestrator
+    # Route(
+    #     agent="SSMAgent",
+    #     keywords=("ssm", "systems manager", "patch", "run command", "session manager",
+    #               "parameter store", "cloudwatch agent"),
+    # ),
+    # Route(
+    #     agent="BackupAgent",
+    #     keywords=("backup", "restore", "vault", "backup plan", "backup job", "recovery", "snapshot"),
+    # ),
+)
+
+
+# Semantic routing compares a query with example utterances of each agent.
+# Below this cosine similarity the match is not trusted and the keyword routes decide.
+SEMANTIC_THRESHOLD = 0.2
+
+# Matching keyword routes of at least this priority decide before semantic routing
+KEYWORD_OVERRIDE_PRIORITY = 10
+
+EXEMPLARS = {
+    "EC2Agent": (
+        "list all of my ec2 instances",
+        "which instances are running",
+        "show stopped instances in this region",
+        "start the instance named web server",
+        "stop my development instances",
+        "reboot the production server",
+        "terminate the test instance",
+        "what is the status of my virtual machines",
+        "restart the vm in the staging account",
+        "how many servers do I have running",
+        "describe the instance type and public ip address",
+        "which security groups are attached to my instance",
+        "list the amis I own",
+        "which vpc and subnet is my instance in",
+        "check the health of my ec2 fleet",
+        "what instance types am I using",
+    ),
+    "AWSResearcherAgent": (
+        "what is the maximum timeout for a lambda function",
+        "how do I configure lambda concurrency",
+        "explain how s3 bucket versioning works",
+        "when should I use kinesis instead of sqs",
+        "find the documentation for kms key policies",
+        "how do dynamodb global tables replicate data",
+        "what are the best practices for serverless applications",
+        "how do I set up cloudtrail logging",
+        "how do I orchestrate a workflow with step functions",
+        "how is data transfer out of aws priced",
+        "what does the well architected framework recommend",
+        "how do I use eventbridge rules",
+        "what regions support amazon bedrock",
+        "research the aws documentation for me",
+        "how does route 53 health checking work",
+    ),
+    "InvoiceAgent": (
+        "list all invoices",
+        "show me the invoice for acme corp",
+        "what is the balance due on invoice inv 001",
+        "which invoices are unpaid",
+        "mark invoice inv 002 as paid",
+        "create a new invoice for john smith for 500 dollars",
+        "update the due date on my invoice",
+        "delete invoice number inv 010",
+        "how much does the client owe us",
+        "get all invoices for a client",
+        "change the status of the invoice to overdue",
+        "what is the total amount billed to this customer",
+        "add a discount to the invoice",
+        "send me the outstanding invoices",
+    ),
+}
@@ -19,6 +19,8 @@ current_dir = Path(__file__).parent
 sys.path.insert(0, str(current_dir))
 
 from utils.voice_integration.server import run_server
+from utils.voice_integration.worker_supervisor import WorkerSupervisor
+from src.voice_based_aws_agent.config.config import FakeNovaSonicConfig, VoiceSessionConfig, VoiceServerConfig
 
 # Configure logging
 logging.basicConfig(
@@ -52,6 +54,71 @@ def main():
     parser.add_argument(
         "--port", type=int, default=8080, help="WebSocket server port (default: 8080)"
     )
+    parser.add_argument(
+        "--agent-pool-size",
+        type=int,
+        default=None,
+        help="Number of shared agent orchestrators built at startup; each runs one query at a time "
+             "(default: one per agent executor worker)",
+    )
+    parser.add_argument(
+        "--output-queue-policy",
+        choices=["block", "drop_oldest", "disconnect"],
+        default="block",
+        help="What to do when a client's output queue is full (default: block)",
+    )
+    parser.add_argument(
+        "--vad",
+        action="store_true",
+        help="Suppress silent microphone audio with server-side voice activity detection",
+    )
+    parser.add_argument(
+        "--hibernate-after",
+        type=int,
+        default=0,
+        help="Close the Nova Sonic stream of a session idle this many seconds, 0 disables (default: 0)",
+    )
+    parser.add_argument(
+        "--speculative-tools",
+        action="store_true",
+        help="Start read-only agent queries on the final user transcript, before Nova Sonic asks for the tool",
+    )
+    parser.add_argument(
+        "--response-cache-size",
+        type=int,
+        default=0,
+        help="Agent answers to read-only queries reused across sessions for a few seconds to an hour, "
+             "0 disables (default: 0)",
+    )
+    parser.add_argument(
+        "--stream-pool-size",
+        type=int,
+        default=0,
+        help="Nova Sonic streams kept open ahead of callers, primed with the default sessionStart "
+             "so clients' inference settings are ignored; 0 disables (default: 0)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Server processes sharing the port via SO_REUSEPORT (default: 1)",
+    )
+    parser.add_argument(
+        "--reuse-port",
+        action="store_true",
+        help="Bind with SO_REUSEPORT so a new server can start before this one drains",
+    )
+    parser.add_argument(
+        "--max-sessions",
+        type=int,
+        default=50,
+        help="Concurrent voice sessions per worker, 0 for no limit (default: 50)",
+    )
+    parser.add_argument(
+        "--fake-nova-sonic",
+        action="store_true",
+        help="Serve sessions from an in-process Nova Sonic stand-in with canned agent answers, for offline load tests",
+    )
 
     args = parser.parse_args()
 
@@ -65,19 +132,44 @@ def main():
     logger.info(f"AWS Region: {args.region}")
     logger.info(f"Voice: {args.voice}")
     logger.info(f"Server: {args.host}:{args.port}")
+    logger.info(f"Agent Pool Size: {args.agent_pool_size or 'one per agent executor worker'}")
+    logger.info(f"Workers: {args.workers}")
     logger.info(f"Frontend: http://localhost:3000")
     logger.info("=" * 60)
 
+    server_config = VoiceServerConfig(
+        stream_pool_size=args.stream_pool_size,
+        workers=args.workers,
+        reuse_port=args.reuse_port,
+        max_sessions=args.max_sessions,
+        fake_nova_sonic=FakeNovaSonicConfig() if args.fake_nova_sonic else None,
+    )
+    run_server_kwargs = dict(
+        profile_name=args.profile,
+        region=args.region,
+        host=args.host,
+        port=args.port,
+        agent_pool_size=args.agent_pool_size,
+        response_cache_size=args.response_cache_size,
+        session_config=VoiceSessionConfig(
+            output_queue_policy=args.output_queue_policy,
+            vad_enabled=args.vad,
+            hibernate_after_seconds=args.hibernate_after,
+            speculative_tools=args.speculative_tools,
+        ),
+        server_config=server_config,
+    )
+
     try:
-        # Run the server
-        asyncio.run(
-            run_server(
-                profile_name=args.profile,
-                region=args.region,
-                host=args.host,
-                port=args.port,
-            )
-        )
+        # Run the server, or a supervisor of several worker processes
+        if args.workers > 1:
+            WorkerSupervisor(
+                args.workers,
+                run_server_kwargs,
+                drain_timeout_seconds=server_config.drain_timeout_seconds,
+            ).run()
+        else:
+            asyncio.run(run_server(**run_server_kwargs))
     except KeyboardInterrupt:
         logger.info("Voice assistant stopped by user")
     except Exception as e:
@@ -0,0 +1,232 @@
+"""
+Process-wide metrics for the voice server.
+
+A small in-process registry of counters, gauges and histograms that sessions, agents and the
+server update. Values are keyed by label tuples so one metric can be broken down,
+e.g. by queue policy or agent name. The registry renders itself in the Prometheus
+text exposition format for scraping.
+"""
+
+import bisect
+import threading
+from typing import Dict, Tuple
+
+# Default histogram buckets in seconds, suited to voice and agent latencies
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Metric:
+    """Base class holding labelled values."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def get(self, **labels) -> float:
+        """Current value for the given labels (0 if never set)."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self):
+        """List of (labels dict, value) pairs."""
+        with self._lock:
+            items = list(self._values.items())
+        return [(dict(zip(self.labelnames, key)), value) for key, value in items]
+
+    def clear(self):
+        """Drop all label sets, e.g. before re-populating per-session gauges."""
+        with self._lock:
+            self._values.clear()
+
+    def render(self):
+        """Lines of the Prometheus text exposition format for this metric."""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+        samples = self.samples()
+        if not samples and not self.labelnames:
+            samples = [({}, 0)]
+        for labels, value in samples:
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """Increase the counter."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        """Set the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels):
+        """Increase the gauge."""
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels):
+        """Decrease the gauge."""
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets, with quantile estimates."""
+
+    kind = "histogram"
+
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels):
+        """Record one observation."""
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+                self._values[key] = state
+            state["counts"][bisect.bisect_left(self.buckets, value)] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def get(self, **labels) -> float:
+        """Number of observations for the given labels."""
+        state = self._values.get(self._key(labels))
+        return state["count"] if state else 0
+
+    def quantile(self, q: float, **labels):
+        """
+        Estimate a quantile by linear interpolation inside the matching bucket.
+
+        Returns:
+            The estimate, or None without observations
+        """
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            if not state or not state["count"]:
+                return None
+            counts = list(state["counts"])
+            total = state["count"]
+
+        rank = q * total
+        cumulative = 0
+        for index, count in enumerate(counts):
+            if count and cumulative + count >= rank:
+                lower = self.buckets[index - 1] if index > 0 else 0.0
+                if index == len(self.buckets):
+                    return lower
+                upper = self.buckets[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+
+    def samples(self):
+        """List of (labels dict, {"buckets", "sum", "count"}) pairs with cumulative bucket counts."""
+        with self._lock:
+            items = [(key, dict(state, counts=list(state["counts"]))) for key, state in self._values.items()]
+        result = []
+        for key, state in items:
+            cumulative, running = [], 0
+            for bound, count in zip(self.buckets + (float("inf"),), state["counts"]):
+                running += count
+                cumulative.append((bound, running))
+            result.append((dict(zip(self.labelnames, key)), {"buckets": cumulative, "sum": state["sum"], "count": state["count"]}))
+        return result
+
+    def render(self):
+        """Lines of the Prometheus text exposition format, with _bucket, _sum and _count series."""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        for labels, state in self.samples():
+            for bound, count in state["buckets"]:
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                lines.append(f"{self.name}_bucket{_format_labels(dict(labels, le=le))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registry of named metrics. Registering an existing name returns the same metric."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, cls, name, description, labelnames, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, description, labelnames, **kwargs)
+                self._metrics[name] = metric
+            elif not isinstance(metric, cls):
+                raise ValueError(f"Metric {name} already registered as {metric.kind}")
+            return metric
+
+    def counter(self, name: str, description: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        """Get or create a counter."""
+        return self._register(Counter, name, description, labelnames)
+
+    def gauge(self, name: str, description: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        """Get or create a gauge."""
+        return self._register(Gauge, name, description, labelnames)
+
+    def histogram(self, name: str, description: str, labelnames: Tuple[str, ...] = (), buckets=DEFAULT_BUCKETS) -> Histogram:
+        """Get or create a histogram."""
+        return self._register(Histogram, name, description, labelnames, buckets=buckets)
+
+    def metrics(self):
+        """All registered metrics."""
+        with self._lock:
+            return list(self._metrics.values())
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in sorted(self.metrics(), key=lambda m: m.name):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value) -> str:
+    value = float(value)
+    if value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+# Shared registry for the whole process
+REGISTRY = MetricsRegistry()
@@ -0,0 +1,206 @@
+"""
+Per-turn latency tracing for voice sessions.
+
+A turn starts when Nova Sonic finalises the caller's transcript and ends when the
+first audioOutput of the reply is forwarded to the client. When Nova Sonic calls a
+tool, audio before the tool result is a preamble ("let me check") and the reply is
+the first audio after the result. The session manager,
+the supervisor integration and the supervisor router mark stages on the turn's
+TurnTrace; the active trace reaches tool tasks and agent executor threads through
+a context variable. When a turn finishes, the time between consecutive stages is
+recorded in histograms, so p50/p95/p99 per span show where voice latency goes.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+
+from .metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# Turn stages in the order they happen; tool stages are absent on direct replies
+STAGES = (
+    "audio_in_last",
+    "transcript_final",
+    "tool_use",
+    "orchestrator_acquired",
+    "routing_decided",
+    "agent_done",
+    "tool_result_sent",
+    "first_audio_out",
+)
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+TURN_SPAN_SECONDS = REGISTRY.histogram(
+    "voice_turn_span_seconds",
+    "Time between consecutive stages of a voice turn",
+    ("span",),
+)
+TURN_LATENCY_SECONDS = REGISTRY.histogram(
+    "voice_turn_latency_seconds",
+    "Time from the caller's last audio to the first audio of the reply",
+    ("path",),
+)
+AGENT_TOOL_SECONDS = REGISTRY.histogram(
+    "voice_agent_tool_seconds",
+    "Duration of tool calls made by specialized agents",
+    ("agent", "tool"),
+)
+
+_current_turn = contextvars.ContextVar("current_turn", default=None)
+
+
+class TurnTrace:
+    """Timestamps (time.monotonic()) of the stages of one conversational turn."""
+
+    def __init__(self, audio_in_last=None):
+        """
+        Start a turn at the final user transcript.
+
+        Args:
+            audio_in_last: When the caller was last heard speaking before the transcript
+        """
+        self.marks = {}
+        self.attributes = {}
+        self.finished = False  # The reply is audible
+        self.recorded = False
+        if audio_in_last is not None:
+            self.marks["audio_in_last"] = audio_in_last
+        self.mark("transcript_final")
+
+    def mark(self, stage, when=None):
+        """Record the first time a stage is reached."""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown turn stage: {stage}")
+        if stage == "tool_use" and self.finished and not self.recorded:
+            # The audio so far was a preamble; the reply comes after the tool result
+            self.attributes["preamble_audio_out"] = self.marks.pop("first_audio_out")
+            self.finished = False
+        self.marks.setdefault(stage, when if when is not None else time.monotonic())
+
+    def spans(self):
+        """List of ("stage->stage", seconds) for consecutive recorded stages."""
+        reached = [stage for stage in STAGES if stage in self.marks]
+        return [
+            (f"{start}->{end}", self.marks[end] - self.marks[start])
+            for start, end in zip(reached, reached[1:])
+        ]
+
+    def finish(self, when=None):
+        """
+        Mark the first forwarded audio of the reply. Later calls do nothing.
+
+        Audio while a tool runs doesn't count; a tool turn finishes on the first audio
+        after its result was sent and is recorded right away. A direct turn is recorded
+        by close(), since a toolUse can still follow its first audio.
+        """
+        if self.finished or ("tool_use" in self.marks and "tool_result_sent" not in self.marks):
+            return
+        self.finished = True
+        self.mark("first_audio_out", when)
+        if "tool_use" in self.marks:
+            self._record()
+
+    def close(self):
+        """End the turn (next transcript or session end), recording it if the reply was heard."""
+        if self.finished:
+            self._record()
+
+    def _record(self):
+        """Record the spans and latency of a finished turn once."""
+        if self.recorded:
+            return
+        self.recorded = True
+
+        for span, seconds in self.spans():
+            TURN_SPAN_SECONDS.observe(seconds, span=span)
+
+        start = self.marks.get("audio_in_last", self.marks["transcript_final"])
+        path = "tool" if "tool_use" in self.marks else "direct"
+        TURN_LATENCY_SECONDS.observe(self.marks["first_audio_out"] - start, path=path)
+        logger.debug(f"Turn spans ({path}): {self.spans()}")
+
+
+def current_turn():
+    """The turn being traced in this context, or None."""
+    return _current_turn.get()
+
+
+def set_current_turn(trace):
+    """Make a turn the traced turn for this context (e.g. a tool task)."""
+    return _current_turn.set(trace)
+
+
+def mark(stage, **attributes):
+    """Mark a stage, and optionally attributes, on the current turn if one is traced."""
+    trace = _current_turn.get()
+    if trace is not None:
+        trace.mark(stage)
+        trace.attributes.update(attributes)
+
+
+def latency_quantiles(histogram=TURN_SPAN_SECONDS):
+    """
+    p50/p95/p99 for each label set of a latency histogram.
+
+    Returns:
+        dict: {labels tuple: {"p50": seconds, "p95": seconds, "p99": seconds}}
+    """
+    summary = {}
+    for labels, _ in histogram.samples():
+        summary[tuple(labels.values())] = {
+            f"p{int(q * 100)}": histogram.quantile(q, **labels) for q in QUANTILES
+        }
+    return summary
+
+
+try:
+    from strands.experimental.hooks import AfterToolInvocationEvent, BeforeToolInvocationEvent
+    from strands.hooks import AfterInvocationEvent, HookProvider
+except ImportError:  # Older strands without tool invocation hooks
+    AfterInvocationEvent = AfterToolInvocationEvent = BeforeToolInvocationEvent = None
+    HookProvider = object
+
+
+class ToolTimingHooks(HookProvider):
+    """Strands hook provider recording how long an agent's tool calls take."""
+
+    def __init__(self, agent_name):
+        """
+        Initialize the hooks.
+
+        Args:
+            agent_name: Agent label for the tool latency histogram
+        """
+        self.agent_name = agent_name
+        self._started = {}
+        self._lock = threading.Lock()
+
+    def register_hooks(self, registry, **kwargs):
+        """Subscribe to tool invocation events when this strands version has them."""
+        if BeforeToolInvocationEvent is None:
+            return
+        registry.add_callback(BeforeToolInvocationEvent, self._before_tool)
+        registry.add_callback(AfterToolInvocationEvent, self._after_tool)
+        registry.add_callback(AfterInvocationEvent, self._after_invocation)
+
+    def _before_tool(self, event):
+        with self._lock:
+            self._started[event.tool_use["toolUseId"]] = time.monotonic()
+
+    def _after_tool(self, event):
+        with self._lock:
+            started = self._started.pop(event.tool_use["toolUseId"], None)
+        if started is not None:
+            AGENT_TOOL_SECONDS.observe(
+                time.monotonic() - started, agent=self.agent_name, tool=event.tool_use["name"]
+            )
+
+    def _after_invocation(self, event):
+        # A later before-tool hook that raises (cancellation, read-only guard) ends the
+        # run without an after-tool event for that call; drop its start time here
+        with self._lock:
+            self._started.clear()
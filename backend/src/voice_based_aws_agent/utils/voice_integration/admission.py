@@ -0,0 +1,139 @@
+"""
+Admission control for voice sessions and tool executions.
+
+Every session holds a Bedrock stream and leases agents for its tool calls, so the
+process can only serve so many at once. New connections take a session slot
+before anything is opened for them. When all slots are taken, a few connections
+may wait briefly for one to free up; the rest are turned away at once with a
+"busy" event, so callers already talking keep their latency. Tool executions
+across all sessions are limited the same way by a shared ToolLimiter.
+"""
+
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from src.voice_based_aws_agent.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+# WebSocket close code for "try again later"
+BUSY_CLOSE_CODE = 1013
+
+ADMISSIONS = REGISTRY.counter(
+    "voice_admissions_total",
+    "Connection admission decisions",
+    ("result",),
+)
+ADMISSION_WAITING = REGISTRY.gauge(
+    "voice_admission_waiting",
+    "Connections waiting for a session slot",
+)
+ADMISSION_WAIT_SECONDS = REGISTRY.histogram(
+    "voice_admission_wait_seconds",
+    "Time admitted connections waited for a session slot",
+)
+TOOLS_RUNNING = REGISTRY.gauge(
+    "voice_tools_running",
+    "Tool executions currently running",
+)
+TOOL_WAIT_SECONDS = REGISTRY.histogram(
+    "voice_tool_wait_seconds",
+    "Time tool executions waited for a free slot",
+)
+
+
+def busy_event(reason, retry_after_ms):
+    """Event sent to a client that is turned away."""
+    return {"event": {"busy": {"reason": reason, "retryAfterMs": retry_after_ms}}}
+
+
+class AdmissionController:
+    """Limits concurrent sessions, with a short bounded wait queue."""
+
+    def __init__(self, max_sessions, queue_size=10, wait_seconds=2.0):
+        """
+        Initialize the controller.
+
+        Args:
+            max_sessions: Concurrent sessions allowed (0 or less for no limit)
+            queue_size: Connections allowed to wait for a slot at the same time
+            wait_seconds: Longest wait for a slot before the connection is rejected
+        """
+        self.max_sessions = max_sessions
+        self.queue_size = queue_size
+        self.wait_seconds = wait_seconds
+        self.active = 0
+        self.waiting = 0
+        self._slot_freed = asyncio.Condition()
+
+    def _has_slot(self):
+        return self.max_sessions <= 0 or self.active < self.max_sessions
+
+    async def acquire(self):
+        """
+        Take a session slot, waiting briefly if the server is full.
+
+        Returns:
+            str: None when admitted, otherwise the reason for rejecting the connection
+        """
+        if self._has_slot() and not self.waiting:
+            self.active += 1
+            ADMISSIONS.inc(result="admitted")
+            return None
+
+        if self.waiting >= self.queue_size:
+            ADMISSIONS.inc(result="rejected_queue_full")
+            return "Server is at capacity"
+
+        started = time.monotonic()
+        self.waiting += 1
+        ADMISSION_WAITING.set(self.waiting)
+        try:
+            async with self._slot_freed:
+                await asyncio.wait_for(self._slot_freed.wait_for(self._has_slot), self.wait_seconds)
+                self.active += 1
+        except asyncio.TimeoutError:
+            ADMISSIONS.inc(result="rejected_timeout")
+            return "Server is at capacity"
+        finally:
+            self.waiting -= 1
+            ADMISSION_WAITING.set(self.waiting)
+
+        ADMISSION_WAIT_SECONDS.observe(time.monotonic() - started)
+        ADMISSIONS.inc(result="admitted_after_wait")
+        return None
+
+    async def release(self):
+        """Free a session slot and wake one waiting connection."""
+        async with self._slot_freed:
+            self.active -= 1
+            self._slot_freed.notify()
+
+
+class ToolLimiter:
+    """Limits tool executions running at once across all sessions of the process."""
+
+    def __init__(self, max_concurrent):
+        """
+        Initialize the limiter.
+
+        Args:
+            max_concurrent: Tool executions allowed at once (0 or less for no limit)
+        """
+        self._semaphore = asyncio.Semaphore(max_concurrent) if max_concurrent > 0 else None
+
+    @asynccontextmanager
+    async def slot(self):
+        """Hold a tool execution slot for the duration of the block."""
+        started = time.monotonic()
+        if self._semaphore is not None:
+            await self._semaphore.acquire()
+        TOOL_WAIT_SECONDS.observe(time.monotonic() - started)
+        TOOLS_RUNNING.inc()
+        try:
+            yield
+        finally:
+            TOOLS_RUNNING.dec()
+            if self._semaphore is not None:
+                self._semaphore.release()
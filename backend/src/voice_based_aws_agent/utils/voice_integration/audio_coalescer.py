@@ -0,0 +1,93 @@
+"""
+Coalescing of small microphone chunks into larger audioInput events.
+
+The browser sends roughly 10 ms of audio per message. Sending each one as its
+own Bedrock event multiplies JSON encoding and stream send calls, so chunks are
+merged until a target duration is reached, the oldest buffered audio has
+waited for the maximum added latency, or the content they belong to ends.
+"""
+
+import time
+
+
+class AudioCoalescer:
+    """Merges consecutive PCM chunks of the same prompt/content into batches."""
+
+    def __init__(self, sample_rate=16000, target_ms=32, max_latency_ms=40):
+        """
+        Initialize the coalescer.
+
+        Args:
+            sample_rate: Sample rate of the 16-bit mono PCM in Hz
+            target_ms: Audio duration of a batch
+            max_latency_ms: Longest time the oldest buffered chunk may wait
+        """
+        self.target_bytes = max(2, sample_rate * 2 * target_ms // 1000)
+        self.max_latency = max_latency_ms / 1000
+
+        self._key = None
+        self._chunks = []
+        self._size = 0
+        self._first_enqueued_at = None
+
+        self.chunks_in = 0
+        self.batches_out = 0
+
+    @property
+    def pending(self):
+        """Whether audio is buffered."""
+        return bool(self._chunks)
+
+    def add(self, prompt_name, content_name, pcm, enqueued_at=None):
+        """
+        Buffer a chunk.
+
+        Args:
+            prompt_name: Prompt the audio belongs to
+            content_name: Audio content the audio belongs to
+            pcm: Raw PCM bytes
+            enqueued_at: time.monotonic() when the chunk was received
+
+        Returns:
+            list: Ready batches as (prompt_name, content_name, pcm) tuples
+        """
+        ready = []
+        key = (prompt_name, content_name)
+        if self._chunks and key != self._key:
+            ready.append(self._take())
+
+        if not self._chunks:
+            self._key = key
+            self._first_enqueued_at = enqueued_at if enqueued_at is not None else time.monotonic()
+
+        self._chunks.append(pcm)
+        self._size += len(pcm)
+        self.chunks_in += 1
+
+        if self._size >= self.target_bytes or self.time_until_flush() <= 0:
+            ready.append(self._take())
+        return ready
+
+    def time_until_flush(self, now=None):
+        """Seconds until buffered audio must be sent, or None if nothing is buffered."""
+        if not self._chunks:
+            return None
+        now = now if now is not None else time.monotonic()
+        return self._first_enqueued_at + self.max_latency - now
+
+    def flush(self):
+        """Return all buffered audio as batches."""
+        return [self._take()] if self._chunks else []
+
+    def flush_content(self, content_name):
+        """Return the buffered audio of an ending content, so it is sent before the contentEnd."""
+        return self.flush() if self._chunks and self._key[1] == content_name else []
+
+    def _take(self):
+        prompt_name, content_name = self._key
+        pcm = b"".join(self._chunks)
+        self._chunks = []
+        self._size = 0
+        self._first_enqueued_at = None
+        self.batches_out += 1
+        return prompt_name, content_name, pcm
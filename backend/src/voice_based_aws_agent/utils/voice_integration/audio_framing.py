@@ -0,0 +1,78 @@
+"""
+Binary WebSocket framing for audio.
+
+Clients that connect with ``?audio=binary`` exchange audio as binary frames
+instead of base64 text inside JSON events. Only the Bedrock-facing side of the
+server base64-encodes audio.
+
+Frame layout::
+
+    byte 0        frame type (AUDIO_INPUT_FRAME or AUDIO_OUTPUT_FRAME)
+    byte 1        length P of the prompt name
+    byte 2        length C of the content name
+    P bytes       prompt name (UTF-8)
+    C bytes       content name (UTF-8)
+    rest          raw 16-bit little-endian mono LPCM
+"""
+
+import struct
+
+AUDIO_INPUT_FRAME = 0x01
+AUDIO_OUTPUT_FRAME = 0x02
+
+_HEADER = struct.Struct("!BBB")
+_MAX_NAME_LENGTH = 255
+
+
+class AudioFrameError(ValueError):
+    """Raised when a binary audio frame is malformed."""
+
+
+def encode_audio_frame(frame_type, prompt_name, content_name, pcm):
+    """
+    Build a binary audio frame.
+
+    Args:
+        frame_type: AUDIO_INPUT_FRAME or AUDIO_OUTPUT_FRAME
+        prompt_name: Prompt name the audio belongs to
+        content_name: Content name (or contentId for output) the audio belongs to
+        pcm: Raw LPCM bytes
+
+    Returns:
+        bytes: The encoded frame
+    """
+    prompt = (prompt_name or "").encode("utf-8")
+    content = (content_name or "").encode("utf-8")
+    if len(prompt) > _MAX_NAME_LENGTH or len(content) > _MAX_NAME_LENGTH:
+        raise AudioFrameError("Prompt and content names must be at most 255 bytes")
+    return _HEADER.pack(frame_type, len(prompt), len(content)) + prompt + content + pcm
+
+
+def decode_audio_frame(frame):
+    """
+    Parse a binary audio frame.
+
+    Args:
+        frame: The received bytes
+
+    Returns:
+        tuple: (frame_type, prompt_name, content_name, pcm)
+    """
+    if len(frame) < _HEADER.size:
+        raise AudioFrameError("Audio frame shorter than its header")
+
+    frame_type, prompt_length, content_length = _HEADER.unpack_from(frame)
+    if frame_type not in (AUDIO_INPUT_FRAME, AUDIO_OUTPUT_FRAME):
+        raise AudioFrameError(f"Unknown audio frame type {frame_type}")
+
+    names_end = _HEADER.size + prompt_length + content_length
+    if len(frame) < names_end:
+        raise AudioFrameError("Audio frame truncated inside its header")
+
+    view = memoryview(frame)
+    try:
+        prompt_name = bytes(view[_HEADER.size:_HEADER.size + prompt_length]).decode("utf-8")
+        content_name = bytes(view[_HEADER.size + prompt_length:names_end]).decode("utf-8")
+    except UnicodeDecodeError as e:
+        raise AudioFrameError(f"Audio frame names aren't UTF-8: {e}") from e
+    return frame_type, prompt_name, content_name, bytes(view[names_end:])
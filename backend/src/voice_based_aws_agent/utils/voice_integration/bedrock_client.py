@@ -0,0 +1,95 @@
+"""
+Shared Bedrock runtime clients for Nova Sonic sessions.
+
+Building a BedrockRuntimeClient per WebSocket session repeats config and
+credential resolution and gives every session its own HTTP connection pool,
+so each caller pays a fresh TLS handshake to bedrock-runtime. Clients are
+instead created lazily once per (region, credentials) and shared by all
+sessions. When the environment credentials rotate, the next session gets a
+new client; sessions already streaming keep the client they started with.
+A client set with use_client (e.g. the fake Nova Sonic) replaces all of them.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient
+from aws_sdk_bedrock_runtime.config import Config, HTTPAuthSchemeResolver, SigV4AuthScheme
+from smithy_aws_core.identity.environment import EnvironmentCredentialsResolver
+from smithy_core.shapes import ShapeID
+from src.voice_based_aws_agent.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+BEDROCK_CLIENTS_CREATED = REGISTRY.counter(
+    "voice_bedrock_clients_created_total",
+    "Bedrock runtime clients created for Nova Sonic sessions",
+)
+
+_CREDENTIAL_VARIABLES = ("AWS_ACCESS_KEY_ID", "AWS_SECRET_ACCESS_KEY", "AWS_SESSION_TOKEN")
+
+_clients = {}
+_lock = threading.Lock()
+_override = None
+
+
+def _credentials_fingerprint():
+    """Hash of the environment credentials, so rotation can be detected without keeping secrets around."""
+    digest = hashlib.sha256()
+    for name in _CREDENTIAL_VARIABLES:
+        digest.update(os.environ.get(name, "").encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def _create_client(region):
+    config = Config(
+        endpoint_uri=f"https://bedrock-runtime.{region}.amazonaws.com",
+        region=region,
+        aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
+        auth_scheme_resolver=HTTPAuthSchemeResolver(),
+        auth_schemes={ShapeID("aws.auth#sigv4"): SigV4AuthScheme(service="bedrock")}
+    )
+    return BedrockRuntimeClient(config=config)
+
+
+def get_bedrock_client(region):
+    """
+    Get the shared Bedrock runtime client for a region.
+
+    Args:
+        region: AWS region of the bedrock-runtime endpoint
+
+    Returns:
+        BedrockRuntimeClient for the region and the current environment credentials
+    """
+    if _override is not None:
+        return _override
+    key = (region, _credentials_fingerprint())
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            # Credentials rotated: stop handing out clients built with the old ones
+            for stale_key in [k for k in _clients if k[0] == region]:
+                del _clients[stale_key]
+                logger.info(f"Credentials changed, replacing Bedrock client for {region}")
+
+            client = _create_client(region)
+            _clients[key] = client
+            BEDROCK_CLIENTS_CREATED.inc()
+            logger.info(f"Created shared Bedrock runtime client for {region}")
+        return client
+
+
+def use_client(client):
+    """
+    Serve every region from one client instead of Bedrock.
+
+    Args:
+        client: Object with invoke_model_with_bidirectional_stream, or None to use Bedrock again
+    """
+    global _override
+    _override = client
+    if client is not None:
+        logger.info(f"Nova Sonic streams are served by {type(client).__name__}")
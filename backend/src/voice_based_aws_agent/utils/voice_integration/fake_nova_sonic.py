@@ -0,0 +1,331 @@
+"""
+In-process stand-in for the Nova Sonic bidirectional stream.
+
+FakeNovaSonicClient has the invoke_model_with_bidirectional_stream call of the
+Bedrock runtime client and returns streams that speak the event protocol built
+by S2sEvent, so the whole server pipeline can be load tested without network
+access or AWS credentials. Each stream follows a FakeNovaSonicConfig script:
+after a number of audioInput chunks it emits the caller's transcript, a toolUse
+(waiting for the toolResult), then an ASSISTANT transcript and synthetic
+audioOutput paced at playback speed. Streams can also be told to fail after a
+number of audio chunks, to exercise error handling and stream rollover.
+
+FakeAgentOrchestratorPool stands in for the agent layer in the same tests: its
+orchestrators answer every tool query with the script's canned answer after
+blocking an agent executor thread, so no Bedrock model or AWS tool is called.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import time
+import uuid
+from aws_sdk_bedrock_runtime.models import BidirectionalOutputPayloadPart, InvokeModelWithBidirectionalStreamOutputChunk
+from src.voice_based_aws_agent.agents.agent_executor import run_agent
+from src.voice_based_aws_agent.agents.orchestrator_pool import AgentOrchestratorPool
+from src.voice_based_aws_agent.config.config import FakeNovaSonicConfig
+from src.voice_based_aws_agent.utils import tracing
+
+logger = logging.getLogger(__name__)
+
+# Nova Sonic audio output format: 24 kHz, 16-bit mono LPCM
+OUTPUT_SAMPLE_RATE = 24000
+
+# Agent the canned supervisor reports routing to
+FAKE_AGENT = "FakeAgent"
+
+_END = object()
+
+
+class FakeNovaSonicError(Exception):
+    """Error raised on a fake stream's output, named like the Bedrock exception it stands for."""
+
+
+class _FakeInputStream:
+    """Input side of a fake stream: accepts the chunks S2sSessionManager sends."""
+
+    def __init__(self, stream):
+        self._stream = stream
+        self.closed = False
+
+    async def send(self, chunk):
+        if self.closed:
+            raise FakeNovaSonicError("Input stream is closed")
+        self._stream._handle(json.loads(chunk.value.bytes_))
+
+    async def close(self):
+        if not self.closed:
+            self.closed = True
+            self._stream._finish()
+
+
+class _FakeOutputStream:
+    """Output side of a fake stream: hands out the scripted events in order."""
+
+    def __init__(self, queue):
+        self._queue = queue
+
+    async def receive(self):
+        item = await self._queue.get()
+        if item is _END:
+            self._queue.put_nowait(_END)  # Later receives end too
+            raise StopAsyncIteration()
+        if isinstance(item, Exception):
+            raise item
+        return InvokeModelWithBidirectionalStreamOutputChunk(
+            value=BidirectionalOutputPayloadPart(bytes_=item.encode('utf-8'))
+        )
+
+
+class FakeNovaSonicStream:
+    """One scripted Nova Sonic session."""
+
+    def __init__(self, script):
+        """
+        Initialize the stream.
+
+        Args:
+            script: FakeNovaSonicConfig driving the stream's responses
+        """
+        self.script = script
+        self.session_id = str(uuid.uuid4())
+        self.input_stream = _FakeInputStream(self)
+        self._output = asyncio.Queue()
+        self._output_stream = _FakeOutputStream(self._output)
+
+        self.prompt_name = None
+        self.session_started = False
+        self.ended = False
+        self.audio_chunks = 0  # audioInput chunks received on this stream
+        self.received = []  # Names of the input events received, in order
+        self._utterance_chunks = 0
+        self._responding = None  # Task answering the current utterance
+        self._tool_use_id = None
+        self._tool_results = {}  # contentName of a TOOL content -> toolUseId
+        self._tool_result = asyncio.Event()
+
+        chunk_samples = OUTPUT_SAMPLE_RATE * script.audio_chunk_ms // 1000
+        self._audio_chunk = base64.b64encode(bytes(chunk_samples * 2)).decode('utf-8')
+
+    async def await_output(self):
+        """Same shape as the SDK's duplex stream: (initial output, output stream)."""
+        return None, self._output_stream
+
+    def _emit(self, event_name, body):
+        if not self.ended:
+            self._output.put_nowait(json.dumps({"event": {event_name: body}}))
+
+    def _fail(self, error):
+        """End the output with an error, like a Bedrock stream failure."""
+        if self.ended:
+            return
+        self.ended = True
+        self._cancel_response()
+        self._output.put_nowait(_END if error == "end" else FakeNovaSonicError(error))
+
+    def _finish(self):
+        if not self.ended:
+            self.ended = True
+            self._cancel_response()
+            self._output.put_nowait(_END)
+
+    def _cancel_response(self):
+        if self._responding and not self._responding.done():
+            self._responding.cancel()
+
+    def _handle(self, event_data):
+        """Apply one input event to the session."""
+        event_name, body = next(iter(event_data["event"].items()))
+        if self.ended:
+            return
+        self.received.append(event_name)
+
+        if event_name == 'sessionStart':
+            self.session_started = True
+        elif not self.session_started:
+            self._fail(f"ValidationException: {event_name} received before sessionStart")
+        elif event_name == 'promptStart':
+            self.prompt_name = body.get('promptName')
+        elif self.prompt_name is None and event_name != 'sessionEnd':
+            self._fail(f"ValidationException: {event_name} received before promptStart")
+        elif event_name == 'contentStart' and body.get('type') == 'TOOL':
+            tool_use_id = body.get('toolResultInputConfiguration', {}).get('toolUseId')
+            self._tool_results[body.get('contentName')] = tool_use_id
+        elif event_name == 'toolResult':
+            if self._tool_results.get(body.get('contentName')) != self._tool_use_id:
+                self._fail("ValidationException: toolResult for an unknown toolUseId")
+                return
+            self._tool_result.set()
+        elif event_name == 'audioInput':
+            self._audio_input()
+        elif event_name == 'sessionEnd':
+            self._finish()
+
+    def _audio_input(self):
+        self.audio_chunks += 1
+        if self.script.error_after_chunks and self.audio_chunks >= self.script.error_after_chunks:
+            self._fail(self.script.error)
+            return
+        # Audio received while answering is ignored, there is no barge-in
+        if self._responding and not self._responding.done():
+            return
+        self._utterance_chunks += 1
+        if self._utterance_chunks >= self.script.turn_after_chunks:
+            self._utterance_chunks = 0
+            self._responding = asyncio.create_task(self._respond())
+
+    async def _respond(self):
+        """Answer one utterance: transcript, optional toolUse, then the spoken reply."""
+        script = self.script
+        completion_id = str(uuid.uuid4())
+        self._emit('completionStart', {"sessionId": self.session_id, "promptName": self.prompt_name, "completionId": completion_id})
+        self._text('USER', script.transcript, completion_id)
+        await asyncio.sleep(script.response_delay_ms / 1000)
+
+        if script.tool_name:
+            content_id = str(uuid.uuid4())
+            self._tool_use_id = str(uuid.uuid4())
+            self._tool_result.clear()
+            self._content_start('TOOL', 'TOOL', content_id, completion_id)
+            self._emit('toolUse', {
+                "sessionId": self.session_id,
+                "promptName": self.prompt_name,
+                "completionId": completion_id,
+                "contentId": content_id,
+                "role": "TOOL",
+                "toolName": script.tool_name,
+                "toolUseId": self._tool_use_id,
+                "content": json.dumps({"query": script.tool_query}),
+            })
+            self._content_end('TOOL', content_id, completion_id, 'TOOL_USE')
+            await self._tool_result.wait()
+            await asyncio.sleep(script.response_delay_ms / 1000)
+
+        self._text('ASSISTANT', script.reply_text, completion_id)
+        await self._speak(completion_id)
+        self._emit('completionEnd', {"sessionId": self.session_id, "promptName": self.prompt_name, "completionId": completion_id, "stopReason": "END_TURN"})
+
+    def _text(self, role, text, completion_id):
+        content_id = str(uuid.uuid4())
+        self._content_start('TEXT', role, content_id, completion_id)
+        self._emit('textOutput', {
+            "sessionId": self.session_id,
+            "promptName": self.prompt_name,
+            "completionId": completion_id,
+            "contentId": content_id,
+            "role": role,
+            "content": text,
+        })
+        self._content_end('TEXT', content_id, completion_id, 'END_TURN')
+
+    async def _speak(self, completion_id):
+        """Send the reply audio, one chunk per audio_chunk_ms when pacing in real time."""
+        script = self.script
+        content_id = str(uuid.uuid4())
+        self._content_start('AUDIO', 'ASSISTANT', content_id, completion_id)
+        started = time.monotonic()
+        for index in range(max(1, script.reply_audio_ms // script.audio_chunk_ms)):
+            if script.realtime:
+                await asyncio.sleep(max(0, started + index * script.audio_chunk_ms / 1000 - time.monotonic()))
+            self._emit('audioOutput', {
+                "sessionId": self.session_id,
+                "promptName": self.prompt_name,
+                "completionId": completion_id,
+                "contentId": content_id,
+                "content": self._audio_chunk,
+            })
+        self._content_end('AUDIO', content_id, completion_id, 'END_TURN')
+
+    def _content_start(self, content_type, role, content_id, completion_id):
+        self._emit('contentStart', {
+            "sessionId": self.session_id,
+            "promptName": self.prompt_name,
+            "completionId": completion_id,
+            "contentId": content_id,
+            "type": content_type,
+            "role": role,
+            "additionalModelFields": json.dumps({"generationStage": "FINAL"}),
+        })
+
+    def _content_end(self, content_type, content_id, completion_id, stop_reason):
+        self._emit('contentEnd', {
+            "sessionId": self.session_id,
+            "promptName": self.prompt_name,
+            "completionId": completion_id,
+            "contentId": content_id,
+            "type": content_type,
+            "stopReason": stop_reason,
+        })
+
+
+class FakeNovaSonicClient:
+    """Drop-in for the shared Bedrock runtime client that opens FakeNovaSonicStreams."""
+
+    def __init__(self, script=None):
+        """
+        Initialize the client.
+
+        Args:
+            script: FakeNovaSonicConfig for every stream, defaults when None
+        """
+        self.script = script or FakeNovaSonicConfig()
+        self.streams_opened = 0
+
+    async def invoke_model_with_bidirectional_stream(self, operation_input, plugins=None):
+        """Open a scripted stream; the model id in operation_input is ignored."""
+        self.streams_opened += 1
+        return FakeNovaSonicStream(self.script)
+
+
+class FakeAgentOrchestrator:
+    """Canned supervisor: answers every query with the script's answer, no models or tools."""
+
+    def __init__(self, script):
+        """
+        Initialize the orchestrator.
+
+        Args:
+            script: FakeNovaSonicConfig with the answer and how long it takes
+        """
+        self.script = script
+        self.specialized_agents = {}
+
+    async def process_query(self, query):
+        """Answer a query on the agent executor, like the real supervisor."""
+        tracing.mark("routing_decided", agent=FAKE_AGENT)
+        answer = await run_agent(self._answer, query)
+        tracing.mark("agent_done")
+        return answer
+
+    def _answer(self, query):
+        time.sleep(self.script.agent_delay_ms / 1000)
+        return self.script.agent_answer
+
+    def shutdown(self):
+        """Nothing to release."""
+
+
+class FakeAgentOrchestratorPool(AgentOrchestratorPool):
+    """AgentOrchestratorPool of FakeAgentOrchestrators; building them needs no AWS access."""
+
+    def __init__(self, script=None, size: int = 2):
+        """
+        Initialize the pool.
+
+        Args:
+            script: FakeNovaSonicConfig for every orchestrator, defaults when None
+            size: Number of orchestrators to build
+        """
+        super().__init__(size=size)
+        self.script = script or FakeNovaSonicConfig()
+
+    def start(self):
+        """Build the canned orchestrators."""
+        if self._orchestrators:
+            return
+        for _ in range(self.size):
+            orchestrator = FakeAgentOrchestrator(self.script)
+            self._orchestrators.append(orchestrator)
+            self._available.put_nowait(orchestrator)
+        logger.info(f"Fake agent orchestrator pool ready with {self.size} orchestrators")
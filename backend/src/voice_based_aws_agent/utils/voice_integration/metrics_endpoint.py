@@ -0,0 +1,128 @@
+"""
+HTTP metrics and health endpoints for the voice WebSocket server.
+
+The endpoints are answered from the WebSocket server's process_request hook, so
+they share its host and port: GET /metrics returns the process registry in the
+Prometheus text format and GET /health a small JSON status. Any other path
+continues with the WebSocket handshake.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from http import HTTPStatus
+from src.voice_based_aws_agent.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+METRICS_PATH = "/metrics"
+HEALTH_PATH = "/health"
+
+ACTIVE_SESSIONS = REGISTRY.gauge(
+    "voice_active_sessions",
+    "Voice sessions with an open WebSocket",
+)
+SESSION_QUEUE_DEPTH = REGISTRY.gauge(
+    "voice_session_queue_depth",
+    "Items waiting in the audio input or output queues of all sessions",
+    ("queue",),
+)
+SESSION_QUEUE_DEPTH_MAX = REGISTRY.gauge(
+    "voice_session_queue_depth_max",
+    "Items waiting in the fullest session's audio input or output queue",
+    ("queue",),
+)
+WEBSOCKET_EVENTS = REGISTRY.counter(
+    "voice_websocket_events_total",
+    "WebSocket messages received from or sent to clients",
+    ("direction",),
+)
+WEBSOCKET_BYTES = REGISTRY.counter(
+    "voice_websocket_bytes_total",
+    "WebSocket payload bytes received from or sent to clients",
+    ("direction",),
+)
+EVENT_LOOP_LAG = REGISTRY.gauge(
+    "voice_event_loop_lag_seconds",
+    "Most recent delay of a timer callback on the event loop",
+)
+EVENT_LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "voice_event_loop_lag_distribution_seconds",
+    "Distribution of event loop timer delays",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+
+# Live session managers by session id, read when /metrics is scraped
+_sessions = {}
+
+
+def register_session(session_id, stream_manager):
+    """Track a session for the active session count and queue depth gauges."""
+    _sessions[session_id] = stream_manager
+    ACTIVE_SESSIONS.set(len(_sessions))
+
+
+def unregister_session(session_id):
+    """Stop tracking a session."""
+    _sessions.pop(session_id, None)
+    ACTIVE_SESSIONS.set(len(_sessions))
+
+
+def active_session_count():
+    """Number of tracked sessions."""
+    return len(_sessions)
+
+
+def update_session_gauges():
+    """Refresh the queue depths, summed over sessions and of the fullest session."""
+    stream_managers = list(_sessions.values())
+    for queue, depths in (
+        ("input", [stream_manager.audio_input_queue.qsize() for stream_manager in stream_managers]),
+        ("output", [stream_manager.output_queue.qsize() for stream_manager in stream_managers]),
+    ):
+        SESSION_QUEUE_DEPTH.set(sum(depths), queue=queue)
+        SESSION_QUEUE_DEPTH_MAX.set(max(depths, default=0), queue=queue)
+
+
+def record_event(direction, payload):
+    """Count one WebSocket message and its size ("in" or "out")."""
+    WEBSOCKET_EVENTS.inc(direction=direction)
+    # Transcripts can hold non-ASCII text; isascii() is a flag check, so ASCII frames skip encoding
+    if isinstance(payload, str) and not payload.isascii():
+        payload = payload.encode("utf-8")
+    WEBSOCKET_BYTES.inc(len(payload), direction=direction)
+
+
+async def monitor_event_loop_lag(interval=0.5):
+    """Measure how late a periodic timer fires; a busy or blocked loop shows up as lag."""
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(interval)
+        lag = max(0.0, time.monotonic() - started - interval)
+        EVENT_LOOP_LAG.set(lag)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+
+
+def health_status():
+    """Body of the /health response."""
+    hibernating = sum(1 for stream_manager in list(_sessions.values()) if stream_manager.hibernating)
+    return {"status": "ok", "active_sessions": active_session_count(), "hibernating_sessions": hibernating}
+
+
+async def process_request(path, request_headers):
+    """
+    websockets process_request hook serving the metrics and health endpoints.
+
+    Returns:
+        (status, headers, body) for /metrics and /health, None to continue the handshake
+    """
+    route = path.split("?", 1)[0]
+    if route == METRICS_PATH:
+        update_session_gauges()
+        body = REGISTRY.render().encode("utf-8")
+        return HTTPStatus.OK, [("Content-Type", "text/plain; version=0.0.4; charset=utf-8")], body
+    if route == HEALTH_PATH:
+        body = json.dumps(health_status()).encode("utf-8")
+        return HTTPStatus.OK, [("Content-Type", "application/json")], body
+    return None
@@ -110,6 +110,22 @@ class S2sEvent:
             }
         }
 
+    @staticmethod
+    def content_start_history(prompt_name, content_name, role):
+        """Create a content start event for a replayed USER or ASSISTANT turn."""
+        return {
+            "event": {
+                "contentStart": {
+                    "promptName": prompt_name,
+                    "contentName": content_name,
+                    "type": "TEXT",
+                    "interactive": True,
+                    "role": role,
+                    "textInputConfiguration": {"mediaType": "text/plain"},
+                }
+            }
+        }
+
     @staticmethod
     def text_input(prompt_name, content_name, system_prompt=DEFAULT_SYSTEM_PROMPT):
         """Create a text input event."""
@@ -1,16 +1,25 @@
 import asyncio
 import json
 import base64
+import re
 import warnings
 import uuid
 from .s2s_events import S2sEvent
 import time
-from aws_sdk_bedrock_runtime.client import BedrockRuntimeClient, InvokeModelWithBidirectionalStreamOperationInput
+from aws_sdk_bedrock_runtime.client import InvokeModelWithBidirectionalStreamOperationInput
 from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInputChunk, BidirectionalInputPayloadPart
-from aws_sdk_bedrock_runtime.config import Config, HTTPAuthSchemeResolver, SigV4AuthScheme
-from smithy_aws_core.identity.environment import EnvironmentCredentialsResolver
-from smithy_core.shapes import ShapeID
+from collections import Counter, deque
 from .supervisor_agent_integration import SupervisorAgentIntegration
+from .vad import EnergyVAD
+from .audio_coalescer import AudioCoalescer
+from .bedrock_client import get_bedrock_client
+from .stream_pool import send_event
+from .admission import busy_event
+from .speculation import ToolSpeculator
+from src.voice_based_aws_agent.config.config import VoiceSessionConfig
+from src.voice_based_aws_agent.utils.metrics import REGISTRY
+from src.voice_based_aws_agent.utils.tracing import TurnTrace, set_current_turn
+from src.voice_based_aws_agent.agents.response_cache import read_only
 
 # Suppress warnings
 warnings.filterwarnings("ignore")
@@ -22,45 +31,191 @@ def debug_print(message):
     if DEBUG:
         print(message)
 
+QUEUE_POLICY_EVENTS = REGISTRY.counter(
+    "voice_queue_policy_events_total",
+    "Times a session queue limit policy fired",
+    ("policy",),
+)
+
+VAD_CHUNKS = REGISTRY.counter(
+    "voice_vad_chunks_total",
+    "Input audio chunks forwarded or suppressed by voice activity detection",
+    ("decision",),
+)
+
+AUDIO_INPUT_EVENTS = REGISTRY.counter(
+    "voice_audio_input_events_total",
+    "audioInput events sent to Bedrock",
+)
+
+TIME_TO_FIRST_RESPONSE = REGISTRY.histogram(
+    "voice_time_to_first_response_seconds",
+    "Time from a caller connecting to the first Nova Sonic output event",
+    ("stream",),
+)
+
+STREAM_ROLLOVERS = REGISTRY.counter(
+    "voice_stream_rollovers_total",
+    "Nova Sonic stream replacements within a live session",
+    ("reason", "result"),
+)
+
+STREAM_ROLLOVER_SECONDS = REGISTRY.histogram(
+    "voice_stream_rollover_seconds",
+    "Time to open and prime a replacement Nova Sonic stream",
+)
+
+BEDROCK_STREAM_ERRORS = REGISTRY.counter(
+    "voice_bedrock_stream_errors_total",
+    "Nova Sonic streams that ended with an error or unexpectedly",
+    ("error",),
+)
+
+TOOL_USE_SECONDS = REGISTRY.histogram(
+    "voice_tool_use_seconds",
+    "Time from dispatching a Nova Sonic toolUse to sending its result",
+    ("tool",),
+)
+
+TOOL_USES_CANCELLED = REGISTRY.counter(
+    "voice_tool_uses_cancelled_total",
+    "Running tool uses cancelled because the caller hung up or interrupted",
+    ("reason",),
+)
+
+HIBERNATING_SESSIONS = REGISTRY.gauge(
+    "voice_hibernating_sessions",
+    "Connected sessions whose Nova Sonic stream is closed while they are idle",
+)
+
+SESSION_HIBERNATIONS = REGISTRY.counter(
+    "voice_session_hibernations_total",
+    "Idle sessions closing their Nova Sonic stream, and waking up again",
+    ("event",),
+)
+
+# Matches the event type at the start of a Bedrock output event without parsing the payload
+EVENT_TYPE_PATTERN = re.compile(r'\s*\{\s*"event"\s*:\s*\{\s*"(\w+)"')
+
+def peek_event_type(response_data):
+    """Return the event type of a serialized output event, or None if it can't be read cheaply."""
+    match = EVENT_TYPE_PATTERN.match(response_data)
+    return match.group(1) if match else None
+
+def add_timestamp(response_data, timestamp):
+    """Append a timestamp field to a serialized JSON object."""
+    return f'{response_data.rstrip()[:-1]},"timestamp":{timestamp}}}'
+
 
 class S2sSessionManager:
     """Simple S2S Session Manager """
     
-    def __init__(self, model_id='amazon.nova-sonic-v1:0', region='us-east-1', config=None):
+    def __init__(self, model_id='amazon.nova-sonic-v1:0', region='us-east-1', config=None, orchestrator_pool=None, session_config=None, stream_pool=None, tool_limiter=None, admission=None):
         """Initialize the stream manager."""
         self.model_id = model_id
         self.region = region
+        self.session_config = session_config or VoiceSessionConfig()
+        self.stream_pool = stream_pool
+        self.tool_limiter = tool_limiter  # Shared cap on concurrent tool executions
+        self.admission = admission  # Session slots; the caller took one for this session
+        self.holds_session_slot = True
+        self.created_at = time.monotonic()
         
-        # Audio and output queues
-        self.audio_input_queue = asyncio.Queue()
-        self.output_queue = asyncio.Queue()
+        # Bounded audio and output queues; output holds event dicts or pre-serialized audioOutput JSON strings
+        self.audio_input_queue = asyncio.Queue(maxsize=self.session_config.input_queue_max_size)
+        self.output_queue = asyncio.Queue(maxsize=self.session_config.output_queue_max_size)
+        # How often each queue limit policy fired for this session
+        self.queue_stats = Counter()
+        self.disconnect_reason = None
+        
+        # Optional voice activity detection on microphone audio
+        self.vad = None
+        if self.session_config.vad_enabled:
+            self.vad = EnergyVAD(
+                energy_threshold=self.session_config.vad_energy_threshold,
+                hangover_ms=self.session_config.vad_hangover_ms,
+                preroll_ms=self.session_config.vad_preroll_ms,
+                keepalive_ms=self.session_config.vad_keepalive_ms
+            )
+        
+        # Speech detection dates turn traces and drives hibernation and rollover: an idle
+        # session closes its stream and reopens it when speech resumes
+        self.speech_detector = self.vad
+        if self.speech_detector is None:
+            self.speech_detector = EnergyVAD(energy_threshold=self.session_config.vad_energy_threshold)
+        self.last_speech_at = None  # Last microphone chunk classified as speech
+        self.hibernating = False
+        self.hibernation_task = None
+        self.wake_lock = asyncio.Lock()
+        self.last_activity_at = time.monotonic()  # Last speech or non-audio client event
+        self.woke_at = 0.0
+        self.next_wake_at = 0.0
+        self.hibernation_preroll = deque()  # (queue item, pcm) heard while hibernating
+        self.hibernation_preroll_ms = 0.0
+        
+        # Optional merging of small microphone chunks into larger audioInput events
+        self.coalescer = None
+        if self.session_config.audio_coalesce_target_ms > 0:
+            self.coalescer = AudioCoalescer(
+                target_ms=self.session_config.audio_coalesce_target_ms,
+                max_latency_ms=self.session_config.audio_coalesce_max_latency_ms
+            )
         
         self.response_task = None
         self.stream = None
         self.is_active = False
         self.bedrock_client = None
+        self.session_started = False  # sessionStart already sent on the stream
+        self.stream_source = None  # "pooled" or "fresh"
+        self.first_response_received = False
+        
+        # Stream rollover: replacement streams replay the setup events and recent turns
+        self.stream_opened_at = None
+        self.last_output_at = time.monotonic()
+        self.rollover_task = None
+        self.rollover_lock = asyncio.Lock()
+        self.recovered_without_output = False
+        self.session_start_event = None
+        self.prompt_start_event = None
+        self.audio_content_start_event = None
+        self.system_content_name = None
+        self.system_events = []
+        self.history = deque(maxlen=max(1, self.session_config.rollover_history_messages * 4))
+        self.speculative_content_ids = set()
+        
+        # Latency trace of the current turn, started at the final user transcript
+        self.turn = None
         
         # Session information
         self.prompt_name = None  # Will be set from frontend
         self.content_name = None  # Will be set from frontend
         self.audio_content_name = None  # Will be set from frontend
-        self.toolUseContent = ""
-        self.toolUseId = ""
-        self.toolName = ""
         
-        # Initialize the Supervisor Agent integration
-        self.supervisor_agent = SupervisorAgentIntegration(config)
+        # Tool uses received but not yet dispatched, keyed by toolUseId
+        self.pending_tool_uses = {}
+        # Running tool executions keyed by toolUseId
+        self.tool_tasks = {}
+        # Why a running tool execution was cancelled, keyed by toolUseId
+        self.tool_cancel_reasons = {}
+        # Keeps the three result events of one tool from interleaving with another's
+        self.tool_result_lock = asyncio.Lock()
+        
+        # Initialize the Supervisor Agent integration (leases from the shared pool when given)
+        self.supervisor_agent = SupervisorAgentIntegration(config, orchestrator_pool=orchestrator_pool)
+        
+        # Optional agent queries started on the final user transcript, picked up by the matching toolUse.
+        # They run against a fork of the pooled session's history, so they need the pool.
+        self.speculator = None
+        if self.session_config.speculative_tools and self.supervisor_agent.conversation_state is not None:
+            self.speculator = ToolSpeculator(
+                self._speculative_query,
+                min_overlap=self.session_config.speculation_min_overlap,
+                ttl_seconds=self.session_config.speculation_ttl_seconds
+            )
 
     def _initialize_client(self):
-        """Initialize the Bedrock client."""
-        config = Config(
-            endpoint_uri=f"https://bedrock-runtime.{self.region}.amazonaws.com",
-            region=self.region,
-            aws_credentials_identity_resolver=EnvironmentCredentialsResolver(),
-            auth_scheme_resolver=HTTPAuthSchemeResolver(),
-            auth_schemes={ShapeID("aws.auth#sigv4"): SigV4AuthScheme(service="bedrock")}
-        )
-        self.bedrock_client = BedrockRuntimeClient(config=config)
+        """Get the shared Bedrock client for this region."""
+        self.bedrock_client = get_bedrock_client(self.region)
 
     async def initialize_stream(self):
         """Initialize the bidirectional stream with Bedrock."""
@@ -76,21 +231,19 @@ class S2sSessionManager:
             # Ensure client is initialized
             if not self.bedrock_client:
                 raise RuntimeError("Bedrock client not initialized")
-                
-            # Initialize the stream
-            self.stream = await self.bedrock_client.invoke_model_with_bidirectional_stream(
-                InvokeModelWithBidirectionalStreamOperationInput(model_id=self.model_id)
-            )
+            
+            self.stream, self.stream_source, self.stream_opened_at = await self._open_stream()
+            self.session_started = self.stream_source == 'pooled'
             self.is_active = True
             
             # Start listening for responses
-            self.response_task = asyncio.create_task(self._process_responses())
+            self.response_task = asyncio.create_task(self._process_responses(self.stream))
 
             # Start processing audio input
             asyncio.create_task(self._process_audio_input())
             
-            # Wait a bit to ensure everything is set up
-            await asyncio.sleep(0.1)
+            # Replace the stream before Nova Sonic's connection limit ends it, release it when idle
+            self._start_stream_monitors()
             
             debug_print("Stream initialized successfully")
             return self
@@ -99,13 +252,50 @@ class S2sSessionManager:
             print(f"Failed to initialize stream: {str(e)}")
             raise
     
+    async def _open_stream(self):
+        """
+        Get a stream, preferring a pre-opened one that already has sessionStart.
+
+        Returns:
+            (stream, "pooled" or "fresh", time.monotonic() when it was opened)
+        """
+        stream, opened_at = self.stream_pool.claim() if self.stream_pool else (None, None)
+        if stream:
+            return stream, 'pooled', opened_at
+        stream = await self.bedrock_client.invoke_model_with_bidirectional_stream(
+            InvokeModelWithBidirectionalStreamOperationInput(model_id=self.model_id)
+        )
+        return stream, 'fresh', time.monotonic()
+    
     async def send_raw_event(self, event_data):
         """Send a raw event to the Bedrock stream."""
         try:
+            if "audioInput" not in event_data["event"]:
+                self.last_activity_at = time.monotonic()
+            if self.hibernating and not await self._wake_for_event(event_data):
+                return
             if not self.stream or not self.is_active:
                 debug_print("Stream not initialized or closed")
                 return
             
+            self._record_setup_event(event_data)
+            
+            # A pooled stream already carries sessionStart
+            if "sessionStart" in event_data["event"]:
+                if self.session_started:
+                    if event_data != S2sEvent.session_start():
+                        print("Pooled stream was started with the default sessionStart, "
+                              "ignoring the client's inference configuration")
+                    debug_print("Session already started, skipping client sessionStart")
+                    return
+                self.session_started = True
+            
+            # Buffered microphone audio of an ending content goes out before its contentEnd
+            if "contentEnd" in event_data["event"] and self.coalescer is not None:
+                content_name = event_data["event"]["contentEnd"].get("contentName")
+                for batch in self.coalescer.flush_content(content_name):
+                    await self._send_audio_input(*batch)
+            
             event_json = json.dumps(event_data)
             event = InvokeModelWithBidirectionalStreamInputChunk(
                 value=BidirectionalInputPayloadPart(bytes_=event_json.encode('utf-8'))
@@ -119,53 +309,174 @@ class S2sSessionManager:
         except Exception as e:
             debug_print(f"Error sending event: {str(e)}")
     
+    def _record_setup_event(self, event_data):
+        """Keep the client's session setup events so a replacement stream can replay them."""
+        event_type = next(iter(event_data["event"]), None)
+        body = event_data["event"].get(event_type) or {}
+        if event_type == 'sessionStart':
+            self.session_start_event = event_data
+        elif event_type == 'promptStart':
+            self.prompt_start_event = event_data
+        elif event_type == 'contentStart' and body.get('type') == 'AUDIO':
+            self.audio_content_start_event = event_data
+        elif event_type == 'contentStart' and body.get('role') == 'SYSTEM':
+            self.system_content_name = body.get('contentName')
+            self.system_events = [event_data]
+        elif event_type in ('textInput', 'contentEnd') and self.system_content_name \
+                and body.get('contentName') == self.system_content_name:
+            self.system_events.append(event_data)
+    
     async def _process_audio_input(self):
         """Process audio input from the queue and send to Bedrock."""
         while self.is_active:
             try:
                 # Get audio data from the queue
-                data = await self.audio_input_queue.get()
+                data = await self._next_audio_input()
+                if data is None:
+                    # Buffered audio waited long enough, send it
+                    for batch in self.coalescer.flush():
+                        await self._send_audio_input(*batch)
+                    continue
                 
-                # Extract data from the queue item
-                prompt_name = data.get('prompt_name')
-                content_name = data.get('content_name')
-                audio_bytes = data.get('audio_bytes')
+                # Stale audio only adds latency, drop it; audio queued while waking up is kept
+                age_ms = (time.monotonic() - data['enqueued_at']) * 1000
+                if age_ms > self.session_config.input_max_age_ms and data['enqueued_at'] > self.woke_at:
+                    self._record_queue_policy('input_dropped_stale')
+                    continue
                 
-                if not audio_bytes or not prompt_name or not content_name:
+                audio_bytes = data.get('audio_bytes')
+                if not audio_bytes or not data.get('prompt_name') or not data.get('content_name'):
                     debug_print("Missing required audio data properties")
                     continue
-
-                # Create the audio input event
-                audio_event = S2sEvent.audio_input(prompt_name, content_name, audio_bytes.decode('utf-8') if isinstance(audio_bytes, bytes) else audio_bytes)
                 
-                # Send the event
-                await self.send_raw_event(audio_event)
+                pcm = audio_bytes if isinstance(audio_bytes, bytes) else base64.b64decode(audio_bytes)
+                
+                if self.hibernating:
+                    await self._hibernated_audio(data, pcm)
+                else:
+                    await self._forward_audio(data, pcm)
                 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 debug_print(f"Error processing audio: {e}")
     
+    async def _forward_audio(self, data, pcm):
+        """Send one queued microphone chunk through voice activity detection and coalescing."""
+        prompt_name = data['prompt_name']
+        content_name = data['content_name']
+        
+        # Voice activity detection suppresses or thins out silence
+        if self.vad is not None:
+            chunks = self.vad.process(pcm)
+            speech = self.vad.last_chunk_speech
+            if chunks:
+                VAD_CHUNKS.inc(len(chunks), decision='forwarded')
+            else:
+                VAD_CHUNKS.inc(decision='suppressed')
+        else:
+            chunks = [data['audio_bytes']]
+            speech = self.speech_detector.is_speech(pcm)
+        if speech:
+            self.last_activity_at = self.last_speech_at = time.monotonic()
+        
+        for chunk in chunks:
+            if self.coalescer is None:
+                await self._send_audio_input(prompt_name, content_name, chunk)
+                continue
+            
+            # Merge small chunks into larger events
+            chunk_pcm = chunk if isinstance(chunk, bytes) else base64.b64decode(chunk)
+            for batch in self.coalescer.add(prompt_name, content_name, chunk_pcm, data['enqueued_at']):
+                await self._send_audio_input(*batch)
+    
+    async def _hibernated_audio(self, data, pcm):
+        """While hibernating keep only a short pre-roll; on speech, wake up and send it."""
+        self.hibernation_preroll.append((data, pcm))
+        self.hibernation_preroll_ms += len(pcm) / 2 / self.speech_detector.sample_rate * 1000
+        while len(self.hibernation_preroll) > 1 and self.hibernation_preroll_ms > self.session_config.vad_preroll_ms:
+            _, dropped = self.hibernation_preroll.popleft()
+            self.hibernation_preroll_ms -= len(dropped) / 2 / self.speech_detector.sample_rate * 1000
+        
+        if time.monotonic() < self.next_wake_at or not self.speech_detector.is_speech(pcm):
+            return
+        if not await self._wake():
+            # Don't retry on every chunk of the same utterance
+            self.next_wake_at = time.monotonic() + 1
+            return
+        
+        buffered = list(self.hibernation_preroll)
+        self.hibernation_preroll.clear()
+        self.hibernation_preroll_ms = 0.0
+        for item, item_pcm in buffered:
+            await self._forward_audio(item, item_pcm)
+    
+    async def _next_audio_input(self):
+        """Get the next queued audio chunk, or None once coalesced audio is due to be sent."""
+        timeout = self.coalescer.time_until_flush() if self.coalescer else None
+        if timeout is None or not self.audio_input_queue.empty():
+            return await self.audio_input_queue.get()
+        if timeout <= 0:
+            return None
+        try:
+            return await asyncio.wait_for(self.audio_input_queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+    
+    async def _send_audio_input(self, prompt_name, content_name, audio):
+        """Send one audioInput event; raw PCM is base64-encoded only here, for Bedrock."""
+        audio_content = base64.b64encode(audio).decode('utf-8') if isinstance(audio, bytes) else audio
+        audio_event = S2sEvent.audio_input(prompt_name, content_name, audio_content)
+        await self.send_raw_event(audio_event)
+        AUDIO_INPUT_EVENTS.inc()
+    
     def add_audio_chunk(self, prompt_name, content_name, audio_data):
         """Add an audio chunk to the queue."""
-        # The audio_data is already a base64 string from the frontend
+        # audio_data is a base64 string from JSON clients or raw PCM bytes from binary clients
+        if self.audio_input_queue.full():
+            self.audio_input_queue.get_nowait()
+            self._record_queue_policy('input_dropped_full')
         self.audio_input_queue.put_nowait({
             'prompt_name': prompt_name,
             'content_name': content_name,
-            'audio_bytes': audio_data
+            'audio_bytes': audio_data,
+            'enqueued_at': time.monotonic()
         })
     
-    async def _process_responses(self):
-        """Process incoming responses from Bedrock."""
+    def _record_queue_policy(self, policy):
+        """Count a fired queue limit policy for this session and process-wide."""
+        self.queue_stats[policy] += 1
+        QUEUE_POLICY_EVENTS.inc(policy=policy)
+    
+    async def _put_output(self, item):
+        """Queue an event for the client, applying the output queue policy when full."""
+        if self.output_queue.full():
+            policy = self.session_config.output_queue_policy
+            if policy == 'drop_oldest':
+                self.output_queue.get_nowait()
+                self._record_queue_policy('output_dropped_oldest')
+            elif policy == 'disconnect':
+                self._record_queue_policy('output_disconnect')
+                self.disconnect_reason = "Client is not keeping up with the audio stream"
+                self.close()
+                return
+            else:
+                # Block the Bedrock receive loop until the client catches up
+                self._record_queue_policy('output_blocked')
+        await self.output_queue.put(item)
+    
+    async def _process_responses(self, stream):
+        """Process incoming responses from one Bedrock stream."""
+        recoverable = True
         while self.is_active:
             response_data = None
             try:
                 
-                #ensure self.stream is initialized
-                if not self.stream:
+                #ensure the stream is initialized
+                if not stream:
                     raise RuntimeError("Stream not initialized")
                 
-                output = await self.stream.await_output()
+                output = await stream.await_output()
                 result = await output[1].receive()
                 
                 # Safely access result attributes
@@ -174,6 +485,17 @@ class S2sSessionManager:
                     response_data = value.bytes_.decode('utf-8')
                 else:
                     continue
+                
+                self.last_output_at = time.monotonic()
+                self.recovered_without_output = False
+                if not self.first_response_received:
+                    self.first_response_received = True
+                    TIME_TO_FIRST_RESPONSE.observe(time.monotonic() - self.created_at, stream=self.stream_source)
+                
+                # Audio output dominates the stream: forward it pre-serialized without parsing
+                if peek_event_type(response_data) == 'audioOutput':
+                    await self._put_output(add_timestamp(response_data, int(time.time() * 1000)))
+                    continue
                     
                 json_data = json.loads(response_data)
                 json_data["timestamp"] = int(time.time() * 1000)  # Milliseconds since epoch
@@ -181,61 +503,445 @@ class S2sSessionManager:
                 event_name = None
                 if 'event' in json_data:
                     event_name = list(json_data["event"].keys())[0]
+                    self._remember_turn(event_name, json_data['event'][event_name])
+                    
+                    # A final user transcript starts a new traced turn
+                    if event_name == 'textOutput' and json_data['event']['textOutput'].get('role') == 'USER':
+                        # Speech heard before the previous transcript belongs to that turn
+                        spoke_at = self.last_speech_at
+                        if self.turn:
+                            self.turn.close()
+                            if spoke_at is not None and spoke_at <= self.turn.marks['transcript_final']:
+                                spoke_at = None
+                        self.turn = TurnTrace(audio_in_last=spoke_at)
+                        if self.speculator:
+                            self.speculator.start(json_data['event']['textOutput'].get('content') or '')
+                    
+                    # Barge-in: the user talked over the assistant, drop work for the old request
+                    elif event_name == 'textOutput' and '"interrupted"' in (json_data['event']['textOutput'].get('content') or ''):
+                        self._cancel_tool_tasks('barge_in')
+                        if self.speculator:
+                            self.speculator.cancel('barge_in')
                     
                     # Handle tool use detection
-                    if event_name == 'toolUse':
-                        self.toolUseContent = json_data['event']['toolUse']
-                        self.toolName = json_data['event']['toolUse']['toolName']
-                        self.toolUseId = json_data['event']['toolUse']['toolUseId']
-                        debug_print(f"Tool use detected: {self.toolName}, ID: {self.toolUseId}")
+                    elif event_name == 'toolUse':
+                        tool_use = json_data['event']['toolUse']
+                        if self.turn:
+                            self.turn.mark('tool_use')
+                        self.pending_tool_uses[tool_use['toolUseId']] = tool_use
+                        debug_print(f"Tool use detected: {tool_use['toolName']}, ID: {tool_use['toolUseId']}")
 
-                    # Process tool use when content ends
+                    # Process tool use when content ends, without blocking the receive loop
                     elif event_name == 'contentEnd' and json_data['event'][event_name].get('type') == 'TOOL':
                         prompt_name = json_data['event']['contentEnd'].get("promptName")
-                        debug_print("Processing tool use and sending result")
-                        toolResult = await self.processToolUse(self.toolName, self.toolUseContent)
-                            
-                        # Send tool start event
-                        toolContent = str(uuid.uuid4())
-                        tool_start_event = S2sEvent.content_start_tool(prompt_name, toolContent, self.toolUseId)
-                        await self.send_raw_event(tool_start_event)
-                        
-                        # Send tool result event
-                        if isinstance(toolResult, dict):
-                            content_json_string = json.dumps(toolResult)
-                        else:
-                            content_json_string = toolResult
-
-                        tool_result_event = S2sEvent.text_input_tool(prompt_name, toolContent, content_json_string)
-                        print("Tool result", tool_result_event)
-                        await self.send_raw_event(tool_result_event)
-
-                        # Send tool content end event
-                        tool_content_end_event = S2sEvent.content_end(prompt_name, toolContent)
-                        await self.send_raw_event(tool_content_end_event)
+                        content_id = json_data['event']['contentEnd'].get("contentId")
+                        for tool_use in self._take_pending_tool_uses(content_id):
+                            debug_print(f"Dispatching tool use {tool_use['toolUseId']}")
+                            self._dispatch_tool_use(prompt_name, tool_use['toolUseId'], tool_use['toolName'], tool_use)
                 
                 # Put the response in the output queue for forwarding to the frontend
-                await self.output_queue.put(json_data)
+                await self._put_output(json_data)
 
             except json.JSONDecodeError as ex:
                 print(ex)
                 if response_data:
-                    await self.output_queue.put({"raw_data": response_data})
+                    await self._put_output({"raw_data": response_data})
             except StopAsyncIteration as ex:
                 # Stream has ended
                 print(ex)
+                if stream is self.stream and self.is_active:
+                    BEDROCK_STREAM_ERRORS.inc(error='ended')
                 break
             except Exception as e:
                 # Handle ValidationException properly
                 if "ValidationException" in str(e):
                     error_message = str(e)
                     print(f"Validation error: {error_message}")
+                    # Replaying the same events would fail the same way
+                    recoverable = False
+                    BEDROCK_STREAM_ERRORS.inc(error='validation')
                 else:
                     print(f"Error receiving response: {e}")
+                    if stream is self.stream and self.is_active:
+                        BEDROCK_STREAM_ERRORS.inc(error='other')
                 break
 
+        # A stream that was rolled over is retired by the rollover, not here
+        if stream is not self.stream:
+            return
+        
+        # The stream ended under a live session: continue on a replacement stream
+        if recoverable and self.is_active and not self.recovered_without_output:
+            self.recovered_without_output = True
+            if await self._rollover_stream('recovery'):
+                return
+
         self.is_active = False
         self.close()
+    
+    def _remember_turn(self, event_name, body):
+        """Keep final USER and ASSISTANT transcripts for replay on a replacement stream."""
+        if event_name == 'contentStart' and body.get('type') == 'TEXT':
+            # Speculative assistant text is repeated as FINAL, only keep the latter
+            if 'SPECULATIVE' in (body.get('additionalModelFields') or ''):
+                self.speculative_content_ids.add(body.get('contentId'))
+        elif event_name == 'contentEnd':
+            self.speculative_content_ids.discard(body.get('contentId'))
+        elif event_name == 'textOutput' and body.get('contentId') not in self.speculative_content_ids:
+            text = body.get('content') or ''
+            role = body.get('role')
+            if role in ('USER', 'ASSISTANT') and text and '"interrupted"' not in text:
+                self.history.append((role, text))
+    
+    def compacted_history(self):
+        """
+        Recent turns for replay: consecutive messages of one role merged, limited to
+        the configured message count and characters, starting with a USER message.
+
+        Returns:
+            list: (role, text) tuples, oldest first
+        """
+        merged = []
+        for role, text in self.history:
+            if merged and merged[-1][0] == role:
+                merged[-1] = (role, f"{merged[-1][1]} {text}")
+            else:
+                merged.append((role, text))
+
+        merged = merged[-self.session_config.rollover_history_messages:]
+        budget = self.session_config.rollover_history_max_chars
+        kept = []
+        for role, text in reversed(merged):
+            if len(text) > budget:
+                break
+            budget -= len(text)
+            kept.append((role, text))
+        kept.reverse()
+
+        while kept and kept[0][0] != 'USER':
+            kept.pop(0)
+        return kept
+    
+    def _is_quiet(self):
+        """Whether no tool is running and neither Nova Sonic nor the caller has been heard for a while."""
+        if self.tool_tasks or self.pending_tool_uses:
+            return False
+        quiet_since = max(self.last_output_at, self.last_speech_at or 0.0)
+        return (time.monotonic() - quiet_since) * 1000 >= self.session_config.stream_rollover_quiet_ms
+    
+    def is_idle(self):
+        """Whether the session is between turns: quiet, no tool running and the last turn answered."""
+        if self.hibernating:
+            return True
+        return self._is_quiet() and (self.turn is None or self.turn.finished)
+    
+    async def end_session(self):
+        """End the Bedrock session properly: audio contentEnd, promptEnd and sessionEnd."""
+        if not self.is_active:
+            return
+        # A hibernating session has no stream to end
+        if self.hibernating:
+            self.close()
+            return
+        if self.prompt_name:
+            if self.audio_content_name:
+                await self.send_raw_event(S2sEvent.content_end(self.prompt_name, self.audio_content_name))
+            await self.send_raw_event(S2sEvent.prompt_end(self.prompt_name))
+        # sessionEnd also closes the stream
+        await self.send_raw_event(S2sEvent.session_end())
+    
+    def _start_stream_monitors(self):
+        """Start the timers that roll over the current stream and hibernate it when idle."""
+        if self.session_config.stream_rollover_seconds > 0:
+            self.rollover_task = asyncio.create_task(self._rollover_monitor())
+        if self.session_config.hibernate_after_seconds > 0:
+            self.hibernation_task = asyncio.create_task(self._hibernation_monitor())
+    
+    async def _hibernation_monitor(self):
+        """Hibernate the session once neither side has done anything for the configured time."""
+        idle_after = self.session_config.hibernate_after_seconds
+        while self.is_active:
+            idle_since = max(self.last_activity_at, self.last_output_at)
+            await asyncio.sleep(max(0.5, idle_since + idle_after - time.monotonic()))
+            idle_since = max(self.last_activity_at, self.last_output_at)
+            if self.is_active and time.monotonic() - idle_since >= idle_after and await self._hibernate():
+                return
+    
+    async def _hibernate(self):
+        """
+        Close the stream of an idle session while the WebSocket stays open. Session setup
+        and recent turns are kept, so waking up replays them like a rollover.
+
+        Returns:
+            bool: True if the session is now hibernating
+        """
+        async with self.rollover_lock:
+            if not self.is_active or self.hibernating or not self._is_quiet():
+                return False
+            old_stream, old_task = self.stream, self.response_task
+            self.stream = self.response_task = None
+            self.hibernating = True
+            if self.coalescer is not None:
+                self.coalescer.flush()  # Buffered silence has nowhere to go
+        
+        if self.rollover_task and not self.rollover_task.done():
+            self.rollover_task.cancel()
+        if old_task and not old_task.done():
+            old_task.cancel()
+        await self._retire_stream(old_stream)
+        
+        # A hibernating session doesn't count against the session limit
+        if self.admission and self.holds_session_slot:
+            self.holds_session_slot = False
+            await self.admission.release()
+        
+        HIBERNATING_SESSIONS.inc()
+        SESSION_HIBERNATIONS.inc(event='hibernate')
+        print(f"Session idle for {self.session_config.hibernate_after_seconds}s, closed its Nova Sonic stream")
+        return True
+    
+    async def _wake(self):
+        """
+        Reopen the stream of a hibernating session, replaying its setup and recent turns.
+
+        Returns:
+            bool: True if the session has a live stream again
+        """
+        async with self.wake_lock:
+            if not self.hibernating:
+                return self.is_active
+            
+            if self.admission and not self.holds_session_slot:
+                rejection = await self.admission.acquire()
+                if rejection:
+                    SESSION_HIBERNATIONS.inc(event='wake_rejected')
+                    await self._put_output(busy_event(rejection, int(self.admission.wait_seconds * 1000)))
+                    return False
+                self.holds_session_slot = True
+            
+            if not await self._rollover_stream('wake'):
+                if self.admission:
+                    self.holds_session_slot = False
+                    await self.admission.release()
+                return False
+            
+            self.hibernating = False
+            self.woke_at = self.last_activity_at = time.monotonic()
+            HIBERNATING_SESSIONS.dec()
+            SESSION_HIBERNATIONS.inc(event='wake')
+            self._start_stream_monitors()
+            return True
+    
+    async def _wake_for_event(self, event_data):
+        """
+        Handle a client event that arrives while hibernating.
+
+        Returns:
+            bool: True if the event should be sent on the reopened stream
+        """
+        event_type = next(iter(event_data["event"]), None)
+        if event_type == 'audioInput':
+            # Audio still buffered from before hibernating is silence
+            return False
+        if event_type in ('contentEnd', 'promptEnd', 'sessionEnd'):
+            # Nothing upstream to end; keep the setup current for a later wake
+            self._record_setup_event(event_data)
+            if event_type == 'sessionEnd':
+                self.close()
+            return False
+        return await self._wake()
+    
+    async def _rollover_monitor(self):
+        """Roll over to a new stream at a quiet moment once the current one gets old."""
+        config = self.session_config
+        while self.is_active:
+            due = self.stream_opened_at + config.stream_rollover_seconds
+            await asyncio.sleep(max(0, due - time.monotonic()))
+            if not self.is_active or time.monotonic() < self.stream_opened_at + config.stream_rollover_seconds:
+                continue
+            
+            deadline = due + config.stream_rollover_grace_seconds
+            while self.is_active and not self._is_quiet() and time.monotonic() < deadline:
+                await asyncio.sleep(0.25)
+            
+            if self.is_active and not await self._rollover_stream('scheduled'):
+                await asyncio.sleep(5)
+    
+    async def _rollover_stream(self, reason):
+        """
+        Open a replacement stream, replay the session setup and recent turns, then
+        switch audio input and response processing over to it.
+
+        Returns:
+            bool: True if the session continues on the new stream
+        """
+        async with self.rollover_lock:
+            if not self.is_active:
+                return False
+            
+            started = time.monotonic()
+            old_stream, old_task = self.stream, self.response_task
+            try:
+                stream, source, opened_at = await self._open_stream()
+                await self._prime_stream(stream, source)
+            except Exception as e:
+                print(f"Failed to roll over Nova Sonic stream: {e}")
+                STREAM_ROLLOVERS.inc(reason=reason, result='failed')
+                return False
+            
+            # From here on audio and client events go to the new stream
+            self.stream, self.stream_source, self.stream_opened_at = stream, source, opened_at
+            self.pending_tool_uses.clear()
+            self.speculative_content_ids.clear()
+            self.response_task = asyncio.create_task(self._process_responses(stream))
+            
+            STREAM_ROLLOVER_SECONDS.observe(time.monotonic() - started)
+            STREAM_ROLLOVERS.inc(reason=reason, result='ok')
+            print(f"Rolled over Nova Sonic stream ({reason}) in {time.monotonic() - started:.2f}s")
+        
+        if old_task and old_task is not asyncio.current_task() and not old_task.done():
+            old_task.cancel()
+        # A hibernating session has no old stream
+        if old_stream:
+            asyncio.create_task(self._retire_stream(old_stream))
+        return True
+    
+    async def _prime_stream(self, stream, source):
+        """Send sessionStart, prompt setup, system prompt, history and the audio contentStart."""
+        prompt_name = self.prompt_name or str(uuid.uuid4())
+        if source != 'pooled':
+            await send_event(stream, self.session_start_event or S2sEvent.session_start())
+        await send_event(stream, self.prompt_start_event or S2sEvent.prompt_start(prompt_name))
+        
+        system_events = self.system_events
+        if not system_events:
+            system_content_name = str(uuid.uuid4())
+            system_events = [
+                S2sEvent.content_start_text(prompt_name, system_content_name),
+                S2sEvent.text_input(prompt_name, system_content_name),
+                S2sEvent.content_end(prompt_name, system_content_name)
+            ]
+        for event in system_events:
+            await send_event(stream, event)
+        
+        for role, text in self.compacted_history():
+            content_name = str(uuid.uuid4())
+            await send_event(stream, S2sEvent.content_start_history(prompt_name, content_name, role))
+            await send_event(stream, S2sEvent.text_input(prompt_name, content_name, text))
+            await send_event(stream, S2sEvent.content_end(prompt_name, content_name))
+        
+        if self.audio_content_start_event:
+            await send_event(stream, self.audio_content_start_event)
+    
+    async def _retire_stream(self, stream):
+        """End a replaced stream cleanly."""
+        try:
+            if self.prompt_name:
+                if self.audio_content_name:
+                    await send_event(stream, S2sEvent.content_end(self.prompt_name, self.audio_content_name))
+                await send_event(stream, S2sEvent.prompt_end(self.prompt_name))
+            await send_event(stream, S2sEvent.session_end())
+            await stream.input_stream.close()
+        except Exception as e:
+            debug_print(f"Error closing replaced stream: {e}")
+
+    def _take_pending_tool_uses(self, content_id):
+        """Remove and return the pending tool uses finished by a TOOL contentEnd."""
+        tool_use_ids = [
+            tool_use_id for tool_use_id, tool_use in self.pending_tool_uses.items()
+            if content_id and tool_use.get('contentId') == content_id
+        ]
+        # Without a matching contentId every pending tool use is complete
+        if not tool_use_ids:
+            tool_use_ids = list(self.pending_tool_uses)
+        return [self.pending_tool_uses.pop(tool_use_id) for tool_use_id in tool_use_ids]
+    
+    def _cancel_tool_tasks(self, reason):
+        """Cancel every running tool execution; cancellation reaches the agent invocation."""
+        for tool_use_id, task in list(self.tool_tasks.items()):
+            if task.done():
+                continue
+            self.tool_cancel_reasons[tool_use_id] = reason
+            task.cancel()
+            TOOL_USES_CANCELLED.inc(reason=reason)
+            print(f"Cancelled tool use {tool_use_id} ({reason})")
+    
+    def _dispatch_tool_use(self, prompt_name, tool_use_id, tool_name, tool_use_content):
+        """Run a tool use as an independent task so Bedrock output keeps flowing."""
+        task = asyncio.create_task(self._run_tool_use(prompt_name, tool_use_id, tool_name, tool_use_content))
+        self.tool_tasks[tool_use_id] = task
+        
+        def forget(_):
+            self.tool_tasks.pop(tool_use_id, None)
+            self.tool_cancel_reasons.pop(tool_use_id, None)
+        task.add_done_callback(forget)
+    
+    async def _run_tool_use(self, prompt_name, tool_use_id, tool_name, tool_use_content):
+        """Execute a tool use and send its result back to Bedrock."""
+        stream = self.stream
+        # Routing and agent stages are marked on this turn via the task's context
+        turn = self.turn
+        set_current_turn(turn)
+        started = time.monotonic()
+        try:
+            if self.tool_limiter:
+                async with self.tool_limiter.slot():
+                    toolResult = await self.processToolUse(tool_name, tool_use_content)
+            else:
+                toolResult = await self.processToolUse(tool_name, tool_use_content)
+        except asyncio.CancelledError:
+            # After a barge-in Nova Sonic still expects a result for this toolUse
+            if self.tool_cancel_reasons.pop(tool_use_id, None) != 'barge_in' or not self.is_active:
+                raise
+            asyncio.current_task().uncancel()
+            toolResult = {"result": "Cancelled: the user interrupted before this request finished."}
+        
+        # The stream that asked for this tool was replaced and can't take the result
+        if stream is not self.stream:
+            print(f"Dropping result of tool use {tool_use_id} from a replaced stream")
+            return
+        
+        # Send tool result event
+        if isinstance(toolResult, dict):
+            content_json_string = json.dumps(toolResult)
+        else:
+            content_json_string = toolResult
+
+        toolContent = str(uuid.uuid4())
+        tool_start_event = S2sEvent.content_start_tool(prompt_name, toolContent, tool_use_id)
+        tool_result_event = S2sEvent.text_input_tool(prompt_name, toolContent, content_json_string)
+        tool_content_end_event = S2sEvent.content_end(prompt_name, toolContent)
+        print("Tool result", tool_result_event)
+        
+        async with self.tool_result_lock:
+            await self.send_raw_event(tool_start_event)
+            await self.send_raw_event(tool_result_event)
+            await self.send_raw_event(tool_content_end_event)
+        if turn:
+            turn.mark('tool_result_sent')
+        TOOL_USE_SECONDS.observe(time.monotonic() - started, tool=tool_name)
+
+    async def _speculative_query(self, query):
+        """
+        Answer a user transcript before Nova Sonic asks for it. Runs without a tool limiter
+        slot: the toolUse that claims it holds one while waiting, and a session has at most
+        one speculation. Agents refuse mutating tools in it; if one was refused the
+        answer is None and the toolUse runs the query itself.
+
+        The query runs against a fork of the conversation, returned with the answer.
+        Only the toolUse that claims the answer commits the fork; an expired, cancelled
+        or mismatched speculation leaves the session's history untouched.
+        """
+        set_current_turn(self.turn)
+        scope = read_only()
+        conversation = self.supervisor_agent.conversation_state.fork()
+        answer = await self.supervisor_agent.query(query, conversation_state=conversation)
+        return None if scope.violated else (answer, conversation)
+
+    def audio_forwarded(self):
+        """Called after audio output reached the client; finishes the current turn's trace."""
+        if self.turn and not self.turn.finished:
+            self.turn.finish()
 
     async def processToolUse(self, toolName, toolUseContent):
         """Process tool use with Supervisor Agent - simplified version"""
@@ -263,8 +969,14 @@ class S2sSessionManager:
                 else:
                     query = str(content)
                 
-                # Get the result from the supervisor agent
-                result = await self.supervisor_agent.query(query)
+                # Get the result from the supervisor agent, or from a speculation already answering it
+                speculation = self.speculator.claim(query) if self.speculator else None
+                claimed = await speculation if speculation else None
+                if claimed is not None:
+                    result, conversation = claimed
+                    self.supervisor_agent.conversation_state.commit(conversation)
+                else:
+                    result = await self.supervisor_agent.query(query)
                 
                 # Ensure the result is a string and limit length
                 if not isinstance(result, str):
@@ -300,3 +1012,21 @@ class S2sSessionManager:
         
         if self.response_task and not self.response_task.done():
             self.response_task.cancel()
+        
+        if self.rollover_task and not self.rollover_task.done():
+            self.rollover_task.cancel()
+        
+        if self.hibernation_task and not self.hibernation_task.done():
+            self.hibernation_task.cancel()
+        
+        if self.hibernating:
+            self.hibernating = False
+            HIBERNATING_SESSIONS.dec()
+        
+        # Nobody is left to hear the answers
+        self._cancel_tool_tasks('disconnect')
+
+        if self.turn:
+            self.turn.close()
+        if self.speculator:
+            self.speculator.cancel('disconnect')
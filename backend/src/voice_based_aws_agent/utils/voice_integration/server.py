@@ -7,18 +7,34 @@ import asyncio
 from websockets.server import serve
 from websockets import exceptions
 import json
+import base64
 import logging
+import signal
+import time
 import warnings
 import sys
+import uuid
 from pathlib import Path
+from urllib.parse import urlparse, parse_qs
 
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent.parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 from .s2s_session_manager import S2sSessionManager
+from .stream_pool import BedrockStreamPool
+from .bedrock_client import use_client
+from .fake_nova_sonic import FakeAgentOrchestratorPool, FakeNovaSonicClient
+from . import metrics_endpoint
+from .admission import AdmissionController, ToolLimiter, BUSY_CLOSE_CODE, busy_event
+from .audio_framing import AUDIO_INPUT_FRAME, AUDIO_OUTPUT_FRAME, AudioFrameError, encode_audio_frame, decode_audio_frame
 from src.voice_based_aws_agent.utils.aws_auth import get_aws_session
-from src.voice_based_aws_agent.config.config import AgentConfig
+from src.voice_based_aws_agent.config.config import AgentConfig, VoiceSessionConfig, VoiceServerConfig
+from src.voice_based_aws_agent.agents.orchestrator_pool import AgentOrchestratorPool
+from src.voice_based_aws_agent.agents.agent_executor import configure_agent_executor, shutdown_agent_executor
+from src.voice_based_aws_agent.agents.response_cache import configure_response_cache
+from src.voice_based_aws_agent.utils.tracing import TURN_LATENCY_SECONDS, latency_quantiles
+from src.voice_based_aws_agent.utils.metrics import REGISTRY
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -27,16 +43,57 @@ logger = logging.getLogger("SimpleNovaServer")
 # Suppress warnings
 warnings.filterwarnings("ignore")
 
-async def websocket_handler(websocket, path, config):
+DRAIN_SESSIONS = REGISTRY.counter(
+    "voice_drain_sessions_total",
+    "Sessions ended by a drain, cleanly between turns or cut at the deadline",
+    ("result",),
+)
+
+# Session manager of each open WebSocket, so a drain can end sessions between turns
+active_sessions = {}
+
+def wants_binary_audio(path):
+    """Check whether the client opted into binary audio frames with ?audio=binary."""
+    query = parse_qs(urlparse(path or "").query)
+    return query.get("audio", [""])[0].lower() == "binary"
+
+async def websocket_handler(websocket, path, config, orchestrator_pool=None, session_config=None, stream_pool=None, admission=None, tool_limiter=None):
     """Handle WebSocket connections - simplified version"""
     stream_manager = None
     forward_task = None
+    binary_audio = wants_binary_audio(path)
+    session_id = uuid.uuid4().hex[:12]
+    
+    logger.info(f"New WebSocket connection from {websocket.remote_address} (binary audio: {binary_audio})")
     
-    logger.info(f"New WebSocket connection from {websocket.remote_address}")
+    # Take a session slot before opening anything for this caller
+    if admission:
+        rejection = await admission.acquire()
+        if rejection:
+            logger.warning(f"Rejecting connection from {websocket.remote_address}: {rejection}")
+            try:
+                await websocket.send(json.dumps(busy_event(rejection, int(admission.wait_seconds * 1000))))
+                await websocket.close(code=BUSY_CLOSE_CODE, reason=rejection)
+            except exceptions.ConnectionClosed:
+                pass
+            return
     
     try:
         async for message in websocket:
+            metrics_endpoint.record_event("in", message)
             try:
+                # Binary frames carry raw PCM audio input
+                if isinstance(message, bytes):
+                    if stream_manager is None:
+                        logger.warning("Dropping binary audio received before session start")
+                        continue
+                    frame_type, prompt_name, content_name, pcm = decode_audio_frame(message)
+                    if frame_type != AUDIO_INPUT_FRAME:
+                        logger.warning(f"Ignoring unexpected audio frame type {frame_type}")
+                        continue
+                    stream_manager.add_audio_chunk(prompt_name, content_name, pcm)
+                    continue
+                
                 data = json.loads(message)
                 if 'body' in data:
                     data = json.loads(data["body"])
@@ -50,14 +107,21 @@ async def websocket_handler(websocket, path, config):
                         stream_manager = S2sSessionManager(
                             model_id='amazon.nova-sonic-v1:0',
                             region='us-east-1',
-                            config=config
+                            config=config,
+                            orchestrator_pool=orchestrator_pool,
+                            session_config=session_config,
+                            stream_pool=stream_pool,
+                            tool_limiter=tool_limiter,
+                            admission=admission
                         )
                         
                         # Initialize the Bedrock stream
                         await stream_manager.initialize_stream()
+                        metrics_endpoint.register_session(session_id, stream_manager)
+                        active_sessions[websocket] = stream_manager
                         
                         # Start a task to forward responses from Bedrock to the WebSocket
-                        forward_task = asyncio.create_task(forward_responses(websocket, stream_manager))
+                        forward_task = asyncio.create_task(forward_responses(websocket, stream_manager, binary_audio))
                     
                     # Store prompt name and content names if provided
                     if event_type == 'promptStart':
@@ -80,6 +144,8 @@ async def websocket_handler(websocket, path, config):
                         
             except json.JSONDecodeError:
                 logger.error("Invalid JSON received from WebSocket")
+            except AudioFrameError as e:
+                logger.error(f"Invalid binary audio frame received from WebSocket: {e}")
             except Exception as e:
                 logger.error(f"Error processing WebSocket message: {e}")
                     
@@ -90,13 +156,46 @@ async def websocket_handler(websocket, path, config):
     finally:
         # Clean up
         logger.info("Cleaning up WebSocket connection")
+        metrics_endpoint.unregister_session(session_id)
+        active_sessions.pop(websocket, None)
         if stream_manager:
             stream_manager.close()
+            logger.info(f"Turn latency p50/p95/p99 so far: {latency_quantiles(TURN_LATENCY_SECONDS)}")
         if forward_task and not forward_task.done():
             forward_task.cancel()
+        # A hibernating session already gave its slot back
+        if admission and (stream_manager is None or stream_manager.holds_session_slot):
+            await admission.release()
         logger.info("WebSocket connection cleanup complete")
 
-async def forward_responses(websocket, stream_manager):
+def string_field(serialized, name):
+    """Value of a string field of a serialized JSON event, or None if absent, escaped or oddly spaced."""
+    for key in (f'"{name}":"', f'"{name}": "'):
+        start = serialized.find(key)
+        if start >= 0:
+            start += len(key)
+            end = serialized.find('"', start)
+            value = serialized[start:end]
+            return value if end >= 0 and '\\' not in value else None
+    return None
+
+def encode_audio_output(response, prompt_name):
+    """Turn an audioOutput event into a binary frame, or None for any other event."""
+    # Pre-serialized responses are always audioOutput events: slice out the base64 audio
+    if isinstance(response, str):
+        content = string_field(response, 'content')
+        if content is not None:
+            pcm = base64.b64decode(content)
+            return encode_audio_frame(AUDIO_OUTPUT_FRAME, prompt_name, string_field(response, 'contentId'), pcm)
+        # Spaced or escaped JSON, let the parser deal with it
+        response = json.loads(response)
+    audio_output = response.get('event', {}).get('audioOutput') if isinstance(response, dict) else None
+    if audio_output is None:
+        return None
+    pcm = base64.b64decode(audio_output['content'])
+    return encode_audio_frame(AUDIO_OUTPUT_FRAME, prompt_name, audio_output.get('contentId'), pcm)
+
+async def forward_responses(websocket, stream_manager, binary_audio=False):
     """Forward responses from Bedrock to the WebSocket - simplified version"""
     try:
         while stream_manager.is_active:
@@ -105,8 +204,15 @@ async def forward_responses(websocket, stream_manager):
             
             # Send to WebSocket
             try:
-                event = json.dumps(response)
+                event = encode_audio_output(response, stream_manager.prompt_name) if binary_audio else None
+                if event is None:
+                    event = response if isinstance(response, str) else json.dumps(response)
                 await websocket.send(event)
+                metrics_endpoint.record_event("out", event)
+                
+                # Pre-serialized responses are audioOutput: the reply is now audible
+                if isinstance(response, str):
+                    stream_manager.audio_forwarded()
             except exceptions.ConnectionClosed:
                 logger.info("WebSocket connection closed during response forwarding")
                 break
@@ -114,6 +220,11 @@ async def forward_responses(websocket, stream_manager):
                 logger.error(f"Error sending response to WebSocket: {send_error}")
                 break
                 
+        # The session gave up on this client (e.g. output queue high-water mark)
+        if stream_manager.disconnect_reason:
+            logger.warning(f"Disconnecting client: {stream_manager.disconnect_reason}")
+            await websocket.close(code=1013, reason=stream_manager.disconnect_reason)
+                
     except asyncio.CancelledError:
         logger.info("Response forwarding task cancelled")
     except Exception as e:
@@ -121,63 +232,172 @@ async def forward_responses(websocket, stream_manager):
     finally:
         logger.info("Response forwarding stopped")
 
-async def main(host, port, config):
+async def main(host, port, config, orchestrator_pool=None, session_config=None, stream_pool=None, server_config=None, on_ready=None):
     """Main function to run the WebSocket server"""
+    server_config = server_config or VoiceServerConfig()
+    lag_task = None
     try:
-        # Start WebSocket server
+        # /metrics and /health are answered on the WebSocket port
+        process_request = metrics_endpoint.process_request if server_config.metrics_enabled else None
+        if server_config.metrics_enabled:
+            lag_task = asyncio.create_task(
+                metrics_endpoint.monitor_event_loop_lag(server_config.event_loop_lag_interval_ms / 1000)
+            )
+        
+        # Shed load beyond the configured session and tool capacity
+        admission = AdmissionController(
+            server_config.max_sessions,
+            queue_size=server_config.admission_queue_size,
+            wait_seconds=server_config.admission_wait_seconds
+        )
+        tool_limiter = ToolLimiter(server_config.max_concurrent_tools)
+        
+        stop_requested = asyncio.Event()
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop_requested.set)
+        except NotImplementedError:
+            pass  # No loop signal handlers on this platform
+        
+        # Start WebSocket server; workers share the port with SO_REUSEPORT
         async with serve(
-            lambda ws, path: websocket_handler(ws, path, config),
+            lambda ws, path: websocket_handler(ws, path, config, orchestrator_pool, session_config, stream_pool, admission, tool_limiter),
             host,
-            port
-        ):
+            port,
+            process_request=process_request,
+            reuse_port=server_config.workers > 1 or server_config.reuse_port
+        ) as ws_server:
             logger.info(f"Simple WebSocket server started at {host}:{port}")
+            if on_ready:
+                on_ready()
+            if server_config.metrics_enabled:
+                logger.info(f"Metrics at http://{host}:{port}{metrics_endpoint.METRICS_PATH}, health at {metrics_endpoint.HEALTH_PATH}")
             
-            # Keep the server running forever
-            await asyncio.Future()
+            # Run until SIGTERM, then drain
+            await stop_requested.wait()
+            await drain(ws_server, server_config.drain_timeout_seconds)
     except Exception as e:
         logger.error(f"Failed to start WebSocket server: {e}")
+    finally:
+        if lag_task:
+            lag_task.cancel()
+
+async def end_session(websocket, reason):
+    """End a session's Bedrock stream properly and close its WebSocket as going away."""
+    stream_manager = active_sessions.get(websocket)
+    if stream_manager:
+        await stream_manager.end_session()
+    try:
+        await websocket.close(code=1001, reason=reason)
+    except Exception as e:
+        logger.debug(f"Error closing WebSocket during drain: {e}")
 
-async def run_server(profile_name=None, region=None, host="localhost", port=80):
+async def drain(ws_server, timeout):
+    """
+    Stop accepting connections, end each session once its current turn and tool
+    calls are done, and cut whatever is still busy at the deadline.
+
+    Returns:
+        tuple: (sessions drained, sessions killed)
+    """
+    pending = set(ws_server.websockets)
+    logger.info(f"Draining: no new connections, waiting up to {timeout}s for {len(pending)} sessions")
+    ws_server.server.close()
+    
+    drained = 0
+    deadline = time.monotonic() + timeout
+    while pending and time.monotonic() < deadline:
+        for websocket in list(pending):
+            stream_manager = active_sessions.get(websocket)
+            if websocket.closed or stream_manager is None or stream_manager.is_idle():
+                pending.discard(websocket)
+                await end_session(websocket, "Server restarting")
+                drained += 1
+        if pending:
+            await asyncio.sleep(0.25)
+    
+    killed = len(pending)
+    for websocket in pending:
+        await end_session(websocket, "Server restarting")
+    
+    DRAIN_SESSIONS.inc(drained, result="drained")
+    DRAIN_SESSIONS.inc(killed, result="killed")
+    log = logger.warning if killed else logger.info
+    log(f"Drain finished: {drained} sessions drained, {killed} killed")
+    return drained, killed
+
+async def run_server(profile_name=None, region=None, host="localhost", port=80, agent_pool_size=None, response_cache_size=0, session_config=None, server_config=None, on_ready=None):
     """Run the simple WebSocket server"""
+    server_config = server_config or VoiceServerConfig()
+    
+    # Offline load tests run against the in-process Nova Sonic stand-in
+    if server_config.fake_nova_sonic is not None:
+        use_client(FakeNovaSonicClient(server_config.fake_nova_sonic))
     
     #ensure profile_name is set
-    if not profile_name:
+    if not profile_name and server_config.fake_nova_sonic is None:
         logger.warning("profile_name is not defined. Using get_aws_session().profile_name")
         profile_name = get_aws_session().profile_name
     
     # Create agent configuration
     config = AgentConfig(
         profile_name=profile_name,
-        region=region or "us-east-1"
+        region=region or "us-east-1",
+        response_cache_max_entries=response_cache_size
     )
     
-    # Ensure AWS credentials are available
-    session = get_aws_session(config.profile_name)
-    if not session:
-        logger.error("Failed to get AWS session. Check your credentials.")
-        return
+    # Ensure AWS credentials are available; the fake Nova Sonic needs none
+    if server_config.fake_nova_sonic is None:
+        session = get_aws_session(config.profile_name)
+        if not session:
+            logger.error("Failed to get AWS session. Check your credentials.")
+            return
+    
+    # One orchestrator per agent executor worker, so leases don't cap agent concurrency below it
+    if agent_pool_size is None:
+        agent_pool_size = config.agent_executor_workers
+    
+    # Agent calls run on a bounded pool, off the event loop
+    configure_agent_executor(config.agent_executor_workers)
+    configure_response_cache(config.response_cache_max_entries, workers=server_config.workers)
     
+    # Build the agents once so connections don't pay the construction cost;
+    # offline load tests get canned answers instead of Bedrock and AWS calls
+    if server_config.fake_nova_sonic is not None:
+        orchestrator_pool = FakeAgentOrchestratorPool(server_config.fake_nova_sonic, size=agent_pool_size)
+    else:
+        orchestrator_pool = AgentOrchestratorPool(config, size=agent_pool_size)
     try:
-        await main(host, port, config)
+        orchestrator_pool.start()
+    except Exception as e:
+        logger.error(f"Failed to build agent orchestrator pool: {e}")
+        logger.info("Falling back to per-session orchestrators")
+        orchestrator_pool = None
+    
+    # Keep Nova Sonic streams open ahead of callers
+    stream_pool = None
+    if server_config.stream_pool_size > 0:
+        stream_pool = BedrockStreamPool(
+            model_id='amazon.nova-sonic-v1:0',
+            region='us-east-1',
+            size=server_config.stream_pool_size,
+            max_idle_seconds=server_config.stream_pool_max_idle_seconds
+        )
+        stream_pool.start()
+    
+    try:
+        await main(host, port, config, orchestrator_pool, session_config or VoiceSessionConfig(), stream_pool, server_config, on_ready)
     except KeyboardInterrupt:
         logger.info("Server stopped by user")
     except Exception as e:
         logger.error(f"Server error: {e}")
+    finally:
+        if orchestrator_pool:
+            orchestrator_pool.shutdown()
+        shutdown_agent_executor()
+        if stream_pool:
+            await stream_pool.close()
 
 if __name__ == "__main__":
-    import argparse
-    
-    parser = argparse.ArgumentParser(description="Simple Nova S2S WebSocket Server")
-    parser.add_argument("--profile", help="AWS profile name")
-    parser.add_argument("--region", default="us-east-1", help="AWS region")
-    parser.add_argument("--host", default="localhost", help="Host to bind to")
-    parser.add_argument("--port", type=int, default=80, help="Port to bind to")
-    
-    args = parser.parse_args()
-    
-    asyncio.run(run_server(
-        profile_name=args.profile,
-        region=args.region,
-        host=args.host,
-        port=args.port
-    ))
+    # main.py is the single entry point; its parser covers every server option
+    from src.voice_based_aws_agent.main import main as run_main
+    run_main()
@@ -0,0 +1,174 @@
+"""
+Speculative tool execution.
+
+Nova Sonic emits the caller's final transcript as a USER textOutput a little
+before it asks for the supervisorAgent tool. When that transcript reads as a
+read-only request (a question or a list/show/describe request, with no word
+asking for a change or confirming one), a ToolSpeculator starts the agent query
+on it right away. When the toolUse arrives its query is compared with the
+transcript by their content words (what is left after question words, pronouns
+and fillers): if the two sets mostly overlap, the tool attaches to the in-flight
+result; otherwise the speculation is cancelled. Requiring the same content words
+keeps "which instances are running" from answering "which instances are stopped".
+
+The word lists only pick candidates. The session runs speculations in a
+response_cache.read_only() scope, where the agents' ReadOnlyGuard refuses any
+tool call that changes data, against a fork of the conversation that only the
+claiming toolUse commits to the session's history.
+"""
+
+import asyncio
+import logging
+import re
+import time
+from src.voice_based_aws_agent.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+SPECULATIONS = REGISTRY.counter(
+    "voice_speculations_total",
+    "Agent queries started on the caller's transcript ahead of the toolUse, by outcome",
+    ("outcome",),
+)
+
+SPECULATION_HEAD_START_SECONDS = REGISTRY.histogram(
+    "voice_speculation_head_start_seconds",
+    "How long a speculation had been running when a toolUse attached to it",
+)
+
+# A transcript needs one of these to count as a request for information
+READ_WORDS = frozenset((
+    "what", "whats", "which", "who", "where", "when", "why", "how", "is", "are", "any",
+    "list", "show", "describe", "get", "find", "check", "tell", "give", "search",
+    "look", "explain", "display",
+))
+
+# Words asking for a change, or confirming one the agent may have proposed
+CHANGE_WORDS = frozenset((
+    "start", "starts", "starting", "stop", "stops", "stopping",
+    "reboot", "restart", "terminate", "launch", "run", "resize", "shut", "turn", "kill",
+    "create", "update", "delete", "remove", "add", "change", "modify", "edit", "mark",
+    "set", "send", "pay", "cancel", "attach", "detach", "assign", "apply", "enable",
+    "disable", "reset", "rename", "tag", "patch", "restore", "copy", "move", "make",
+    "yes", "yeah", "yep", "ok", "okay", "sure", "confirm", "proceed", "go", "ahead",
+))
+
+# Words that carry no content when comparing a transcript with a toolUse query
+FILLER_WORDS = READ_WORDS | frozenset((
+    "a", "an", "the", "my", "me", "i", "we", "our", "you", "your", "it", "this", "that",
+    "can", "could", "would", "will", "please", "do", "does", "did", "there", "have", "has",
+    "for", "of", "in", "on", "to", "at", "with", "be", "all", "many", "much", "right", "now",
+    "just", "still", "currently", "about", "s",
+))
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def is_read_only(text, min_words=3):
+    """Whether a transcript can safely be answered before the model asks for it."""
+    words = WORD_PATTERN.findall(text.lower())
+    return len(words) >= min_words and not CHANGE_WORDS.intersection(words) and bool(READ_WORDS.intersection(words))
+
+
+def content_words(text):
+    """Words of a text that say what it is about, with plural "s" removed."""
+    return frozenset(
+        word[:-1] if len(word) > 3 and word.endswith("s") else word
+        for word in WORD_PATTERN.findall(text.lower()) if word not in FILLER_WORDS
+    )
+
+
+def overlap(first, second):
+    """Jaccard similarity of two content word sets."""
+    if not first and not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class _Speculation:
+    """One agent query running on a transcript."""
+
+    def __init__(self, transcript, task, expiry):
+        self.transcript = transcript
+        self.words = content_words(transcript)
+        self.task = task
+        self.expiry = expiry  # Timer cancelling the speculation if no toolUse claims it
+        self.started = time.monotonic()
+
+
+class ToolSpeculator:
+    """Runs at most one speculative agent query per session and hands it to the matching toolUse."""
+
+    def __init__(self, run_query, min_overlap=0.75, ttl_seconds=15.0, min_words=3):
+        """
+        Initialize the speculator.
+
+        Args:
+            run_query: Coroutine function answering a query, the same one the tool uses
+            min_overlap: Content word overlap between transcript and toolUse query needed to attach
+            ttl_seconds: Unclaimed speculations are cancelled after this long
+            min_words: Shorter transcripts are not speculated on
+        """
+        self.run_query = run_query
+        self.min_overlap = min_overlap
+        self.ttl_seconds = ttl_seconds
+        self.min_words = min_words
+        self.current = None
+
+    def start(self, transcript):
+        """
+        Start answering a final user transcript if it is read-only.
+
+        Returns:
+            bool: Whether a speculation was started
+        """
+        self.cancel('superseded')
+        if not is_read_only(transcript, self.min_words):
+            return False
+
+        task = asyncio.create_task(self.run_query(transcript))
+        expiry = asyncio.get_running_loop().call_later(self.ttl_seconds, self._expire, task)
+        self.current = _Speculation(transcript, task, expiry)
+        SPECULATIONS.inc(outcome='started')
+        logger.info(f"Speculating on transcript: {transcript[:100]}")
+        return True
+
+    def claim(self, query):
+        """
+        Take the running speculation if it answers the toolUse query.
+
+        Args:
+            query: Query of the supervisorAgent toolUse
+
+        Returns:
+            asyncio.Task with the speculative result, or None to run the query normally
+        """
+        speculation = self.current
+        if speculation is None or speculation.task.cancelled():
+            return None
+
+        similarity = overlap(content_words(query), speculation.words)
+        if similarity < self.min_overlap:
+            logger.info(f"Speculation mismatch ({similarity:.2f}): {speculation.transcript[:60]!r} vs {query[:60]!r}")
+            self.cancel('mismatch')
+            return None
+
+        self.current = None
+        speculation.expiry.cancel()
+        SPECULATIONS.inc(outcome='hit')
+        SPECULATION_HEAD_START_SECONDS.observe(time.monotonic() - speculation.started)
+        return speculation.task
+
+    def _expire(self, task):
+        if self.current is not None and self.current.task is task:
+            self.cancel('expired')
+
+    def cancel(self, outcome):
+        """Cancel the running speculation, counting why."""
+        speculation, self.current = self.current, None
+        if speculation is None:
+            return
+        speculation.expiry.cancel()
+        if not speculation.task.done():
+            speculation.task.cancel()
+        SPECULATIONS.inc(outcome=outcome)
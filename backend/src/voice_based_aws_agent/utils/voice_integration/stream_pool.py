@@ -0,0 +1,150 @@
+"""
+Pool of pre-opened Nova Sonic bidirectional streams.
+
+Opening the stream and sending sessionStart happens before a caller connects, so a
+new WebSocket session can claim a ready stream instead of waiting for the
+handshake. Streams idle in the pool longer than max_idle_seconds are closed and
+replaced before the service-side timeout can end them.
+
+Pooled streams are started with the default S2sEvent.session_start(), so clients
+that send their own inferenceConfiguration should not be served from the pool.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from aws_sdk_bedrock_runtime.client import InvokeModelWithBidirectionalStreamOperationInput
+from aws_sdk_bedrock_runtime.models import InvokeModelWithBidirectionalStreamInputChunk, BidirectionalInputPayloadPart
+from .s2s_events import S2sEvent
+from .bedrock_client import get_bedrock_client
+from src.voice_based_aws_agent.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+STREAM_POOL_CLAIMS = REGISTRY.counter(
+    "voice_stream_pool_claims_total",
+    "Sessions that asked the stream pool for a pre-opened stream",
+    ("result",),
+)
+STREAM_POOL_AVAILABLE = REGISTRY.gauge(
+    "voice_stream_pool_available",
+    "Pre-opened Nova Sonic streams waiting to be claimed",
+)
+STREAM_POOL_RECYCLED = REGISTRY.counter(
+    "voice_stream_pool_recycled_total",
+    "Idle pooled streams closed before the service-side timeout",
+)
+
+
+async def send_event(stream, event_data):
+    """Send one event dict on a Nova Sonic input stream."""
+    event = InvokeModelWithBidirectionalStreamInputChunk(
+        value=BidirectionalInputPayloadPart(bytes_=json.dumps(event_data).encode('utf-8'))
+    )
+    await stream.input_stream.send(event)
+
+
+async def open_stream(model_id, region):
+    """Open a Nova Sonic bidirectional stream on the shared Bedrock client."""
+    client = get_bedrock_client(region)
+    return await client.invoke_model_with_bidirectional_stream(
+        InvokeModelWithBidirectionalStreamOperationInput(model_id=model_id)
+    )
+
+
+class BedrockStreamPool:
+    """Keeps a few Nova Sonic streams open with sessionStart already sent."""
+
+    def __init__(self, model_id='amazon.nova-sonic-v1:0', region='us-east-1', size=2, max_idle_seconds=45):
+        """
+        Initialize the pool.
+
+        Args:
+            model_id: Nova Sonic model to open streams for
+            region: AWS region of the bedrock-runtime endpoint
+            size: Number of streams kept ready
+            max_idle_seconds: Pooled streams older than this are recycled
+        """
+        self.model_id = model_id
+        self.region = region
+        self.size = size
+        self.max_idle_seconds = max_idle_seconds
+        self._streams = []  # (stream, opened_at) pairs, oldest first
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    def start(self):
+        """Start filling and maintaining the pool in the background."""
+        if self._task is None and self.size > 0:
+            self._task = asyncio.create_task(self._maintain())
+
+    def claim(self):
+        """
+        Take a ready stream with sessionStart already sent.
+
+        Returns:
+            (stream, opened_at) with opened_at from time.monotonic(), or
+            (None, None) if none is ready (the caller opens its own)
+        """
+        if not self._streams:
+            STREAM_POOL_CLAIMS.inc(result='miss')
+            return None, None
+
+        stream, opened_at = self._streams.pop()
+        STREAM_POOL_CLAIMS.inc(result='hit')
+        STREAM_POOL_AVAILABLE.set(len(self._streams))
+        self._wakeup.set()
+        return stream, opened_at
+
+    async def _maintain(self):
+        while True:
+            try:
+                await self._recycle_idle()
+                while len(self._streams) < self.size:
+                    stream = await open_stream(self.model_id, self.region)
+                    await send_event(stream, S2sEvent.session_start())
+                    self._streams.append((stream, time.monotonic()))
+                    STREAM_POOL_AVAILABLE.set(len(self._streams))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to pre-open Nova Sonic stream: {e}")
+
+            # Wake up on claims, and in time to recycle the oldest stream
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._seconds_until_recycle())
+            except asyncio.TimeoutError:
+                pass
+
+    def _seconds_until_recycle(self):
+        if not self._streams:
+            return self.max_idle_seconds
+        oldest = self._streams[0][1]
+        return max(0.1, oldest + self.max_idle_seconds - time.monotonic())
+
+    async def _recycle_idle(self):
+        now = time.monotonic()
+        while self._streams and now - self._streams[0][1] >= self.max_idle_seconds:
+            stream, _ = self._streams.pop(0)
+            STREAM_POOL_RECYCLED.inc()
+            await self._close_stream(stream)
+        STREAM_POOL_AVAILABLE.set(len(self._streams))
+
+    async def _close_stream(self, stream):
+        try:
+            await send_event(stream, S2sEvent.session_end())
+            await stream.input_stream.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled stream: {e}")
+
+    async def close(self):
+        """Stop maintaining the pool and close all pooled streams."""
+        if self._task:
+            self._task.cancel()
+            self._task = None
+        streams, self._streams = self._streams, []
+        for stream, _ in streams:
+            await self._close_stream(stream)
+        STREAM_POOL_AVAILABLE.set(0)
@@ -2,11 +2,13 @@
 Integration for the AWS Strands Supervisor Agent.
 """
 
+import asyncio
 import json
 import logging
 import sys
 import os
 from pathlib import Path
+from src.voice_based_aws_agent.utils import tracing
 
 # Add the project root to Python path
 project_root = Path(__file__).parent.parent.parent.parent.parent
@@ -24,10 +26,30 @@ class SupervisorAgentIntegration:
     Integration class for the AWS Strands supervisor agent.
     """
 
-    def __init__(self, config=None):
-        """Initialize the integration with AWS Strands orchestrator."""
+    def __init__(self, config=None, orchestrator_pool=None):
+        """
+        Initialize the integration with AWS Strands orchestrator.
+
+        Args:
+            config: AgentConfig instance for AWS profile and region settings
+            orchestrator_pool: Optional shared AgentOrchestratorPool. When provided, no
+                orchestrator is built for this session; one is leased from the pool per query.
+        """
         self.config = config
         self.orchestrator = None
+        self.orchestrator_pool = orchestrator_pool
+        self.conversation_state = None
+        # The session's own orchestrator runs one query at a time, like a leased one
+        self.orchestrator_lock = asyncio.Lock()
+
+        if orchestrator_pool is not None:
+            from src.voice_based_aws_agent.agents.orchestrator_pool import (
+                ConversationState,
+            )
+
+            self.conversation_state = ConversationState()
+            logger.info("Using shared agent orchestrator pool")
+            return
 
         try:
             # Import and initialize the orchestrator
@@ -60,12 +82,51 @@ class SupervisorAgentIntegration:
             logger.info("Falling back to placeholder mode")
             self.orchestrator = None
 
-    async def query(self, query_text):
+    async def _process_query(self, query, conversation_state):
+        """Answer from the response cache, or run the query on a leased pool orchestrator or the session's own one."""
+        from src.voice_based_aws_agent.agents.response_cache import get_response_cache
+
+        agent_name, cached = get_response_cache().lookup(query)
+        if cached is not None:
+            logger.info(f"Answered from the response cache ({agent_name})")
+            tracing.mark("agent_done", agent=agent_name, cached=True)
+            if conversation_state is not None:
+                self._remember_exchange(agent_name, query, cached, conversation_state)
+            else:
+                # Don't add to an agent's history while a query is running on it
+                async with self.orchestrator_lock:
+                    self._remember_exchange(agent_name, query, cached, conversation_state)
+            return cached
+
+        if self.orchestrator_pool is not None:
+            async with self.orchestrator_pool.lease(conversation_state) as orchestrator:
+                tracing.mark("orchestrator_acquired")
+                return await orchestrator.process_query(query)
+        # Concurrent toolUses would otherwise drive the same agents from two executor threads
+        async with self.orchestrator_lock:
+            tracing.mark("orchestrator_acquired")
+            return await self.orchestrator.process_query(query)
+
+    def _remember_exchange(self, agent_name, query, answer, conversation_state):
+        """Add a cached exchange to the agent's history, as if the agent had answered it."""
+        messages = [
+            {"role": "user", "content": [{"text": query}]},
+            {"role": "assistant", "content": [{"text": answer}]},
+        ]
+        if conversation_state is not None:
+            history = conversation_state.messages.get(agent_name)
+            conversation_state.messages[agent_name] = (history or []) + messages
+        elif self.orchestrator is not None and agent_name in self.orchestrator.specialized_agents:
+            self.orchestrator.specialized_agents[agent_name].messages.extend(messages)
+
+    async def query(self, query_text, conversation_state=None):
         """
         Process a query through the AWS Strands supervisor agent.
 
         Args:
             query_text: The user's query
+            conversation_state: History to run the query against instead of the session's
+                own, e.g. a ConversationState.fork() that may be discarded (pool only)
 
         Returns:
             str: The response from the agent
@@ -90,9 +151,11 @@ class SupervisorAgentIntegration:
                 actual_query = query_text.get("query", str(query_text))
 
             # If orchestrator is available, use it
-            if self.orchestrator:
+            if self.orchestrator or self.orchestrator_pool is not None:
                 try:
-                    response = await self.orchestrator.process_query(actual_query)
+                    response = await self._process_query(
+                        actual_query, conversation_state or self.conversation_state
+                    )
                     logger.info(
                         "Query processed successfully by AWS Strands orchestrator"
                     )
@@ -131,6 +194,9 @@ class SupervisorAgentIntegration:
 
     def shutdown(self):
         """Shutdown the integration."""
+        # Pooled orchestrators are shared and shut down with the server
         if self.orchestrator and hasattr(self.orchestrator, "shutdown"):
             self.orchestrator.shutdown()
+        if self.conversation_state is not None:
+            self.conversation_state.clear()
         logger.info("SupervisorAgentIntegration shutdown")
@@ -0,0 +1,138 @@
+"""
+Server-side voice activity detection for microphone audio.
+
+A NumPy-vectorized energy and zero-crossing detector that decides, per incoming
+PCM chunk, whether it has to reach Nova Sonic. Speech is always forwarded,
+followed by a hangover of trailing silence so Nova Sonic can still detect the end
+of the user's turn. Longer silence is thinned to one keepalive chunk per interval,
+and a short pre-roll of suppressed audio is replayed when speech starts so word
+onsets are not clipped.
+"""
+
+from collections import deque
+import numpy as np
+
+
+class EnergyVAD:
+    """Energy/zero-crossing VAD for 16-bit mono LPCM with an adaptive noise floor."""
+
+    def __init__(
+        self,
+        sample_rate=16000,
+        frame_ms=10,
+        energy_threshold=300.0,
+        noise_ratio=3.0,
+        max_zero_crossing_rate=0.35,
+        hangover_ms=800,
+        preroll_ms=200,
+        keepalive_ms=500,
+    ):
+        """
+        Initialize the detector.
+
+        Args:
+            sample_rate: Sample rate of the PCM input in Hz
+            frame_ms: Analysis frame length in milliseconds
+            energy_threshold: Minimum RMS (int16 scale) for a frame to count as speech
+            noise_ratio: A speech frame must also be this many times louder than the noise floor
+            max_zero_crossing_rate: Frames crossing zero more often than this are treated as noise
+            hangover_ms: Silence still forwarded after speech, needed for endpointing
+            preroll_ms: Suppressed audio replayed right before detected speech
+            keepalive_ms: During long silence, forward one chunk per this interval
+        """
+        self.sample_rate = sample_rate
+        self.frame_samples = max(1, sample_rate * frame_ms // 1000)
+        self.energy_threshold = energy_threshold
+        self.noise_ratio = noise_ratio
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.hangover_ms = hangover_ms
+        self.preroll_ms = preroll_ms
+        self.keepalive_ms = keepalive_ms
+
+        self.noise_floor = energy_threshold / noise_ratio
+        self._hangover_left_ms = 0.0
+        self._since_keepalive_ms = 0.0
+        self._preroll = deque()
+        self._preroll_ms = 0.0
+
+        self.chunks_in = 0
+        self.chunks_out = 0
+        self.last_chunk_speech = False  # Whether the last processed chunk contained speech
+
+    def _chunk_ms(self, pcm):
+        return len(pcm) / 2 / self.sample_rate * 1000
+
+    def is_speech(self, pcm):
+        """
+        Classify a chunk as speech if any of its frames is loud enough relative to the
+        noise floor and not dominated by zero crossings (hiss).
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16, count=len(pcm) // 2)
+        if samples.size == 0:
+            return False
+
+        usable = samples.size - samples.size % self.frame_samples
+        if usable == 0:
+            frames = samples.reshape(1, -1).astype(np.float32)
+        else:
+            frames = samples[:usable].reshape(-1, self.frame_samples).astype(np.float32)
+
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        signs = np.signbit(frames)
+        zero_crossing_rate = np.mean(signs[:, 1:] != signs[:, :-1], axis=1) if frames.shape[1] > 1 else np.zeros(len(frames))
+
+        threshold = max(self.energy_threshold, self.noise_floor * self.noise_ratio)
+        speech = (rms >= threshold) & (zero_crossing_rate <= self.max_zero_crossing_rate)
+
+        # Track the noise floor on non-speech frames only
+        quiet = rms[~speech]
+        if quiet.size:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * float(np.mean(quiet))
+
+        return bool(speech.any())
+
+    def process(self, pcm):
+        """
+        Decide which audio to forward for an incoming chunk.
+
+        Args:
+            pcm: Raw 16-bit mono LPCM chunk
+
+        Returns:
+            list: PCM chunks to send upstream, in order (may be empty)
+        """
+        self.chunks_in += 1
+        chunk_ms = self._chunk_ms(pcm)
+
+        self.last_chunk_speech = self.is_speech(pcm)
+        if self.last_chunk_speech:
+            forwarded = list(self._preroll) + [pcm]
+            self._preroll.clear()
+            self._preroll_ms = 0.0
+            self._hangover_left_ms = self.hangover_ms
+            self._since_keepalive_ms = 0.0
+        elif self._hangover_left_ms > 0:
+            # Trailing silence lets Nova Sonic endpoint the turn
+            self._hangover_left_ms -= chunk_ms
+            self._since_keepalive_ms = 0.0
+            forwarded = [pcm]
+        else:
+            self._since_keepalive_ms += chunk_ms
+            if self._since_keepalive_ms >= self.keepalive_ms:
+                self._since_keepalive_ms = 0.0
+                # Older pre-roll audio must not be replayed after newer audio
+                self._preroll.clear()
+                self._preroll_ms = 0.0
+                forwarded = [pcm]
+            else:
+                self._remember_preroll(pcm, chunk_ms)
+                forwarded = []
+
+        self.chunks_out += len(forwarded)
+        return forwarded
+
+    def _remember_preroll(self, pcm, chunk_ms):
+        self._preroll.append(pcm)
+        self._preroll_ms += chunk_ms
+        while self._preroll and self._preroll_ms - self._chunk_ms(self._preroll[0]) >= self.preroll_ms:
+            self._preroll_ms -= self._chunk_ms(self._preroll.popleft())
@@ -0,0 +1,166 @@
+"""
+Multi-process mode for the voice WebSocket server.
+
+With --workers N the parent process becomes a supervisor that forks N workers.
+Each worker runs its own event loop, agent orchestrator pool and Bedrock stream
+pool (shared nothing) and binds the same port with SO_REUSEPORT, so the kernel
+spreads new connections across workers. The supervisor restarts workers that
+exit unexpectedly and, on SIGTERM or Ctrl+C, tells every worker to drain and
+waits for them to finish. SIGHUP replaces the workers one at a time: the new
+worker starts listening before the old one drains, so restarts drop no calls.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from .server import run_server
+
+logger = logging.getLogger(__name__)
+
+# Workers that die sooner than this after starting are restarted with backoff
+MIN_HEALTHY_UPTIME_SECONDS = 10
+MAX_RESTART_DELAY_SECONDS = 30
+# How long a replacement worker may take to build its agents and start listening
+READY_TIMEOUT_SECONDS = 120
+
+
+def _worker_main(worker_id, run_server_kwargs, ready):
+    """Entry point of a worker process."""
+    # Ctrl+C reaches the whole process group; the supervisor turns it into SIGTERM
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    logger.info(f"Worker {worker_id} started (pid {os.getpid()})")
+    asyncio.run(run_server(**run_server_kwargs, on_ready=ready.set))
+
+
+class WorkerSupervisor:
+    """Starts, restarts and drains the worker processes."""
+
+    def __init__(self, workers, run_server_kwargs, drain_timeout_seconds=30):
+        """
+        Initialize the supervisor.
+
+        Args:
+            workers: Number of worker processes
+            run_server_kwargs: Keyword arguments for run_server in every worker
+            drain_timeout_seconds: How long workers get to drain after SIGTERM
+        """
+        self.workers = workers
+        self.run_server_kwargs = run_server_kwargs
+        self.drain_timeout_seconds = drain_timeout_seconds
+        self._context = multiprocessing.get_context("fork")
+        self._processes = {}  # worker id -> (process, started_at)
+        self._retiring = []  # replaced workers still draining
+        self._crashes = {}  # worker id -> consecutive quick exits
+        self._restart_at = {}  # worker id -> time.monotonic() of a delayed restart
+        self._stopping = False
+        self._restart_requested = False
+
+    def _start_worker(self, worker_id):
+        ready = self._context.Event()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(worker_id, self.run_server_kwargs, ready),
+            name=f"voice-worker-{worker_id}",
+        )
+        process.start()
+        self._processes[worker_id] = (process, time.monotonic())
+        return ready
+
+    def _request_stop(self, signum, frame):
+        logger.info(f"Supervisor received signal {signum}, draining workers")
+        self._stopping = True
+
+    def _request_restart(self, signum, frame):
+        logger.info("Supervisor received SIGHUP, restarting workers one at a time")
+        self._restart_requested = True
+
+    def _rolling_restart(self):
+        """Replace each worker once its replacement is listening; the old one drains."""
+        for worker_id, (old_process, _) in list(self._processes.items()):
+            if self._stopping:
+                return
+            ready = self._start_worker(worker_id)
+            new_process = self._processes[worker_id][0]
+            deadline = time.monotonic() + READY_TIMEOUT_SECONDS
+            while not ready.wait(0.5):
+                if self._stopping or not new_process.is_alive() or time.monotonic() > deadline:
+                    # Keep serving on the old worker and stop the rollout
+                    logger.error(f"Replacement for worker {worker_id} did not become ready, keeping the old one")
+                    if new_process.is_alive():
+                        new_process.kill()
+                    new_process.join()
+                    self._processes[worker_id] = (old_process, time.monotonic())
+                    return
+            os.kill(old_process.pid, signal.SIGTERM)
+            self._retiring.append(old_process)
+            logger.info(f"Worker {worker_id} replaced: pid {old_process.pid} draining, pid {new_process.pid} serving")
+
+    def _check_workers(self):
+        """Schedule restarts for exited workers and start the ones that are due."""
+        self._retiring = [process for process in self._retiring if process.is_alive()]
+        now = time.monotonic()
+        for worker_id, (process, started_at) in list(self._processes.items()):
+            if process.is_alive():
+                continue
+            del self._processes[worker_id]
+
+            # Quick repeated exits (e.g. port or credential problems) back off
+            if now - started_at < MIN_HEALTHY_UPTIME_SECONDS:
+                self._crashes[worker_id] = self._crashes.get(worker_id, 0) + 1
+            else:
+                self._crashes[worker_id] = 0
+            delay = min(MAX_RESTART_DELAY_SECONDS, 2 ** self._crashes[worker_id] - 1)
+            logger.warning(
+                f"Worker {worker_id} (pid {process.pid}) exited with code {process.exitcode}, "
+                f"restarting in {delay}s"
+            )
+            self._restart_at[worker_id] = now + delay
+
+        for worker_id, restart_at in list(self._restart_at.items()):
+            if now >= restart_at:
+                del self._restart_at[worker_id]
+                self._start_worker(worker_id)
+
+    def _stop_workers(self):
+        """SIGTERM every worker, wait for the drain, then kill what is left."""
+        processes = [process for process, _ in self._processes.values() if process.is_alive()]
+        for process in processes:
+            os.kill(process.pid, signal.SIGTERM)
+        # Replaced workers were already told to drain
+        processes += [process for process in self._retiring if process.is_alive()]
+
+        # Workers drain for up to drain_timeout_seconds, plus time to shut down
+        deadline = time.monotonic() + self.drain_timeout_seconds + 5
+        for process in processes:
+            process.join(max(0, deadline - time.monotonic()))
+
+        killed = [process for process in processes if process.is_alive()]
+        for process in killed:
+            logger.warning(f"Worker pid {process.pid} did not stop in time, killing it")
+            process.kill()
+            process.join()
+        logger.info(f"Workers stopped: {len(processes) - len(killed)} exited, {len(killed)} killed")
+
+    def run(self):
+        """Run the workers until SIGTERM or Ctrl+C."""
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        signal.signal(signal.SIGHUP, self._request_restart)
+
+        for worker_id in range(self.workers):
+            self._start_worker(worker_id)
+        logger.info(f"Supervisor (pid {os.getpid()}) started {self.workers} workers")
+
+        while not self._stopping:
+            time.sleep(0.5)
+            if self._restart_requested and not self._stopping:
+                self._restart_requested = False
+                self._rolling_restart()
+            if not self._stopping:
+                self._check_workers()
+
+        self._stop_workers()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark event loop lag while agents are working
+
+Runs N concurrent tool calls through SupervisorAgent.route_query against fake
+specialized agents that block like a real Bedrock/use_aws call, while a ticker
+measures how late the event loop wakes up. Compares the old inline invocation
+with the dedicated agent executor.
+
+How to run:
+    cd /path/to/project
+    uv run python test/bench_agent_loop_lag.py --calls 16 --agent-seconds 0.5
+
+Expected output:
+    Loop lag p50/p99/max for both modes; the executor mode stays within
+    --max-lag-ms and the script exits 0.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from src.voice_based_aws_agent.agents.supervisor_agent import SupervisorAgent
+from src.voice_based_aws_agent.agents.query_router import QueryRouter
+from src.voice_based_aws_agent.agents.agent_executor import configure_agent_executor, shutdown_agent_executor
+
+TICK_SECONDS = 0.01
+
+
+class BlockingAgent:
+    """Stand-in for a specialized agent whose call blocks its thread."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+
+    def __call__(self, query):
+        time.sleep(self.seconds)
+        return f"done: {query}"
+
+
+class InlineSupervisor(SupervisorAgent):
+    """Supervisor that calls the agent directly on the loop, as before."""
+
+    async def route_query(self, query):
+        return str(self.specialized_agents[self._determine_agent(query)](query))
+
+
+def make_supervisor(cls, agent_seconds):
+    # Skip __init__: routing only needs the specialized agents and a router
+    supervisor = cls.__new__(cls)
+    agent = BlockingAgent(agent_seconds)
+    supervisor.specialized_agents = {"EC2Agent": agent, "AWSResearcherAgent": agent}
+    supervisor.router = QueryRouter()
+    return supervisor
+
+
+async def measure(supervisor, calls):
+    lags = []
+    done = asyncio.Event()
+
+    async def ticker():
+        while not done.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(TICK_SECONDS)
+            lags.append((time.perf_counter() - start - TICK_SECONDS) * 1000)
+
+    tick_task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    await asyncio.gather(*(supervisor.route_query(f"list ec2 instances {i}") for i in range(calls)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await tick_task
+    return sorted(lags) or [0.0], elapsed
+
+
+def percentile(values, pct):
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+def report(name, lags, elapsed):
+    print(f"{name:>9}: wall {elapsed:6.2f}s  lag p50 {percentile(lags, 50):7.1f}ms  "
+          f"p99 {percentile(lags, 99):7.1f}ms  max {lags[-1]:7.1f}ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Agent loop lag benchmark")
+    parser.add_argument("--calls", type=int, default=16, help="Concurrent tool calls")
+    parser.add_argument("--agent-seconds", type=float, default=0.5, help="Blocking time per agent call")
+    parser.add_argument("--workers", type=int, default=8, help="Agent executor workers")
+    parser.add_argument("--max-lag-ms", type=float, default=50.0, help="Allowed max loop lag with the executor")
+    args = parser.parse_args()
+
+    configure_agent_executor(args.workers)
+    try:
+        inline_lags, inline_elapsed = await measure(make_supervisor(InlineSupervisor, args.agent_seconds), args.calls)
+        executor_lags, executor_elapsed = await measure(make_supervisor(SupervisorAgent, args.agent_seconds), args.calls)
+    finally:
+        shutdown_agent_executor()
+
+    report("inline", inline_lags, inline_elapsed)
+    report("executor", executor_lags, executor_elapsed)
+
+    if executor_lags[-1] > args.max_lag_ms:
+        print(f"❌ Loop lag {executor_lags[-1]:.1f}ms exceeds {args.max_lag_ms}ms")
+        return 1
+    print("✅ Loop lag stays bounded with the agent executor")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark the supervisor's routers
+
+Compares the old substring scan over keyword lists, the compiled route table
+and the semantic router: routing accuracy on the routing corpus and time per
+query, then how the cost of the keyword routers grows as synthetic routes are
+added to both.
+
+How to run:
+    cd /path/to/project
+    uv run python test/bench_query_router.py --iterations 2000
+
+Expected output:
+    Accuracy and microseconds per query for each router, then a table of time
+    per query against the number of routes.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from src.voice_based_aws_agent.agents.query_router import QueryRouter
+from src.voice_based_aws_agent.agents.semantic_router import SemanticRouter
+from src.voice_based_aws_agent.config.routing_config import DEFAULT_AGENT, ROUTES, Route
+from routing_corpus import ROUTING_CORPUS
+
+
+class SubstringRouter:
+    """The previous router: any(keyword in query) per route, in priority order."""
+
+    def __init__(self, routes, default_agent=DEFAULT_AGENT):
+        self.routes = sorted(routes, key=lambda route: -route.priority)
+        self.default_agent = default_agent
+
+    def route(self, query):
+        query_lower = query.lower()
+        for route in self.routes:
+            if any(keyword in query_lower for keyword in route.keywords):
+                return route.agent
+        return self.default_agent
+
+
+def synthetic_routes(count, keywords_per_route=10):
+    """Routes whose keywords never occur in the corpus, so every query scans all of them."""
+    return [
+        Route(agent=f"Agent{i}", keywords=tuple(f"kw{i}x{j}" for j in range(keywords_per_route)))
+        for i in range(count)
+    ]
+
+
+def time_per_query(router, queries, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for query in queries:
+            router.route(query)
+    return (time.perf_counter() - start) / (iterations * len(queries)) * 1e6
+
+
+def accuracy(router):
+    return sum(router.route(query) == expected for query, expected in ROUTING_CORPUS) / len(ROUTING_CORPUS)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Supervisor router benchmark")
+    parser.add_argument("--iterations", type=int, default=2000, help="Passes over the corpus per measurement")
+    args = parser.parse_args()
+
+    queries = [query for query, _ in ROUTING_CORPUS]
+    routers = (("substring", SubstringRouter(ROUTES)), ("compiled", QueryRouter(ROUTES)), ("semantic", SemanticRouter()))
+    for name, router in routers:
+        print(f"{name:>9}: accuracy {accuracy(router):6.1%}  {time_per_query(router, queries, args.iterations):6.2f}µs/query")
+
+    print(f"\n{'routes':>7} {'substring':>12} {'compiled':>12}")
+    for extra in (0, 10, 50, 200):
+        routes = list(ROUTES) + synthetic_routes(extra)
+        substring = time_per_query(SubstringRouter(routes), queries, max(1, args.iterations // 10))
+        compiled = time_per_query(QueryRouter(routes), queries, max(1, args.iterations // 10))
+        print(f"{len(routes):>7} {substring:>10.2f}µs {compiled:>10.2f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Benchmark server-side voice activity detection
+
+Feeds 16 kHz mono PCM through EnergyVAD in frontend-sized chunks and reports how
+many audioInput events would still reach Nova Sonic, plus the per-chunk cost.
+
+How to run:
+    cd /path/to/project
+    uv run python test/bench_vad.py --audio recording.wav
+    uv run python test/bench_vad.py            # synthetic speech/silence mix
+
+Expected output:
+    Chunk counts in/out, the reduction in percent and microseconds per chunk.
+"""
+
+import argparse
+import os
+import sys
+import time
+import wave
+
+import numpy as np
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from src.voice_based_aws_agent.utils.voice_integration.vad import EnergyVAD
+
+SAMPLE_RATE = 16000
+
+
+def load_wav(path):
+    """Load a 16-bit mono 16 kHz WAV file as raw PCM."""
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2 or wav.getnchannels() != 1 or wav.getframerate() != SAMPLE_RATE:
+            raise ValueError("Expected 16-bit mono 16 kHz WAV audio")
+        return wav.readframes(wav.getnframes())
+
+
+def synthesize(seconds, seed=0):
+    """
+    Build a call-like recording: short utterances of voiced, amplitude-modulated
+    harmonics separated by long stretches of low background noise.
+    """
+    rng = np.random.default_rng(seed)
+    audio = rng.normal(0, 40, int(seconds * SAMPLE_RATE))
+    position = int(2 * SAMPLE_RATE)
+    while position < len(audio):
+        length = int(rng.uniform(1.0, 3.0) * SAMPLE_RATE)
+        t = np.arange(min(length, len(audio) - position)) / SAMPLE_RATE
+        pitch = rng.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.5 + 0.5 * np.sin(2 * np.pi * 4 * t) ** 2
+        audio[position:position + len(t)] += 4000 * voiced * envelope
+        position += length + int(rng.uniform(4.0, 10.0) * SAMPLE_RATE)
+    return np.clip(audio, -32768, 32767).astype(np.int16).tobytes()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="VAD frame reduction benchmark")
+    parser.add_argument("--audio", help="16-bit mono 16 kHz WAV recording")
+    parser.add_argument("--seconds", type=float, default=120.0, help="Length of synthetic audio")
+    parser.add_argument("--chunk-samples", type=int, default=171, help="Samples per microphone chunk (frontend sends ~171)")
+    args = parser.parse_args()
+
+    pcm = load_wav(args.audio) if args.audio else synthesize(args.seconds)
+    chunk_bytes = args.chunk_samples * 2
+    chunks = [pcm[i:i + chunk_bytes] for i in range(0, len(pcm), chunk_bytes)]
+
+    vad = EnergyVAD(sample_rate=SAMPLE_RATE)
+    start = time.perf_counter()
+    for chunk in chunks:
+        vad.process(chunk)
+    elapsed = time.perf_counter() - start
+
+    reduction = 100.0 * (1 - vad.chunks_out / max(1, vad.chunks_in))
+    print(f"Audio: {len(pcm) / 2 / SAMPLE_RATE:.1f}s in {vad.chunks_in} chunks")
+    print(f"Forwarded: {vad.chunks_out} chunks ({reduction:.1f}% fewer audioInput events)")
+    print(f"Cost: {elapsed / max(1, vad.chunks_in) * 1e6:.1f}µs per chunk")
+
+
+if __name__ == "__main__":
+    main()
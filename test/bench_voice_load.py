@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+
+"""
+End-to-end voice load test
+
+Opens N WebSocket clients against the voice server. Each client replays the
+frontend's event sequence (sessionStart, promptStart, system prompt, audio
+contentStart) and then streams recorded 16 kHz PCM at real-time pace. By
+default the server is started here with --fake-nova-sonic, so no network or
+AWS credentials are needed.
+
+For every session the script records time-to-first-audio (first audioInput sent
+to first audioOutput received), reply latency (USER transcript to first audio of
+the reply) and output jitter (how far audioOutput arrival strays from playback
+pace). It also reports dropped events from the server's /metrics and the
+server's CPU and RSS read from /proc. The fake server answers tool queries with
+a canned agent; if its log shows the agent layer failed to start, sessions got
+placeholder answers and the run fails.
+
+How to run:
+    cd /path/to/project
+    uv run python test/bench_voice_load.py --sessions 50 --seconds 30
+    uv run python test/bench_voice_load.py --audio recording.wav --binary
+    uv run python test/bench_voice_load.py --url ws://localhost:8081 --server-pid 1234
+
+Expected output:
+    Latency and jitter percentiles across sessions, dropped events, server CPU
+    and RSS. The script exits 1 when a session fails, a --max-* limit is exceeded
+    or the server log has orchestrator initialisation errors.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+import uuid
+
+import websockets
+
+# Add the backend directory to the path
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), '..', 'backend')
+sys.path.insert(0, BACKEND_DIR)
+sys.path.insert(0, os.path.dirname(__file__))
+
+from bench_vad import SAMPLE_RATE, load_wav, synthesize
+from src.voice_based_aws_agent.utils.voice_integration.audio_framing import (
+    AUDIO_INPUT_FRAME, decode_audio_frame, encode_audio_frame,
+)
+from src.voice_based_aws_agent.utils.voice_integration.s2s_events import S2sEvent
+
+OUTPUT_BYTES_PER_MS = 24000 * 2 / 1000  # audioOutput is 24 kHz 16-bit mono
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE')
+# Server-side queue policies that lose audio or events
+DROP_POLICIES = ('input_dropped_stale', 'input_dropped_full', 'output_dropped_oldest')
+QUEUE_POLICY_PATTERN = re.compile(r'voice_queue_policy_events_total\{policy="(\w+)"\} ([0-9.e+]+)')
+# Server log lines saying sessions won't get agent answers
+ORCHESTRATOR_ERROR_PATTERN = re.compile(
+    r'Failed to (?:build agent orchestrator pool|initialize AWS Strands orchestrator)|Falling back to placeholder mode'
+)
+
+
+class SessionStats:
+    """What one simulated caller observed."""
+
+    def __init__(self):
+        self.connected_at = None
+        self.first_audio_in_at = None
+        self.first_audio_out_at = None
+        self.transcript_at = None
+        self.reply_latencies = []  # seconds from USER transcript to first reply audio
+        self.jitter_ms = []  # per audioOutput: arrival minus its playback deadline
+        self.events_in = 0
+        self.audio_chunks_out = 0
+        self.unfinished_contents = 0
+        self.error = None
+
+    @property
+    def ttfa(self):
+        if self.first_audio_in_at is None or self.first_audio_out_at is None:
+            return None
+        return self.first_audio_out_at - self.first_audio_in_at
+
+
+def session_setup_events(prompt_name, text_content_name, audio_content_name):
+    """The events the frontend sends right after connecting."""
+    return [
+        S2sEvent.session_start(),
+        S2sEvent.prompt_start(prompt_name),
+        S2sEvent.content_start_text(prompt_name, text_content_name),
+        S2sEvent.text_input(prompt_name, text_content_name),
+        S2sEvent.content_end(prompt_name, text_content_name),
+        S2sEvent.content_start_audio(prompt_name, audio_content_name),
+    ]
+
+
+async def send_audio(websocket, stats, chunks, prompt_name, content_name, seconds, chunk_seconds, binary):
+    """Stream the recording in a loop at real-time pace."""
+    started = time.monotonic()
+    for index in range(int(seconds / chunk_seconds)):
+        await asyncio.sleep(max(0, started + index * chunk_seconds - time.monotonic()))
+        pcm = chunks[index % len(chunks)]
+        if binary:
+            await websocket.send(encode_audio_frame(AUDIO_INPUT_FRAME, prompt_name, content_name, pcm))
+        else:
+            content = base64.b64encode(pcm).decode('utf-8')
+            await websocket.send(json.dumps(S2sEvent.audio_input(prompt_name, content_name, content)))
+        if stats.first_audio_in_at is None:
+            stats.first_audio_in_at = time.monotonic()
+
+
+async def receive_events(websocket, stats):
+    """Record latency and playback jitter of everything the server sends."""
+    open_contents = set()
+    playout = {}  # contentId -> (first arrival, audio milliseconds received so far)
+    async for message in websocket:
+        now = time.monotonic()
+        stats.events_in += 1
+        if isinstance(message, bytes):
+            _, _, content_id, pcm = decode_audio_frame(message)
+            audio_ms = len(pcm) / OUTPUT_BYTES_PER_MS
+        else:
+            event = json.loads(message).get('event', {})
+            if 'audioOutput' not in event:
+                if 'textOutput' in event and event['textOutput'].get('role') == 'USER':
+                    stats.transcript_at = now
+                elif 'contentStart' in event:
+                    open_contents.add(event['contentStart'].get('contentId'))
+                elif 'contentEnd' in event:
+                    open_contents.discard(event['contentEnd'].get('contentId'))
+                continue
+            content_id = event['audioOutput'].get('contentId')
+            audio_ms = len(base64.b64decode(event['audioOutput']['content'])) / OUTPUT_BYTES_PER_MS
+
+        stats.audio_chunks_out += 1
+        if stats.first_audio_out_at is None:
+            stats.first_audio_out_at = now
+        if stats.transcript_at is not None:
+            stats.reply_latencies.append(now - stats.transcript_at)
+            stats.transcript_at = None
+
+        # A chunk is due when the audio before it has finished playing
+        first_arrival, played_ms = playout.get(content_id, (now, 0.0))
+        stats.jitter_ms.append((now - first_arrival) * 1000 - played_ms)
+        playout[content_id] = (first_arrival, played_ms + audio_ms)
+    stats.unfinished_contents = len(open_contents)
+
+
+async def run_session(url, chunks, args, stats):
+    """One caller: connect, set up the session, talk for --seconds, hang up."""
+    prompt_name, text_content_name, audio_content_name = (str(uuid.uuid4()) for _ in range(3))
+    try:
+        async with websockets.connect(url, max_size=None) as websocket:
+            stats.connected_at = time.monotonic()
+            receiver = asyncio.create_task(receive_events(websocket, stats))
+            for event in session_setup_events(prompt_name, text_content_name, audio_content_name):
+                await websocket.send(json.dumps(event))
+            await send_audio(websocket, stats, chunks, prompt_name, audio_content_name,
+                             args.seconds, args.chunk_samples / SAMPLE_RATE, args.binary)
+
+            # Let the last reply finish, then hang up like the frontend does
+            await asyncio.sleep(args.linger)
+            for event in (S2sEvent.content_end(prompt_name, audio_content_name),
+                          S2sEvent.prompt_end(prompt_name), S2sEvent.session_end()):
+                await websocket.send(json.dumps(event))
+            await websocket.close()
+            await receiver
+    except Exception as e:
+        stats.error = f"{type(e).__name__}: {e}"
+
+
+def process_tree(pid):
+    """The server process and its direct children (worker processes)."""
+    pids = [pid]
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    if int(f.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        pids.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    return pids
+
+
+def read_usage(pid):
+    """(CPU seconds, RSS bytes) of the server processes."""
+    cpu, rss = 0.0, 0
+    for process in process_tree(pid):
+        try:
+            with open(f'/proc/{process}/stat') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+            with open(f'/proc/{process}/statm') as f:
+                rss += int(f.read().split()[1]) * PAGE_SIZE
+        except OSError:
+            continue
+        # utime and stime are fields 14 and 15 of /proc/<pid>/stat
+        cpu += (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+    return cpu, rss
+
+
+async def sample_usage(pid, samples, interval=1.0):
+    """Append (CPU percent, RSS bytes) samples until cancelled."""
+    last_cpu, _ = read_usage(pid)
+    last_at = time.monotonic()
+    while True:
+        await asyncio.sleep(interval)
+        cpu, rss = read_usage(pid)
+        now = time.monotonic()
+        samples.append((100.0 * (cpu - last_cpu) / (now - last_at), rss))
+        last_cpu, last_at = cpu, now
+
+
+def dropped_events(metrics_url):
+    """Server queue policy counters that lose events, by policy."""
+    try:
+        with urllib.request.urlopen(metrics_url, timeout=5) as response:
+            text = response.read().decode('utf-8')
+    except OSError:
+        return {}
+    counts = {policy: 0.0 for policy in DROP_POLICIES}
+    for policy, value in QUEUE_POLICY_PATTERN.findall(text):
+        if policy in counts:
+            counts[policy] = float(value)
+    return counts
+
+
+def orchestrator_errors(log_path):
+    """Lines of the server log showing the agent layer failed to start."""
+    with open(log_path, errors='replace') as log:
+        return [line.strip() for line in log if ORCHESTRATOR_ERROR_PATTERN.search(line)]
+
+
+def start_server(port, args):
+    """Start the voice server against the fake Nova Sonic and wait until it is healthy."""
+    command = [sys.executable, '-m', 'src.voice_based_aws_agent.main', '--fake-nova-sonic',
+               '--host', '127.0.0.1', '--port', str(port), '--max-sessions', str(args.sessions),
+               '--workers', str(args.workers)]
+    if not args.server_log:
+        args.server_log = tempfile.NamedTemporaryFile(prefix='voice-server-', suffix='.log', delete=False).name
+    log = open(args.server_log, 'w')
+    server = subprocess.Popen(command, cwd=BACKEND_DIR, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Server exited with code {server.returncode}")
+        try:
+            urllib.request.urlopen(f'http://127.0.0.1:{port}/health', timeout=1)
+            return server
+        except OSError:
+            time.sleep(0.5)
+    server.kill()
+    raise RuntimeError("Server did not become healthy within 60s")
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else float('nan')
+
+
+def report_line(name, values, unit='ms', scale=1000.0):
+    print(f"{name:>16}: p50 {percentile(values, 50) * scale:8.1f}{unit}  "
+          f"p95 {percentile(values, 95) * scale:8.1f}{unit}  max {max(values, default=float('nan')) * scale:8.1f}{unit}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="End-to-end voice server load test")
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent WebSocket clients")
+    parser.add_argument("--seconds", type=float, default=20.0, help="How long each client streams audio")
+    parser.add_argument("--ramp-seconds", type=float, default=2.0, help="Spread client connects over this time")
+    parser.add_argument("--linger", type=float, default=3.0, help="Seconds to wait for the last reply before hanging up")
+    parser.add_argument("--audio", help="16-bit mono 16 kHz WAV recording to replay (synthetic speech if omitted)")
+    parser.add_argument("--chunk-samples", type=int, default=171, help="Samples per microphone chunk (frontend sends ~171)")
+    parser.add_argument("--binary", action="store_true", help="Send and receive audio as binary frames")
+    parser.add_argument("--url", help="Server to test; without it a fake Nova Sonic server is started")
+    parser.add_argument("--server-pid", type=int, help="Server process for CPU/RSS when using --url")
+    parser.add_argument("--port", type=int, default=18081, help="Port of the server started by this script")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes of the server started by this script")
+    parser.add_argument("--server-log", help="File for the output of the server started by this script (a temporary file if omitted)")
+    parser.add_argument("--max-ttfa-ms", type=float, help="Fail if p95 time-to-first-audio exceeds this")
+    parser.add_argument("--max-jitter-ms", type=float, help="Fail if p95 output jitter exceeds this")
+    parser.add_argument("--max-dropped", type=int, default=0, help="Fail if the server dropped more events than this")
+    args = parser.parse_args()
+
+    pcm = load_wav(args.audio) if args.audio else synthesize(max(args.seconds, 10.0))
+    chunk_bytes = args.chunk_samples * 2
+    chunks = [pcm[i:i + chunk_bytes] for i in range(0, len(pcm) - chunk_bytes + 1, chunk_bytes)]
+
+    server = None
+    if args.url:
+        url, server_pid = args.url, args.server_pid
+    else:
+        server = start_server(args.port, args)
+        url, server_pid = f'ws://127.0.0.1:{args.port}', server.pid
+    http_url = url.replace('ws://', 'http://', 1).replace('wss://', 'https://', 1).split('?')[0].rstrip('/')
+    if args.binary:
+        url += ('&' if '?' in url else '?') + 'audio=binary'
+
+    usage = []
+    usage_task = asyncio.create_task(sample_usage(server_pid, usage)) if server_pid else None
+    dropped_before = dropped_events(f'{http_url}/metrics')
+    stats = [SessionStats() for _ in range(args.sessions)]
+
+    async def delayed(index):
+        await asyncio.sleep(args.ramp_seconds * index / max(1, args.sessions))
+        await run_session(url, chunks, args, stats[index])
+
+    started = time.monotonic()
+    try:
+        await asyncio.gather(*(delayed(i) for i in range(args.sessions)))
+    finally:
+        elapsed = time.monotonic() - started
+        if usage_task:
+            usage_task.cancel()
+        dropped_after = dropped_events(f'{http_url}/metrics')
+        if server:
+            server.terminate()
+            server.wait(timeout=60)
+
+    failed = [s for s in stats if s.error]
+    ttfa = [s.ttfa for s in stats if s.ttfa is not None]
+    replies = [latency for s in stats for latency in s.reply_latencies]
+    jitter = [j / 1000 for s in stats for j in s.jitter_ms]
+    dropped = {policy: dropped_after.get(policy, 0) - dropped_before.get(policy, 0) for policy in dropped_after}
+    total_dropped = int(sum(dropped.values()))
+    agent_errors = orchestrator_errors(args.server_log) if server else []
+
+    print(f"Sessions: {args.sessions} for {args.seconds:.0f}s of audio ({elapsed:.1f}s wall), {len(failed)} failed, "
+          f"{sum(1 for s in stats if s.ttfa is None and not s.error)} without audio")
+    print(f"Events received: {sum(s.events_in for s in stats)} ({sum(s.audio_chunks_out for s in stats)} audioOutput), "
+          f"{sum(s.unfinished_contents for s in stats)} contents never ended")
+    report_line("time-to-first-audio", ttfa)
+    report_line("reply latency", replies)
+    report_line("output jitter", jitter)
+    print(f"Dropped events: {total_dropped} {dropped if dropped else '(metrics unavailable)'}")
+    if usage:
+        print(f"Server CPU: avg {sum(c for c, _ in usage) / len(usage):.1f}%  peak {max(c for c, _ in usage):.1f}%  "
+              f"RSS peak {max(r for _, r in usage) / 2**20:.1f} MiB")
+    for s in failed[:5]:
+        print(f"  session error: {s.error}")
+    for line in agent_errors[:5]:
+        print(f"  server log: {line}")
+
+    problems = []
+    if failed:
+        problems.append(f"{len(failed)} sessions failed")
+    if len(ttfa) < args.sessions:
+        problems.append(f"{args.sessions - len(ttfa)} sessions got no audio")
+    if args.max_ttfa_ms is not None and percentile(ttfa, 95) * 1000 > args.max_ttfa_ms:
+        problems.append(f"p95 time-to-first-audio above {args.max_ttfa_ms}ms")
+    if args.max_jitter_ms is not None and percentile(jitter, 95) * 1000 > args.max_jitter_ms:
+        problems.append(f"p95 output jitter above {args.max_jitter_ms}ms")
+    if total_dropped > args.max_dropped:
+        problems.append(f"{total_dropped} dropped events")
+    if agent_errors:
+        problems.append(f"orchestrator initialisation errors in {args.server_log}")
+    if problems:
+        print(f"❌ {', '.join(problems)}")
+        return 1
+    print("✅ All sessions got timely audio without dropped events")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
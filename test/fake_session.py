@@ -0,0 +1,157 @@
+"""
+Helpers for tests that run a voice session against the in-process fake Nova Sonic
+
+start_session() builds an S2sSessionManager on a FakeNovaSonicClient and a canned
+agent pool and sends the frontend's setup events, the way the WebSocket handler
+does. fake_server() serves the real WebSocket handler on a local port instead,
+for tests that need connection handling; connect() opens a client on it.
+speech() and silence() build 16 kHz microphone chunks for the session's speech
+detector.
+"""
+import asyncio
+import base64
+import json
+import os
+import sys
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import numpy as np
+import websockets
+from websockets.server import serve
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from src.voice_based_aws_agent.config.config import FakeNovaSonicConfig, VoiceSessionConfig
+from src.voice_based_aws_agent.utils.voice_integration import server
+from src.voice_based_aws_agent.utils.voice_integration.admission import AdmissionController
+from src.voice_based_aws_agent.utils.voice_integration.bedrock_client import use_client
+from src.voice_based_aws_agent.utils.voice_integration.fake_nova_sonic import (
+    FakeAgentOrchestratorPool,
+    FakeNovaSonicClient,
+)
+from src.voice_based_aws_agent.utils.voice_integration.s2s_events import S2sEvent
+from src.voice_based_aws_agent.utils.voice_integration.s2s_session_manager import S2sSessionManager
+
+SAMPLE_RATE = 16000
+CHUNK_MS = 32
+PROMPT_NAME = "prompt"
+AUDIO_CONTENT_NAME = "audio"
+
+
+def speech(ms=CHUNK_MS):
+    """A voiced microphone chunk, loud enough for the energy detector."""
+    t = np.arange(SAMPLE_RATE * ms // 1000) / SAMPLE_RATE
+    return (4000 * np.sin(2 * np.pi * 180 * t)).astype(np.int16).tobytes()
+
+
+def silence(ms=CHUNK_MS):
+    """A silent microphone chunk."""
+    return bytes(SAMPLE_RATE * ms // 1000 * 2)
+
+
+def fast_script(**overrides):
+    """Fake Nova Sonic script without realistic delays."""
+    values = dict(turn_after_chunks=10, response_delay_ms=10, reply_audio_ms=80,
+                  realtime=False, agent_delay_ms=10)
+    values.update(overrides)
+    return FakeNovaSonicConfig(**values)
+
+
+def setup_events():
+    """The frontend's events before it streams microphone audio."""
+    return [
+        S2sEvent.session_start(),
+        S2sEvent.prompt_start(PROMPT_NAME),
+        S2sEvent.content_start_text(PROMPT_NAME, "system"),
+        S2sEvent.text_input(PROMPT_NAME, "system"),
+        S2sEvent.content_end(PROMPT_NAME, "system"),
+        S2sEvent.content_start_audio(PROMPT_NAME, AUDIO_CONTENT_NAME),
+    ]
+
+
+async def start_session(script=None, session_config=None, **kwargs):
+    """
+    Open a session on a fake stream and send the frontend's setup events.
+
+    Returns:
+        (session, FakeNovaSonicClient)
+    """
+    script = script or fast_script()
+    pool = FakeAgentOrchestratorPool(script, size=1)
+    pool.start()
+    session = S2sSessionManager(session_config=session_config or VoiceSessionConfig(),
+                                orchestrator_pool=pool, **kwargs)
+    client = FakeNovaSonicClient(script)
+    session.bedrock_client = client
+    await session.initialize_stream()
+
+    session.prompt_name = PROMPT_NAME
+    session.audio_content_name = AUDIO_CONTENT_NAME
+    for event in setup_events():
+        await session.send_raw_event(event)
+    return session, client
+
+
+async def send_audio(session, chunks):
+    """Queue microphone chunks at about real-time pace."""
+    for chunk in chunks:
+        session.add_audio_chunk(PROMPT_NAME, AUDIO_CONTENT_NAME, chunk)
+        await asyncio.sleep(CHUNK_MS / 1000)
+
+
+async def wait_for_event(session, name, role=None, timeout=3.0):
+    """Read the session's output queue until an event of this name (and role) arrives."""
+    async def read():
+        while True:
+            event = await session.output_queue.get()
+            if isinstance(event, str):
+                event = json.loads(event)
+            body = event.get('event', {}).get(name)
+            if body is not None and (role is None or body.get('role') == role):
+                return body
+    return await asyncio.wait_for(read(), timeout)
+
+
+@asynccontextmanager
+async def fake_server(script=None, session_config=None, max_sessions=10):
+    """
+    Serve the voice WebSocket handler on a free local port with the fake Nova Sonic.
+
+    Yields:
+        Namespace with url, the websockets server, its AdmissionController and the
+        FakeNovaSonicClient
+    """
+    script = script or fast_script()
+    client = FakeNovaSonicClient(script)
+    pool = FakeAgentOrchestratorPool(script, size=1)
+    pool.start()
+    admission = AdmissionController(max_sessions, queue_size=0)
+    use_client(client)
+    try:
+        async with serve(
+            lambda ws, path: server.websocket_handler(ws, path, None, pool, session_config, None, admission),
+            "127.0.0.1",
+            0,
+        ) as ws_server:
+            port = ws_server.sockets[0].getsockname()[1]
+            yield SimpleNamespace(url=f"ws://127.0.0.1:{port}", server=ws_server, admission=admission, client=client)
+    finally:
+        use_client(None)
+
+
+async def connect(url):
+    """Open a client and send the setup events."""
+    websocket = await websockets.connect(url)
+    for event in setup_events():
+        await websocket.send(json.dumps(event))
+    return websocket
+
+
+async def send_client_audio(websocket, chunks):
+    """Send microphone chunks as audioInput events at about real-time pace."""
+    for chunk in chunks:
+        content = base64.b64encode(chunk).decode('utf-8')
+        await websocket.send(json.dumps(S2sEvent.audio_input(PROMPT_NAME, AUDIO_CONTENT_NAME, content)))
+        await asyncio.sleep(CHUNK_MS / 1000)
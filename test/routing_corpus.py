@@ -0,0 +1,54 @@
+"""
+Routing accuracy corpus: (query, expected agent) pairs for the supervisor's router.
+Used by test_query_router.py and bench_query_router.py.
+"""
+
+ROUTING_CORPUS = [
+    # EC2 operations
+    ("List my EC2 instances", "EC2Agent"),
+    ("How many instances are running right now?", "EC2Agent"),
+    ("Stop the instance called web-1", "EC2Agent"),
+    ("Start my servers in us-east-1", "EC2Agent"),
+    ("Which VMs are stopped?", "EC2Agent"),
+    ("Show me the virtual machines in my account", "EC2Agent"),
+    ("Describe the security groups attached to my web server", "EC2Agent"),
+    ("What AMIs do I have?", "EC2Agent"),
+    ("Which VPC is the database instance in?", "EC2Agent"),
+    ("Give me a status check of my compute fleet", "EC2Agent"),
+    ("Reboot ec2 instance i-0abc123", "EC2Agent"),
+    ("Is the virtual\tmachine for staging up?", "EC2Agent"),
+    # Lambda goes to research even next to EC2 words
+    ("What is the maximum timeout of a Lambda function?", "AWSResearcherAgent"),
+    ("Can a lambda run inside my VPC?", "AWSResearcherAgent"),
+    ("Should I use Lambda or an EC2 instance for a cron job?", "AWSResearcherAgent"),
+    ("How do lambdas scale?", "AWSResearcherAgent"),
+    ("how many lambda functions do I have running", "AWSResearcherAgent"),
+    # General AWS research (default)
+    ("How does S3 versioning work?", "AWSResearcherAgent"),
+    ("Explain DynamoDB global tables", "AWSResearcherAgent"),
+    ("What is the difference between SQS and SNS?", "AWSResearcherAgent"),
+    ("Find documentation about IAM policy conditions", "AWSResearcherAgent"),
+    ("How do I enable CloudTrail for all regions?", "AWSResearcherAgent"),
+    # Words containing EC2 keywords, misrouted by substring matching
+    ("How do I set up an observer pattern with EventBridge?", "AWSResearcherAgent"),
+    ("Is VMware Cloud on AWS still available?", "AWSResearcherAgent"),
+    ("What are serverless best practices?", "AWSResearcherAgent"),
+    ("Be amiable and summarize the Well-Architected pillars", "AWSResearcherAgent"),
+    ("Tell me about Amazon Comprehend", "AWSResearcherAgent"),
+    # Hard cases: EC2 words used in another sense
+    ("Explain the Step Functions state machine instance model", "AWSResearcherAgent"),
+    ("How do I compute the cost of CloudFront transfers?", "AWSResearcherAgent"),
+    # Invoices
+    ("Show me every invoice we have", "InvoiceAgent"),
+    ("What's the balance due for Globex?", "InvoiceAgent"),
+    ("Which customers have unpaid bills?", "InvoiceAgent"),
+    ("Mark INV-004 as paid", "InvoiceAgent"),
+    ("Create an invoice for Jane Doe for 250 dollars", "InvoiceAgent"),
+    ("How much does Initech owe us?", "InvoiceAgent"),
+    ("List the overdue invoices", "InvoiceAgent"),
+    # Paraphrases without any route keyword
+    ("Turn off my development boxes", "EC2Agent"),
+    ("Which of my machines are running?", "EC2Agent"),
+    ("What's the total amount we billed Acme last month?", "InvoiceAgent"),
+    ("Delete the bill for Umbrella Corp", "InvoiceAgent"),
+]
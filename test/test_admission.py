@@ -0,0 +1,89 @@
+"""
+Test script for session admission control and the shared tool limiter
+"""
+import asyncio
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from src.voice_based_aws_agent.utils.voice_integration.admission import (
+    ADMISSIONS,
+    AdmissionController,
+    ToolLimiter,
+    busy_event,
+)
+
+
+def test_admit_and_wait():
+    """Test that a full server admits a waiting connection once a slot frees up"""
+    async def run():
+        admission = AdmissionController(max_sessions=1, queue_size=1, wait_seconds=1.0)
+        assert await admission.acquire() is None
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0.01)
+        assert admission.waiting == 1 and not waiter.done()
+        await admission.release()
+        assert await asyncio.wait_for(waiter, 1) is None
+        assert admission.active == 1 and admission.waiting == 0
+
+    admitted = ADMISSIONS.get(result="admitted_after_wait")
+    asyncio.run(run())
+    assert ADMISSIONS.get(result="admitted_after_wait") == admitted + 1
+    print("✓ Waiting connection admitted when a slot frees up")
+
+
+def test_timeout_and_busy():
+    """Test that waits time out and connections beyond the wait queue are turned away at once"""
+    async def run():
+        admission = AdmissionController(max_sessions=1, queue_size=1, wait_seconds=0.05)
+        assert await admission.acquire() is None
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0.01)
+        assert await admission.acquire() == "Server is at capacity", "queue full should reject at once"
+        assert await waiter == "Server is at capacity", "wait should time out"
+        assert admission.active == 1 and admission.waiting == 0
+
+        unlimited = AdmissionController(max_sessions=0)
+        for _ in range(100):
+            assert await unlimited.acquire() is None
+
+    timeouts = ADMISSIONS.get(result="rejected_timeout")
+    queue_full = ADMISSIONS.get(result="rejected_queue_full")
+    asyncio.run(run())
+    assert ADMISSIONS.get(result="rejected_timeout") == timeouts + 1
+    assert ADMISSIONS.get(result="rejected_queue_full") == queue_full + 1
+    assert busy_event("Server is at capacity", 2000) == {
+        "event": {"busy": {"reason": "Server is at capacity", "retryAfterMs": 2000}}
+    }
+    print("✓ Timeouts and full wait queue rejected")
+
+
+def test_tool_limiter():
+    """Test that at most max_concurrent tool executions run at once"""
+    async def run(limit, tools):
+        limiter = ToolLimiter(limit)
+        running, peak = 0, 0
+
+        async def tool():
+            nonlocal running, peak
+            async with limiter.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(tool() for _ in range(tools)))
+        return peak
+
+    assert asyncio.run(run(2, 6)) == 2
+    assert asyncio.run(run(0, 6)) == 6, "0 means no limit"
+    print("✓ Tool executions limited")
+
+
+if __name__ == "__main__":
+    test_admit_and_wait()
+    test_timeout_and_busy()
+    test_tool_limiter()
+    print("🎉 All admission tests passed!")
@@ -0,0 +1,190 @@
+"""
+Test script for cancelling agent invocations that hold a pooled orchestrator
+"""
+import asyncio
+import sys
+import os
+import threading
+import time
+from types import SimpleNamespace
+
+# Add the backend and backend src directories to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'src'))
+
+from voice_based_aws_agent.agents.agent_executor import CancellationHooks, run_agent
+from voice_based_aws_agent.agents.supervisor_agent import SupervisorAgent
+from voice_based_aws_agent.agents.orchestrator_pool import (
+    LEASE_WAIT_SECONDS,
+    AgentOrchestratorPool,
+    ConversationState,
+)
+from src.voice_based_aws_agent.utils.voice_integration.supervisor_agent_integration import (
+    SupervisorAgentIntegration,
+)
+
+
+class SlowAgent:
+    """Agent stand-in that records its reply only after a blocking model call."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.messages = []
+
+    def __call__(self, query):
+        time.sleep(self.seconds)
+        self.messages = self.messages + [{"role": "user", "content": query},
+                                         {"role": "assistant", "content": "done"}]
+        return "done"
+
+
+class ToolCallingAgent:
+    """
+    Agent stand-in that updates its history the way a strands agent loop does: the
+    user message first, then the model's toolUse, then a cancellation check before
+    the tool runs.
+    """
+
+    def __init__(self, fail=None):
+        self.messages = []
+        self.fail = fail
+        self.model_called = threading.Event()
+        self.hooks = CancellationHooks()
+
+    def __call__(self, query):
+        self.messages.append({"role": "user", "content": [{"text": query}]})
+        if self.fail:
+            raise self.fail
+        self.messages.append({"role": "assistant", "content": [{"toolUse": {"toolUseId": "t1", "name": "use_aws"}}]})
+        self.model_called.set()
+        while True:
+            self.hooks._before_tool(None)  # Raises AgentCancelled once the caller cancels
+            time.sleep(0.005)
+
+
+def alternates(messages):
+    """Whether a history is a valid user/assistant alternation with every toolUse answered."""
+    roles = [message["role"] for message in messages]
+    if roles[::2] != ["user"] * len(roles[::2]) or roles[1::2] != ["assistant"] * len(roles[1::2]):
+        return False
+    if len(messages) % 2:
+        return False
+    last = messages[-1]["content"] if messages else []
+    return not any("toolUse" in block for block in last)
+
+
+def exchange(query, answer):
+    return [{"role": "user", "content": [{"text": query}]}, {"role": "assistant", "content": [{"text": answer}]}]
+
+
+def test_unfinished_runs_keep_history_valid():
+    """Test that a run cancelled between the model call and the tool call saves no history"""
+    async def run():
+        agent = ToolCallingAgent()
+        pool = AgentOrchestratorPool(size=1)
+        orchestrator = SimpleNamespace(specialized_agents={"EC2Agent": agent})
+        pool._orchestrators.append(orchestrator)
+        pool._available.put_nowait(orchestrator)
+
+        state = ConversationState()
+        state.messages["EC2Agent"] = exchange("list instances", "two instances")
+
+        async def query():
+            async with pool.lease(state) as leased:
+                return await run_agent(leased.specialized_agents["EC2Agent"], "stop the first one")
+
+        task = asyncio.create_task(query())
+        while not agent.model_called.is_set():
+            await asyncio.sleep(0.005)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert state.messages["EC2Agent"] == exchange("list instances", "two instances")
+        assert alternates(state.messages["EC2Agent"])
+
+    asyncio.run(run())
+
+    # Errors turned into answers by the supervisor restore the history too
+    failing = ToolCallingAgent(fail=RuntimeError("throttled"))
+    failing.messages = exchange("list instances", "two instances")
+    supervisor = SupervisorAgent({"EC2Agent": failing}, config=SimpleNamespace())
+    answer = asyncio.run(supervisor.route_query("describe my EC2 instances"))
+    assert answer.startswith("Error:") and alternates(failing.messages) and len(failing.messages) == 2
+    print("✓ Cancelled and failed runs leave the history valid")
+
+
+def test_cancel_keeps_lease_until_worker_returns():
+    """Test that a cancelled query releases the orchestrator only after its worker is done"""
+    async def run():
+        agent = SlowAgent(0.2)
+        pool = AgentOrchestratorPool(size=1)
+        orchestrator = SimpleNamespace(specialized_agents={"EC2Agent": agent})
+        pool._orchestrators.append(orchestrator)
+        pool._available.put_nowait(orchestrator)
+
+        leases = LEASE_WAIT_SECONDS.get()
+        first = ConversationState()
+
+        async def query():
+            async with pool.lease(first) as leased:
+                return await run_agent(leased.specialized_agents["EC2Agent"], "list instances")
+
+        task = asyncio.create_task(query())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        else:
+            raise AssertionError("query should have been cancelled")
+        assert agent.messages == [], "the worker should be finished and the agent reset"
+
+        second = ConversationState()
+        async with pool.lease(second) as leased:
+            assert leased.specialized_agents["EC2Agent"].messages == [], "next lease must start clean"
+            await asyncio.sleep(0.3)
+            assert leased.specialized_agents["EC2Agent"].messages == [], "no late writes from the old worker"
+        assert second.messages == {}, "the cancelled query's history stays with its own session"
+        assert LEASE_WAIT_SECONDS.get() == leases + 2, "every lease records its wait"
+
+    asyncio.run(run())
+    print("✓ Cancelled queries hold their orchestrator until the worker returns")
+
+
+def test_session_orchestrator_runs_one_query_at_a_time():
+    """Test that concurrent toolUses on a session's own orchestrator don't run its agents together"""
+    class SessionOrchestrator:
+        def __init__(self):
+            self.running = 0
+            self.most_running = 0
+            self.specialized_agents = {}
+
+        async def process_query(self, query):
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+            await asyncio.sleep(0.02)
+            self.running -= 1
+            return f"answer: {query}"
+
+    async def run():
+        # Built without a pool it would construct real agents; use the fallback path directly
+        integration = SupervisorAgentIntegration(orchestrator_pool=SimpleNamespace())
+        integration.orchestrator_pool = integration.conversation_state = None
+        integration.orchestrator = SessionOrchestrator()
+
+        answers = await asyncio.gather(*(integration.query(f"query {n}") for n in range(3)))
+        assert answers == [f"answer: query {n}" for n in range(3)]
+        assert integration.orchestrator.most_running == 1, "queries overlapped on one orchestrator"
+
+    asyncio.run(run())
+    print("✓ Session orchestrator runs one query at a time")
+
+
+if __name__ == "__main__":
+    test_cancel_keeps_lease_until_worker_returns()
+    test_unfinished_runs_keep_history_valid()
+    test_session_orchestrator_runs_one_query_at_a_time()
+    print("🎉 All agent executor tests passed!")
@@ -0,0 +1,103 @@
+"""
+Test script for coalescing microphone chunks into larger audioInput events
+"""
+import asyncio
+import json
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from src.voice_based_aws_agent.config.config import VoiceSessionConfig
+from src.voice_based_aws_agent.utils.voice_integration.audio_coalescer import AudioCoalescer
+from src.voice_based_aws_agent.utils.voice_integration.s2s_events import S2sEvent
+from src.voice_based_aws_agent.utils.voice_integration.s2s_session_manager import S2sSessionManager
+
+CHUNK = bytes(320)  # 10 ms of 16 kHz 16-bit mono
+
+
+def test_flush_on_size():
+    """Test that chunks are merged until the target duration"""
+    coalescer = AudioCoalescer(target_ms=40, max_latency_ms=1000)
+    now = time.monotonic()
+    for _ in range(3):
+        assert coalescer.add("p", "c", CHUNK, now) == []
+    assert coalescer.add("p", "c", CHUNK, now) == [("p", "c", CHUNK * 4)]
+    assert not coalescer.pending and coalescer.chunks_in == 4 and coalescer.batches_out == 1
+    print("✓ Batches flushed at the target size")
+
+
+def test_flush_on_time():
+    """Test that buffered audio is due once the oldest chunk waited the maximum latency"""
+    coalescer = AudioCoalescer(target_ms=1000, max_latency_ms=30)
+    now = time.monotonic()
+    assert coalescer.time_until_flush() is None
+    assert coalescer.add("p", "c", CHUNK, now) == []
+    assert 0 < coalescer.time_until_flush(now) <= 0.03
+    assert coalescer.time_until_flush(now + 0.05) < 0
+    assert coalescer.flush() == [("p", "c", CHUNK)] and coalescer.flush() == []
+
+    assert coalescer.add("p", "c", CHUNK, now - 0.05) == [("p", "c", CHUNK)], "late chunk goes out at once"
+    print("✓ Batches flushed after the maximum latency")
+
+
+def test_flush_on_content_change_and_end():
+    """Test that audio of different contents isn't merged and an ending content is flushed"""
+    coalescer = AudioCoalescer(target_ms=1000, max_latency_ms=1000)
+    coalescer.add("p", "c1", CHUNK)
+    assert coalescer.add("p", "c2", CHUNK) == [("p", "c1", CHUNK)]
+    assert coalescer.flush_content("c1") == [], "only the ending content is flushed"
+    assert coalescer.flush_content("c2") == [("p", "c2", CHUNK)]
+    assert not coalescer.pending
+    print("✓ Batches flushed on content change and contentEnd")
+
+
+def test_session_sends_audio_before_content_end():
+    """Test that a client's contentEnd goes to Bedrock after the audio still buffered for it"""
+    sent = []
+
+    async def send(chunk):
+        sent.append(json.loads(chunk.value.bytes_))
+
+    async def run():
+        config = VoiceSessionConfig(audio_coalesce_target_ms=1000, audio_coalesce_max_latency_ms=1000)
+        session = S2sSessionManager(session_config=config, orchestrator_pool=SimpleNamespace())
+        session.stream = SimpleNamespace(input_stream=SimpleNamespace(send=send))
+        session.is_active = True
+        session.coalescer.add("p", "audio", CHUNK)
+        await session.send_raw_event(S2sEvent.content_end("p", "audio"))
+
+    asyncio.run(run())
+    assert [list(event["event"])[0] for event in sent] == ["audioInput", "contentEnd"]
+    print("✓ Buffered audio sent before its contentEnd")
+
+
+def test_default_limits():
+    """Test that the default target is reached before the latency cap, and a cap below it is rejected"""
+    config = VoiceSessionConfig()
+    coalescer = AudioCoalescer(target_ms=config.audio_coalesce_target_ms,
+                               max_latency_ms=config.audio_coalesce_max_latency_ms)
+    chunk = bytes(171 * 2)  # The frontend's 512 samples at 48 kHz, resampled to 16 kHz (~10.7 ms)
+    now = time.monotonic()
+    batches = [coalescer.add("p", "c", chunk, now) for _ in range(3)]
+    assert batches[:2] == [[], []] and len(batches[2]) == 1, "three chunks should fill a batch"
+    assert coalescer.time_until_flush() is None
+
+    try:
+        VoiceSessionConfig(audio_coalesce_target_ms=64, audio_coalesce_max_latency_ms=30)
+        raise AssertionError("a latency cap below the target should be rejected")
+    except ValueError:
+        pass
+    print("✓ Default coalescing limits are consistent")
+
+
+if __name__ == "__main__":
+    test_flush_on_size()
+    test_flush_on_time()
+    test_flush_on_content_change_and_end()
+    test_session_sends_audio_before_content_end()
+    test_default_limits()
+    print("🎉 All audio coalescer tests passed!")
@@ -0,0 +1,85 @@
+"""
+Test script for the binary WebSocket audio framing
+"""
+import base64
+import json
+import sys
+import os
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from src.voice_based_aws_agent.utils.voice_integration.audio_framing import (
+    AUDIO_INPUT_FRAME,
+    AUDIO_OUTPUT_FRAME,
+    AudioFrameError,
+    decode_audio_frame,
+    encode_audio_frame,
+)
+from src.voice_based_aws_agent.utils.voice_integration.server import encode_audio_output
+
+
+def expect_error(frame, message):
+    try:
+        decode_audio_frame(frame)
+    except AudioFrameError:
+        return
+    raise AssertionError(message)
+
+
+def test_round_trip():
+    """Test that frames decode to what was encoded, including empty and non-ASCII names"""
+    pcm = bytes(range(256)) * 4
+    for frame_type, prompt, content, audio in (
+        (AUDIO_INPUT_FRAME, "prompt-1", "audio-1", pcm),
+        (AUDIO_OUTPUT_FRAME, "prompt-1", "content-é", pcm[:2]),
+        (AUDIO_OUTPUT_FRAME, "", "", b""),
+        (AUDIO_INPUT_FRAME, "p" * 255, "c" * 255, pcm),
+    ):
+        frame = encode_audio_frame(frame_type, prompt, content, audio)
+        assert decode_audio_frame(frame) == (frame_type, prompt, content, audio)
+        assert decode_audio_frame(bytearray(frame)) == (frame_type, prompt, content, audio)
+    assert decode_audio_frame(encode_audio_frame(AUDIO_INPUT_FRAME, None, None, pcm))[1:3] == ("", "")
+    print("✓ Frames round-trip")
+
+
+def test_errors():
+    """Test that malformed frames and oversized names are rejected"""
+    frame = encode_audio_frame(AUDIO_INPUT_FRAME, "prompt", "content", b"\x00\x01")
+    expect_error(b"", "empty frame should be rejected")
+    expect_error(frame[:2], "frame shorter than its header should be rejected")
+    expect_error(frame[:8], "frame truncated inside the names should be rejected")
+    expect_error(b"\x07" + frame[1:], "unknown frame type should be rejected")
+    expect_error(b"\x01\x00\x01\xff", "names that aren't UTF-8 should be rejected")
+
+    try:
+        encode_audio_frame(AUDIO_OUTPUT_FRAME, "p" * 256, "content", b"")
+    except AudioFrameError:
+        pass
+    else:
+        raise AssertionError("names over 255 bytes should be rejected")
+    print("✓ Malformed frames rejected")
+
+
+def test_encode_audio_output():
+    """Test that serialized audioOutput events become output frames without a JSON round-trip"""
+    pcm = bytes(range(200)) * 3
+    audio = base64.b64encode(pcm).decode('utf-8')
+    event = {"event": {"audioOutput": {"content": audio, "contentId": "c-1", "role": "ASSISTANT"}}, "timestamp": 1}
+    for serialized in (
+        json.dumps(event, separators=(",", ":")),
+        json.dumps(event),
+        json.dumps(event, separators=(",", " : ")),  # Not sliceable, parsed instead
+        json.dumps(event).replace("/", "\\/"),  # Escaped, parsed instead
+        event,
+    ):
+        assert decode_audio_frame(encode_audio_output(serialized, "p")) == (AUDIO_OUTPUT_FRAME, "p", "c-1", pcm)
+    assert encode_audio_output({"event": {"textOutput": {"content": "hi"}}}, "p") is None
+    print("✓ audioOutput events framed")
+
+
+if __name__ == "__main__":
+    test_round_trip()
+    test_errors()
+    test_encode_audio_output()
+    print("🎉 All audio framing tests passed!")
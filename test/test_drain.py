@@ -0,0 +1,94 @@
+"""
+Test script for draining the voice server on SIGTERM, against the fake Nova Sonic stream
+"""
+import asyncio
+import json
+import os
+import signal
+import socket
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_session import (
+    FakeAgentOrchestratorPool,
+    FakeNovaSonicClient,
+    VoiceSessionConfig,
+    connect,
+    fast_script,
+    send_client_audio,
+    server,
+    speech,
+    use_client,
+)
+from src.voice_based_aws_agent.config.config import VoiceServerConfig
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_tool_use(websocket):
+    while True:
+        message = await websocket.recv()
+        if isinstance(message, str) and 'toolUse' in json.loads(message).get('event', {}):
+            return
+
+
+def test_sigterm_drains_sessions():
+    """Test that SIGTERM stops admitting sessions, ends idle ones and cuts busy ones at the deadline"""
+    async def run():
+        # A tool query outlasts the drain deadline, keeping its session busy
+        script = fast_script(agent_delay_ms=3000)
+        pool = FakeAgentOrchestratorPool(script, size=2)
+        pool.start()
+        use_client(FakeNovaSonicClient(script))
+        port = free_port()
+        url = f"ws://127.0.0.1:{port}"
+        ready = asyncio.Event()
+        server_config = VoiceServerConfig(drain_timeout_seconds=1, metrics_enabled=False)
+        session_config = VoiceSessionConfig(audio_coalesce_target_ms=0, stream_rollover_quiet_ms=200)
+        drained = server.DRAIN_SESSIONS.get(result="drained")
+        killed = server.DRAIN_SESSIONS.get(result="killed")
+        try:
+            serving = asyncio.create_task(server.main(
+                "127.0.0.1", port, None, pool, session_config, None, server_config, on_ready=ready.set
+            ))
+            await asyncio.wait_for(ready.wait(), 5)
+
+            idle = await connect(url)
+            busy = await connect(url)
+            await send_client_audio(busy, [speech()] * 10)
+            await asyncio.wait_for(wait_for_tool_use(busy), 3)
+            await asyncio.sleep(0.3)
+
+            os.kill(os.getpid(), signal.SIGTERM)
+            await asyncio.sleep(0.3)
+            try:
+                await connect(url)
+                raise AssertionError("a draining server should refuse new sessions")
+            except OSError:
+                pass
+
+            await asyncio.wait_for(idle.wait_closed(), 0.5)
+            assert idle.close_code == 1001, "idle session should be ended right away"
+            assert not busy.closed, "busy session should get until the deadline"
+
+            await asyncio.wait_for(busy.wait_closed(), 2)
+            assert busy.close_code == 1001
+            await asyncio.wait_for(serving, 2)
+        finally:
+            use_client(None)
+
+        assert server.DRAIN_SESSIONS.get(result="drained") == drained + 1
+        assert server.DRAIN_SESSIONS.get(result="killed") == killed + 1
+
+    asyncio.run(run())
+    print("✓ SIGTERM drains idle sessions and cuts busy ones at the deadline")
+
+
+if __name__ == "__main__":
+    test_sigterm_drains_sessions()
+    print("🎉 All drain tests passed!")
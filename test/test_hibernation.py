@@ -0,0 +1,95 @@
+"""
+Test script for hibernating idle voice sessions, against the fake Nova Sonic stream
+"""
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_session import (
+    AdmissionController,
+    VoiceSessionConfig,
+    connect,
+    fake_server,
+    fast_script,
+    send_audio,
+    send_client_audio,
+    server,
+    silence,
+    speech,
+    start_session,
+    wait_for_event,
+)
+
+
+def hibernation_config():
+    """Session settings that hibernate after one idle second."""
+    return VoiceSessionConfig(audio_coalesce_target_ms=0, hibernate_after_seconds=1,
+                              stream_rollover_seconds=0, stream_rollover_quiet_ms=300)
+
+
+def test_hibernate_and_wake():
+    """Test that an idle session gives up its stream and slot, and speech brings both back"""
+    async def run():
+        admission = AdmissionController(1)
+        assert await admission.acquire() is None
+        script = fast_script(tool_name="", turn_after_chunks=60)  # The fake answers silence too
+        session, client = await start_session(script, hibernation_config(), admission=admission)
+        old_stream = session.stream
+
+        await send_audio(session, [silence()] * 50)
+        assert session.hibernating, "an idle session should hibernate"
+        assert old_stream.ended and session.stream is None
+        assert admission.active == 0 and not session.holds_session_slot
+
+        await send_audio(session, [speech()] * 60)
+        transcript = await wait_for_event(session, 'textOutput', role='USER')
+        assert transcript['content'] == "How many EC2 instances are running?"
+        assert not session.hibernating and client.streams_opened == 2
+        assert admission.active == 1 and session.holds_session_slot
+        assert session.stream.received.count('textInput') == 1, "system prompt replayed on wake"
+        session.close()
+
+    asyncio.run(run())
+    print("✓ Hibernated session woken by speech")
+
+
+def test_disconnect_while_hibernated():
+    """Test that a client leaving while hibernated releases its session slot exactly once"""
+    async def run():
+        async with fake_server(fast_script(turn_after_chunks=1000), hibernation_config(), max_sessions=1) as fake:
+            releases = []
+            release = fake.admission.release
+
+            async def counted_release():
+                releases.append(1)
+                await release()
+            fake.admission.release = counted_release
+
+            websocket = await connect(fake.url)
+            await send_client_audio(websocket, [silence()] * 50)
+            session = next(iter(server.active_sessions.values()))
+            assert session.hibernating
+            assert len(releases) == 1 and fake.admission.active == 0
+
+            await websocket.close()
+            await asyncio.sleep(0.2)
+            assert not server.active_sessions
+            assert len(releases) == 1, f"slot released {len(releases)} times"
+            assert fake.admission.active == 0
+
+            # The slot is free for the next caller
+            websocket = await connect(fake.url)
+            await asyncio.sleep(0.2)
+            assert fake.admission.active == 1
+            await websocket.close()
+
+    asyncio.run(run())
+    print("✓ Disconnect while hibernated releases the slot once")
+
+
+if __name__ == "__main__":
+    test_hibernate_and_wake()
+    test_disconnect_while_hibernated()
+    print("🎉 All hibernation tests passed!")
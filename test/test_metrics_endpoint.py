@@ -0,0 +1,57 @@
+"""
+Test script for the voice server metrics endpoint
+"""
+import asyncio
+import sys
+import os
+from types import SimpleNamespace
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from src.voice_based_aws_agent.utils.voice_integration import metrics_endpoint
+
+
+def session_with_queues(input_items, output_items):
+    audio_input_queue, output_queue = asyncio.Queue(), asyncio.Queue()
+    for item in range(input_items):
+        audio_input_queue.put_nowait(item)
+    for item in range(output_items):
+        output_queue.put_nowait(item)
+    return SimpleNamespace(audio_input_queue=audio_input_queue, output_queue=output_queue, hibernating=False)
+
+
+def test_queue_depth_has_no_session_label():
+    """Test that queue depths are aggregated instead of kept per session"""
+    metrics_endpoint.register_session("s1", session_with_queues(1, 5))
+    metrics_endpoint.register_session("s2", session_with_queues(2, 0))
+    try:
+        metrics_endpoint.update_session_gauges()
+        assert metrics_endpoint.SESSION_QUEUE_DEPTH.get(queue="input") == 3
+        assert metrics_endpoint.SESSION_QUEUE_DEPTH.get(queue="output") == 5
+        assert metrics_endpoint.SESSION_QUEUE_DEPTH_MAX.get(queue="input") == 2
+        assert all(set(labels) == {"queue"} for labels, _ in metrics_endpoint.SESSION_QUEUE_DEPTH.samples())
+    finally:
+        metrics_endpoint.unregister_session("s1")
+        metrics_endpoint.unregister_session("s2")
+
+    metrics_endpoint.update_session_gauges()
+    assert metrics_endpoint.SESSION_QUEUE_DEPTH.get(queue="output") == 0
+    assert metrics_endpoint.SESSION_QUEUE_DEPTH_MAX.get(queue="output") == 0
+    print("✓ Queue depths aggregated over sessions")
+
+
+def test_event_bytes():
+    """Test that text frames are counted in UTF-8 bytes"""
+    before = metrics_endpoint.WEBSOCKET_BYTES.get(direction="out")
+    metrics_endpoint.record_event("out", '{"content":"ok"}')
+    metrics_endpoint.record_event("out", '{"content":"größe"}')
+    metrics_endpoint.record_event("out", b"\x02\x00\x00pcm")
+    assert metrics_endpoint.WEBSOCKET_BYTES.get(direction="out") - before == 16 + 21 + 6
+    print("✓ WebSocket bytes counted in UTF-8")
+
+
+if __name__ == "__main__":
+    test_queue_depth_has_no_session_label()
+    test_event_bytes()
+    print("🎉 All metrics endpoint tests passed!")
@@ -0,0 +1,71 @@
+"""
+Test script for the supervisor's compiled keyword router
+"""
+import sys
+import os
+
+# Add the backend src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from voice_based_aws_agent.agents.query_router import QueryRouter
+from voice_based_aws_agent.config.routing_config import Route
+from routing_corpus import ROUTING_CORPUS
+
+# The corpus also holds paraphrases without any keyword, which only the semantic router gets right
+MIN_ACCURACY = 0.75
+
+
+def test_routing_accuracy():
+    """Test the default route table against the routing corpus"""
+    print("Testing routing accuracy...")
+    router = QueryRouter()
+
+    misrouted = [(query, expected, router.route(query)) for query, expected in ROUTING_CORPUS
+                 if router.route(query) != expected]
+    for query, expected, actual in misrouted:
+        print(f"  misrouted: {query!r} -> {actual} (expected {expected})")
+
+    accuracy = 1 - len(misrouted) / len(ROUTING_CORPUS)
+    assert accuracy >= MIN_ACCURACY, f"Expected accuracy >= {MIN_ACCURACY}, got {accuracy:.2f}"
+    print(f"✓ Accuracy {accuracy:.0%} on {len(ROUTING_CORPUS)} queries")
+
+
+def test_word_boundaries():
+    """Test that keywords only match whole words, with plurals"""
+    router = QueryRouter()
+    assert router.route("set up an observer") == "AWSResearcherAgent", "'server' matched inside 'observer'"
+    assert router.route("VMware pricing") == "AWSResearcherAgent", "'vm' matched inside 'VMware'"
+    assert router.route("list my servers") == "EC2Agent", "plural 'servers' not matched"
+    assert router.route("show all security   groups") == "EC2Agent", "phrase with extra whitespace not matched"
+    print("✓ Keywords match whole words only")
+
+
+def test_priorities_and_weights():
+    """Test that priority beats score and weights break ties"""
+    routes = [
+        Route(agent="A", keywords=("alpha", "beta"), weight=1.0),
+        Route(agent="B", keywords=("gamma",), weight=3.0),
+        Route(agent="C", keywords=("delta",), priority=5),
+    ]
+    router = QueryRouter(routes, default_agent="D")
+    assert router.route("alpha beta gamma") == "B", "higher weighted score should win"
+    assert router.route("alpha beta gamma delta") == "C", "higher priority should win"
+    assert router.route("nothing here") == "D", "default agent expected"
+    assert QueryRouter(routes, default_agent="D", available_agents=["A"]).route("gamma") == "D", \
+        "routes to unavailable agents should be skipped"
+
+    try:
+        QueryRouter([Route(agent="A", keywords=("x",)), Route(agent="B", keywords=("X",))])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("duplicate keyword across routes should be rejected")
+    print("✓ Priorities, weights and agent filtering")
+
+
+if __name__ == "__main__":
+    test_routing_accuracy()
+    test_word_boundaries()
+    test_priorities_and_weights()
+    print("🎉 All router tests passed!")
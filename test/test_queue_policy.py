@@ -0,0 +1,81 @@
+"""
+Test script for the output queue limit policies of a voice session
+"""
+import asyncio
+import sys
+import os
+from types import SimpleNamespace
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from src.voice_based_aws_agent.config.config import VoiceSessionConfig
+from src.voice_based_aws_agent.utils.voice_integration.s2s_session_manager import S2sSessionManager
+
+
+def make_session(policy):
+    """A session with a two-event output queue and no stream or agents."""
+    config = VoiceSessionConfig(output_queue_max_size=2, output_queue_policy=policy)
+    session = S2sSessionManager(session_config=config, orchestrator_pool=SimpleNamespace())
+    session.is_active = True
+    return session
+
+
+def drain(queue):
+    items = []
+    while not queue.empty():
+        items.append(queue.get_nowait())
+    return items
+
+
+def test_drop_oldest():
+    """Test that a full queue drops its oldest event to make room"""
+    async def run():
+        session = make_session('drop_oldest')
+        for event in ("a", "b", "c", "d"):
+            await session._put_output(event)
+        assert drain(session.output_queue) == ["c", "d"]
+        assert session.queue_stats['output_dropped_oldest'] == 2
+        assert session.is_active
+
+    asyncio.run(run())
+    print("✓ drop_oldest keeps the newest events")
+
+
+def test_disconnect():
+    """Test that a full queue closes the session with a reason and drops the event"""
+    async def run():
+        session = make_session('disconnect')
+        for event in ("a", "b", "c"):
+            await session._put_output(event)
+        assert drain(session.output_queue) == ["a", "b"]
+        assert session.queue_stats['output_disconnect'] == 1
+        assert not session.is_active and session.disconnect_reason
+
+    asyncio.run(run())
+    print("✓ disconnect closes a session that can't keep up")
+
+
+def test_block():
+    """Test that a full queue makes the producer wait for the client"""
+    async def run():
+        session = make_session('block')
+        await session._put_output("a")
+        await session._put_output("b")
+        blocked = asyncio.create_task(session._put_output("c"))
+        await asyncio.sleep(0.01)
+        assert not blocked.done(), "producer should wait while the queue is full"
+        assert session.output_queue.get_nowait() == "a"
+        await asyncio.wait_for(blocked, 1)
+        assert drain(session.output_queue) == ["b", "c"]
+        assert session.queue_stats['output_blocked'] == 1
+
+    asyncio.run(run())
+    print("✓ block waits for room without losing events")
+
+
+if __name__ == "__main__":
+    test_drop_oldest()
+    test_disconnect()
+    test_block()
+    print("🎉 All queue policy tests passed!")
@@ -0,0 +1,152 @@
+"""
+Test script for the TTL response cache in front of the specialized agents
+"""
+import asyncio
+import sys
+import os
+import time
+from types import SimpleNamespace
+
+# Add the backend src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'src'))
+
+from voice_based_aws_agent.agents import response_cache
+from voice_based_aws_agent.agents.agent_executor import run_agent
+from voice_based_aws_agent.agents.response_cache import (
+    MutationHooks,
+    ReadOnlyGuard,
+    ReadOnlyViolation,
+    ResponseCache,
+    configure_response_cache,
+    get_response_cache,
+    is_mutating_tool,
+    normalize_query,
+    read_only,
+)
+from voice_based_aws_agent.agents.supervisor_agent import SupervisorAgent
+
+
+def test_normalization():
+    """Test that cache keys ignore case and punctuation and skip context-dependent queries"""
+    assert normalize_query("List my EC2 instances.") == normalize_query("list my  ec2 instances")
+    assert normalize_query("Stop that one") is None, "follow-ups depend on earlier turns"
+    assert normalize_query("?!") is None
+    print("✓ Queries normalized")
+
+
+def test_ttl_and_lru():
+    """Test per-agent expiry, least recently used eviction and uncached agents"""
+    cache = ResponseCache(max_entries=2, ttl_seconds={"A": 0.05, "B": 60})
+    cache.store("A", "list things", "things", cache.generation("A"))
+    assert cache.get("A", "List things?") == "things"
+    time.sleep(0.06)
+    assert cache.get("A", "list things") is None, "entry should have expired"
+
+    for query in ("one query", "two query", "three query"):
+        cache.store("B", query, query.upper(), cache.generation("B"))
+    assert cache.get("B", "one query") is None, "least recently used entry should be evicted"
+    assert cache.get("B", "three query") == "THREE QUERY"
+
+    cache.store("C", "anything", "answer", cache.generation("C"))
+    assert cache.get("C", "anything") is None, "agents without a TTL are not cached"
+    assert ResponseCache(max_entries=0).lookup("list my ec2 instances") == (None, None)
+    assert ResponseCache().lookup("list my ec2 instances") == (None, None), "no supervisor router yet"
+    print("✓ TTL expiry, LRU eviction and per-agent TTLs")
+
+
+def test_invalidation():
+    """Test that mutating tools drop the agent's entries and answers computed meanwhile"""
+    assert is_mutating_tool({"name": "delete_invoice"})
+    assert is_mutating_tool({"name": "use_aws", "input": {"service_name": "ec2", "operation_name": "stop_instances"}})
+    assert not is_mutating_tool({"name": "use_aws", "input": {"service_name": "ec2", "operation_name": "describe_instances"}})
+    assert not is_mutating_tool({"name": "list_all_invoices"})
+
+    cache = ResponseCache(ttl_seconds={"InvoiceAgent": 60, "EC2Agent": 60})
+    response_cache._cache, previous = cache, response_cache._cache
+    try:
+        cache.store("InvoiceAgent", "show unpaid invoices", "two", cache.generation("InvoiceAgent"))
+        cache.store("EC2Agent", "list ec2 instances", "three", cache.generation("EC2Agent"))
+        generation = cache.generation("InvoiceAgent")
+
+        MutationHooks("InvoiceAgent")._on_tool(SimpleNamespace(tool_use={"name": "update_invoice_status"}))
+        assert cache.get("InvoiceAgent", "show unpaid invoices") is None, "entry should be invalidated"
+        assert cache.get("EC2Agent", "list ec2 instances") == "three", "other agents keep their entries"
+
+        cache.store("InvoiceAgent", "show unpaid invoices", "stale", generation)
+        assert cache.get("InvoiceAgent", "show unpaid invoices") is None, "answer from before the change is stale"
+    finally:
+        response_cache._cache = previous
+    print("✓ Mutating tools invalidate their agent's answers")
+
+
+def test_read_only_guard():
+    """Test that mutating tools are refused in read-only scopes, including on agent executor threads"""
+    guard = ReadOnlyGuard("InvoiceAgent")
+
+    def agent(query):
+        # Stands in for strands calling the hook before each tool
+        guard._before_tool(SimpleNamespace(tool_use={"name": query}))
+        return "ran"
+
+    async def speculate(tool):
+        scope = read_only()
+        try:
+            return await run_agent(agent, tool), scope.violated
+        except ReadOnlyViolation:
+            return "refused", scope.violated
+
+    async def run():
+        # Speculations run in their own task, so the scope ends with it
+        assert await asyncio.create_task(speculate("list_all_invoices")) == ("ran", False)
+        assert await asyncio.create_task(speculate("update_invoice_status")) == ("refused", True)
+        assert await run_agent(agent, "update_invoice_status") == "ran", "outside a scope tools run"
+
+    asyncio.run(run())
+    assert response_cache.READ_ONLY_BLOCKED.get(agent="InvoiceAgent", tool="update_invoice_status") >= 1
+    print("✓ Mutating tools refused inside read-only scopes")
+
+
+def test_supervisor_stores_answers():
+    """Test that the supervisor caches successful answers and lookups route with its router"""
+    calls = []
+
+    def agent(query):
+        calls.append(query)
+        return f"answer {len(calls)}"
+
+    cache = ResponseCache()
+    response_cache._cache, previous = cache, response_cache._cache
+    try:
+        supervisor = SupervisorAgent({"EC2Agent": agent, "InvoiceAgent": agent}, config=SimpleNamespace())
+        assert asyncio.run(supervisor.route_query("List my EC2 instances")) == "answer 1"
+        assert cache.lookup("list my ec2 instances!") == ("EC2Agent", "answer 1")
+        assert cache.lookup("list my ec2 instances in eu-west-1") == ("EC2Agent", None)
+        assert response_cache.CACHE_HIT_RATIO.get(agent="EC2Agent") == 0.5
+        agent_name, _ = cache.lookup("How do I configure Lambda concurrency?")
+        assert agent_name in ("EC2Agent", "InvoiceAgent"), "lookups only route to agents the supervisor has"
+    finally:
+        response_cache._cache = previous
+    print("✓ Supervisor answers cached and found by lookup")
+
+
+def test_workers_skip_locally_invalidated_agents():
+    """Test that several workers don't cache answers only this process's invalidation keeps fresh"""
+    try:
+        configure_response_cache(16)
+        assert get_response_cache().enabled_for("InvoiceAgent")
+        configure_response_cache(16, workers=4)
+        assert not get_response_cache().enabled_for("InvoiceAgent"), "other workers' changes aren't seen"
+        assert get_response_cache().enabled_for("EC2Agent")
+    finally:
+        configure_response_cache(0)
+    print("✓ Invoice answers not cached with several workers")
+
+
+if __name__ == "__main__":
+    test_normalization()
+    test_ttl_and_lru()
+    test_invalidation()
+    test_read_only_guard()
+    test_supervisor_stores_answers()
+    test_workers_skip_locally_invalidated_agents()
+    print("🎉 All response cache tests passed!")
@@ -0,0 +1,79 @@
+"""
+Test script for the supervisor's semantic router
+"""
+import sys
+import os
+import time
+
+# Add the backend src directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend', 'src'))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from voice_based_aws_agent.agents.query_router import QueryRouter
+from voice_based_aws_agent.agents.semantic_router import SemanticRouter
+from voice_based_aws_agent.config.routing_config import Route
+from routing_corpus import ROUTING_CORPUS
+
+MIN_ACCURACY = 0.95
+MAX_MICROSECONDS_PER_QUERY = 1000
+
+
+def accuracy(router):
+    return sum(router.route(query) == expected for query, expected in ROUTING_CORPUS) / len(ROUTING_CORPUS)
+
+
+def test_routing_accuracy():
+    """Test the exemplars against the routing corpus, and against the keyword routes"""
+    print("Testing semantic routing accuracy...")
+    router = SemanticRouter()
+
+    for query, expected in ROUTING_CORPUS:
+        actual = router.route(query)
+        if actual != expected:
+            print(f"  misrouted: {query!r} -> {actual} (expected {expected})")
+
+    semantic, keyword = accuracy(router), accuracy(QueryRouter())
+    assert semantic >= MIN_ACCURACY, f"Expected accuracy >= {MIN_ACCURACY}, got {semantic:.2f}"
+    assert semantic > keyword, f"Semantic accuracy {semantic:.2f} should beat keyword accuracy {keyword:.2f}"
+    print(f"✓ Accuracy {semantic:.0%} on {len(ROUTING_CORPUS)} queries (keywords: {keyword:.0%})")
+
+
+def test_threshold_and_fallback():
+    """Test that low-confidence queries go to the keyword routes, then the default agent"""
+    exemplars = {"A": ("start the red engine",), "B": ("paint the blue house",)}
+    fallback = QueryRouter([Route(agent="B", keywords=("zebra",))], default_agent="D")
+    router = SemanticRouter(exemplars, threshold=0.5, fallback=fallback)
+
+    assert router.route("start the red engine now") == "A", "close match should route semantically"
+    assert router.route("a zebra crossing") == "B", "keyword fallback expected below the threshold"
+    assert router.route("something unrelated") == "D", "default agent expected"
+    assert router.route("") == "D", "empty query should fall back"
+
+    fallback = QueryRouter([Route(agent="B", keywords=("red",), priority=10)], default_agent="D")
+    router = SemanticRouter(exemplars, threshold=0.5, fallback=fallback)
+    assert router.decide("start the red engine now") == ("B", "keyword"), "priority route should win over similarity"
+    router = SemanticRouter(exemplars, threshold=0.5, fallback=fallback, override_priority=None)
+    assert router.route("start the red engine now") == "A"
+    assert SemanticRouter(exemplars, available_agents=["B"]).agents == ["B"], \
+        "exemplars of unavailable agents should be skipped"
+    print("✓ Threshold, keyword fallback, priority routes and agent filtering")
+
+
+def test_latency():
+    """Test that routing stays under a millisecond per query"""
+    router = SemanticRouter()
+    queries = [query for query, _ in ROUTING_CORPUS]
+    start = time.perf_counter()
+    for _ in range(20):
+        for query in queries:
+            router.route(query)
+    per_query = (time.perf_counter() - start) / (20 * len(queries)) * 1e6
+    assert per_query < MAX_MICROSECONDS_PER_QUERY, f"Routing took {per_query:.0f}µs per query"
+    print(f"✓ {per_query:.0f}µs per query")
+
+
+if __name__ == "__main__":
+    test_routing_accuracy()
+    test_threshold_and_fallback()
+    test_latency()
+    print("🎉 All semantic router tests passed!")
@@ -0,0 +1,138 @@
+"""
+Test script for speculative tool execution on user transcripts
+"""
+import asyncio
+import json
+import sys
+import os
+from types import SimpleNamespace
+
+# Add the backend directory to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from src.voice_based_aws_agent.agents.orchestrator_pool import AgentOrchestratorPool
+from src.voice_based_aws_agent.config.config import VoiceSessionConfig
+from src.voice_based_aws_agent.utils.voice_integration.s2s_session_manager import S2sSessionManager
+from src.voice_based_aws_agent.utils.voice_integration.speculation import (
+    ToolSpeculator,
+    content_words,
+    is_read_only,
+    overlap,
+)
+
+
+def test_read_only_transcripts():
+    """Test that only requests for information are speculated on"""
+    for transcript in ("How many EC2 instances are running?", "Which invoices are unpaid?",
+                       "How do I configure Lambda concurrency?", "Show me the stopped instances"):
+        assert is_read_only(transcript), f"{transcript!r} should be read-only"
+    for transcript in ("Stop the web server instance", "Delete invoice INV-010",
+                       "Yes, go ahead and do it", "Mark it as paid", "instances please"):
+        assert not is_read_only(transcript), f"{transcript!r} should not be speculated on"
+    print("✓ Read-only transcripts detected")
+
+
+def test_query_matching():
+    """Test that paraphrases match and changed content words don't"""
+    def similar(first, second):
+        return overlap(content_words(first), content_words(second))
+
+    assert similar("Can you show me my EC2 instances?", "list EC2 instances") == 1.0
+    assert similar("Which invoices are still unpaid?", "list unpaid invoices") == 1.0
+    assert similar("Which instances are running?", "Which instances are stopped?") < 0.75
+    assert similar("", "") == 0.0
+    print("✓ Transcripts matched to toolUse queries by content words")
+
+
+def test_claim_and_cancel():
+    """Test that a matching toolUse gets the running query and a mismatch cancels it"""
+    async def run():
+        async def query(text):
+            await asyncio.sleep(0.05)
+            return f"answer: {text}"
+
+        speculator = ToolSpeculator(query)
+        assert speculator.start("How many EC2 instances are running?")
+        task = speculator.claim("how many ec2 instances are running")
+        assert task is not None and await task == "answer: How many EC2 instances are running?"
+        assert speculator.claim("how many ec2 instances are running") is None, "a speculation is claimed once"
+
+        speculator.start("Which invoices are unpaid?")
+        running = speculator.current.task
+        assert speculator.claim("Which invoices are overdue?") is None
+        await asyncio.sleep(0)
+        assert running.cancelled(), "mismatched speculation should be cancelled"
+
+        assert not speculator.start("Delete all unpaid invoices")
+        assert speculator.current is None
+
+        speculator = ToolSpeculator(query, ttl_seconds=0.01)
+        speculator.start("Show my servers in us-east-1")
+        running = speculator.current.task
+        await asyncio.sleep(0.03)
+        assert speculator.current is None and running.cancelled(), "unclaimed speculation should expire"
+
+    asyncio.run(run())
+    print("✓ Speculations claimed, cancelled on mismatch and expired")
+
+
+class HistoryOrchestrator:
+    """Orchestrator whose one agent records every exchange in its history."""
+
+    def __init__(self):
+        self.specialized_agents = {"EC2Agent": SimpleNamespace(messages=[])}
+
+    async def process_query(self, query):
+        await asyncio.sleep(0.01)
+        self.specialized_agents["EC2Agent"].messages.extend([
+            {"role": "user", "content": [{"text": query}]},
+            {"role": "assistant", "content": [{"text": "three"}]},
+        ])
+        return "three"
+
+
+class HistoryPool(AgentOrchestratorPool):
+    def start(self):
+        orchestrator = HistoryOrchestrator()
+        self._orchestrators.append(orchestrator)
+        self._available.put_nowait(orchestrator)
+
+
+def test_speculation_history():
+    """Test that only a claimed speculation adds to the session's conversation history"""
+    async def run():
+        pool = HistoryPool(size=1)
+        pool.start()
+        config = VoiceSessionConfig(speculative_tools=True, speculation_ttl_seconds=0.05)
+        session = S2sSessionManager(session_config=config, orchestrator_pool=pool)
+        history = session.supervisor_agent.conversation_state.messages
+
+        # Finished but unclaimed: mismatched, expired and barged-in speculations leave no trace
+        for outcome in ("mismatch", "expired", "barge_in"):
+            session.speculator.start("How many EC2 instances are running?")
+            await session.speculator.current.task
+            if outcome == "mismatch":
+                assert session.speculator.claim("Which instances are stopped?") is None
+            elif outcome == "expired":
+                await asyncio.sleep(0.06)
+            else:
+                session.speculator.cancel(outcome)
+            assert history.get("EC2Agent") in (None, []), f"{outcome} speculation should not keep history"
+
+        session.speculator.start("How many EC2 instances are running?")
+        result = await session.processToolUse(
+            "supervisorAgent", {"content": json.dumps({"query": "how many ec2 instances are running"})}
+        )
+        assert result == {"result": "three"}
+        assert [m["role"] for m in history["EC2Agent"]] == ["user", "assistant"], "claimed speculation is committed once"
+
+    asyncio.run(run())
+    print("✓ Speculation history committed only when claimed")
+
+
+if __name__ == "__main__":
+    test_read_only_transcripts()
+    test_query_matching()
+    test_claim_and_cancel()
+    test_speculation_history()
+    print("🎉 All speculation tests passed!")
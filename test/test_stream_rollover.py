@@ -0,0 +1,118 @@
+"""
+Test script for Nova Sonic stream rollover and recovery, against the fake stream
+"""
+import asyncio
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from fake_session import (
+    VoiceSessionConfig,
+    fast_script,
+    send_audio,
+    silence,
+    speech,
+    start_session,
+    wait_for_event,
+)
+
+
+def rollover_config(**overrides):
+    """Session settings for a rollover one second into the stream."""
+    values = dict(audio_coalesce_target_ms=0, stream_rollover_seconds=1,
+                  stream_rollover_grace_seconds=10, stream_rollover_quiet_ms=300)
+    values.update(overrides)
+    return VoiceSessionConfig(**values)
+
+
+def test_rollover_waits_for_silence():
+    """Test that a due rollover waits until the caller stops talking, then primes the new stream"""
+    async def run():
+        script = fast_script(turn_after_chunks=1000, tool_name="")
+        session, client = await start_session(script, rollover_config())
+        old_stream = session.stream
+
+        await send_audio(session, [speech()] * 50)  # 1.6 s, past the rollover time
+        assert client.streams_opened == 1, "rollover must not cut the caller off mid-utterance"
+
+        await send_audio(session, [silence()] * 20)
+        assert client.streams_opened == 2, "rollover should happen once the caller is quiet"
+        stream = session.stream
+        assert stream is not old_stream and old_stream.ended
+        assert stream.received[:6] == ['sessionStart', 'promptStart', 'contentStart', 'textInput',
+                                       'contentEnd', 'contentStart'], f"not primed: {stream.received[:6]}"
+        assert stream.prompt_name == old_stream.prompt_name
+
+        chunks = stream.audio_chunks
+        await send_audio(session, [silence()] * 5)
+        assert stream.audio_chunks == chunks + 5, "audio should keep flowing to the new stream"
+        session.close()
+
+    asyncio.run(run())
+    print("✓ Rollover waits for caller silence and primes the new stream")
+
+
+def test_rollover_replays_history():
+    """Test that recent turns are replayed on the replacement stream"""
+    async def run():
+        script = fast_script(tool_name="")
+        session, client = await start_session(script, rollover_config(stream_rollover_seconds=0))
+        await send_audio(session, [speech()] * 10)
+        await wait_for_event(session, 'textOutput', role='ASSISTANT')
+
+        assert await session._rollover_stream('scheduled')
+        received = session.stream.received
+        assert received.count('textInput') == 3, f"system prompt and two turns expected, got {received}"
+        assert received[-1] == 'contentStart', "the audio content is opened last"
+        session.close()
+
+    asyncio.run(run())
+    print("✓ Rollover replays recent turns")
+
+
+def test_recovery_after_stream_end():
+    """Test that a stream ending unexpectedly is replaced and audio keeps flowing"""
+    async def run():
+        script = fast_script(turn_after_chunks=1000, error_after_chunks=5, error="end")
+        session, client = await start_session(script, rollover_config(stream_rollover_seconds=0))
+        await send_audio(session, [silence()] * 6)
+        await asyncio.sleep(0.1)
+
+        assert client.streams_opened == 2, "the ended stream should be replaced"
+        assert session.is_active
+        assert session.stream.audio_chunks >= 1, "audio should reach the recovered stream"
+        session.close()
+
+    asyncio.run(run())
+    print("✓ Unexpected stream end recovered")
+
+
+def test_tool_result_for_retired_stream_dropped():
+    """Test that a tool finishing after its stream was replaced doesn't send its result"""
+    async def run():
+        script = fast_script(agent_delay_ms=300)
+        session, client = await start_session(script, rollover_config(stream_rollover_seconds=0))
+        old_stream = session.stream
+        await send_audio(session, [speech()] * 10)
+        await wait_for_event(session, 'toolUse')
+        assert session.tool_tasks, "the tool should still be running"
+
+        assert await session._rollover_stream('scheduled')
+        await asyncio.gather(*session.tool_tasks.values())
+
+        assert 'toolResult' not in session.stream.received, "result must not reach the new stream"
+        assert 'toolResult' not in old_stream.received
+        assert not session.stream.ended
+        session.close()
+
+    asyncio.run(run())
+    print("✓ Tool results for a retired stream dropped")
+
+
+if __name__ == "__main__":
+    test_rollover_waits_for_silence()
+    test_rollover_replays_history()
+    test_recovery_after_stream_end()
+    test_tool_result_for_retired_stream_dropped()
+    print("🎉 All stream rollover tests passed!")